@@ -0,0 +1,71 @@
+"""review stats
+
+Revision ID: 1457ed8b9c28
+Revises: f7d60cb40a78
+Create Date: 2026-10-18 11:20:47.902134
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1457ed8b9c28'
+down_revision: Union[str, Sequence[str], None] = 'f7d60cb40a78'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# копия app/utils/review_stats.py на момент ревизии
+def _add(p: str) -> str:
+    return (
+        "INSERT INTO review_stats(status, sentiment, cnt, rating_sum) "
+        f"VALUES ({p}.status, coalesce({p}.sentiment, ''), 1, {p}.rating) "
+        "ON CONFLICT(status, sentiment) DO UPDATE "
+        "SET cnt = cnt + 1, rating_sum = rating_sum + excluded.rating_sum;"
+    )
+
+
+def _sub(p: str) -> str:
+    return (
+        f"UPDATE review_stats SET cnt = cnt - 1, rating_sum = rating_sum - {p}.rating "
+        f"WHERE status = {p}.status AND sentiment = coalesce({p}.sentiment, '');"
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "review_stats",
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("sentiment", sa.String(length=20), nullable=False, server_default=""),
+        sa.Column("cnt", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("rating_sum", sa.Integer(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("status", "sentiment"),
+        if_not_exists=True,
+    )
+    op.execute("DROP TRIGGER IF EXISTS review_stats_ai")
+    op.execute("DROP TRIGGER IF EXISTS review_stats_ad")
+    op.execute("DROP TRIGGER IF EXISTS review_stats_au")
+    op.execute(f"CREATE TRIGGER review_stats_ai AFTER INSERT ON reviews BEGIN {_add('new')} END")
+    op.execute(f"CREATE TRIGGER review_stats_ad AFTER DELETE ON reviews BEGIN {_sub('old')} END")
+    op.execute(
+        "CREATE TRIGGER review_stats_au AFTER UPDATE OF status, sentiment, rating ON reviews "
+        f"BEGIN {_sub('old')} {_add('new')} END"
+    )
+
+    op.execute("DELETE FROM review_stats")
+    op.execute(
+        "INSERT INTO review_stats(status, sentiment, cnt, rating_sum) "
+        "SELECT status, coalesce(sentiment, ''), count(*), sum(rating) FROM reviews "
+        "GROUP BY status, coalesce(sentiment, '')"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for suffix in ("ai", "ad", "au"):
+        op.execute(f"DROP TRIGGER IF EXISTS review_stats_{suffix}")
+    op.drop_table("review_stats", if_exists=True)
@@ -0,0 +1,68 @@
+"""search fts
+
+Revision ID: 2a7712fa7221
+Revises: b711b0e90a2d
+Create Date: 2026-10-18 09:12:40.512318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2a7712fa7221'
+down_revision: Union[str, Sequence[str], None] = 'b711b0e90a2d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# копия app/utils/fts.py на момент ревизии — миграция не должна зависеть от кода приложения
+FOLD = {
+    "ё": "е", "Ё": "Е",
+    "й": "и", "Й": "И",
+    "ї": "і", "Ї": "І",
+    "є": "е", "Є": "Е",
+    "ґ": "г", "Ґ": "Г",
+}
+
+FTS_TABLES = {
+    "service_items_fts": ("service_items", ["title", "description"]),
+    "reviews_fts": ("reviews", ["author_name", "text"]),
+}
+
+
+def _fold_sql(expr: str) -> str:
+    for a, b in FOLD.items():
+        expr = f"replace({expr}, '{a}', '{b}')"
+    return expr
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for fts, (table, columns) in FTS_TABLES.items():
+        cols = ", ".join(columns)
+        new_vals = ", ".join(_fold_sql(f"new.{c}") for c in columns)
+        old_vals = ", ".join(_fold_sql(f"old.{c}") for c in columns)
+        ins = f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_vals});"
+        dele = f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_vals});"
+
+        op.execute(
+            f"CREATE VIRTUAL TABLE {fts} USING fts5("
+            f"{cols}, content='{table}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+        )
+        op.execute(f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN {ins} END")
+        op.execute(f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN {dele} END")
+        op.execute(f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN {dele} {ins} END")
+
+        vals = ", ".join(_fold_sql(c) for c in columns)
+        op.execute(f"INSERT INTO {fts}(rowid, {cols}) SELECT id, {vals} FROM {table}")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for fts in FTS_TABLES:
+        for suffix in ("ai", "ad", "au"):
+            op.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+        op.execute(f"DROP TABLE IF EXISTS {fts}")
@@ -0,0 +1,61 @@
+"""outbox events
+
+Revision ID: 5c0e8a1d2b47
+Revises: 1457ed8b9c28
+Create Date: 2026-10-18 13:02:11.305816
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c0e8a1d2b47'
+down_revision: Union[str, Sequence[str], None] = '1457ed8b9c28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# копия app/utils/outbox.py на момент ревизии
+OUTBOX_TRIGGER = (
+    "CREATE TRIGGER contact_messages_outbox_ai AFTER INSERT ON contact_messages BEGIN "
+    "INSERT INTO outbox_events(kind, ref_id, channel, payload, status, attempts, created_at, next_attempt_at) "
+    "VALUES ('contact_message', new.id, 'fanout', json_object("
+    "'id', new.id, 'name', new.name, 'phone', new.phone, 'email', new.email, 'topic', new.topic, "
+    "'message', new.message, 'preferred_contact', new.preferred_contact, 'created_at', new.created_at"
+    "), 'pending', 0, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP); END"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "outbox_events",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("kind", sa.String(length=40), nullable=False),
+        sa.Column("ref_id", sa.Integer(), nullable=True),
+        sa.Column("channel", sa.String(length=20), nullable=False),
+        sa.Column("payload", sa.Text(), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False, server_default=sa.text("'pending'")),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.text("(CURRENT_TIMESTAMP)")),
+        sa.Column("next_attempt_at", sa.DateTime(), nullable=False, server_default=sa.text("(CURRENT_TIMESTAMP)")),
+        sa.Column("sent_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_outbox_events_status_next", "outbox_events", ["status", "next_attempt_at"], if_not_exists=True
+    )
+    op.execute("DROP TRIGGER IF EXISTS contact_messages_outbox_ai")
+    op.execute(OUTBOX_TRIGGER)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS contact_messages_outbox_ai")
+    op.drop_index("ix_outbox_events_status_next", table_name="outbox_events", if_exists=True)
+    op.drop_table("outbox_events", if_exists=True)
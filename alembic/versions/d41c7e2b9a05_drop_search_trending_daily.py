@@ -0,0 +1,39 @@
+"""drop search_trending_daily
+
+Trending считается по search_stats_hourly и крайнему часу из search_events,
+дневной роллап больше не пишется и не читается.
+
+Revision ID: d41c7e2b9a05
+Revises: 9b3e4f6a1c20
+Create Date: 2026-10-18 21:12:40.503118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41c7e2b9a05'
+down_revision: Union[str, Sequence[str], None] = '9b3e4f6a1c20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_table("search_trending_daily", if_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_table(
+        "search_trending_daily",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("lang", sa.String(length=5), nullable=False),
+        sa.Column("query_norm", sa.String(length=200), nullable=False),
+        sa.Column("cnt", sa.Integer(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("day", "lang", "query_norm"),
+        if_not_exists=True,
+    )
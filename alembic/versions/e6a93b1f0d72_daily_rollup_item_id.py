@@ -0,0 +1,61 @@
+"""search_events_daily: chosen_item_id in the rollup key
+
+Выборы конкретного item (chosen_item_id) переживают свёртку сырых событий,
+click-rank по item-ам видит всё окно CLICK_RANK_DAYS, а не только
+SEARCH_EVENTS_RETENTION_DAYS. 0 — без item. SQLite не меняет первичный ключ
+на месте, поэтому таблица пересоздаётся; прежние строки получают 0.
+
+Revision ID: e6a93b1f0d72
+Revises: d41c7e2b9a05
+Create Date: 2026-10-18 22:03:11.614270
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6a93b1f0d72'
+down_revision: Union[str, Sequence[str], None] = 'd41c7e2b9a05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = "day, lang, query_norm, chosen_route"
+
+
+def _create(name: str, with_item: bool) -> None:
+    key = ["day", "lang", "query_norm", "chosen_route"] + (["chosen_item_id"] if with_item else [])
+    op.create_table(
+        name,
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("lang", sa.String(length=5), nullable=False),
+        sa.Column("query_norm", sa.String(length=200), nullable=False),
+        sa.Column("chosen_route", sa.String(length=200), nullable=False, server_default=""),
+        *([sa.Column("chosen_item_id", sa.Integer(), nullable=False, server_default="0")] if with_item else []),
+        sa.Column("cnt", sa.Integer(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint(*key),
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _create("search_events_daily_new", with_item=True)
+    op.execute(
+        f"INSERT INTO search_events_daily_new ({COLUMNS}, chosen_item_id, cnt) "
+        f"SELECT {COLUMNS}, 0, cnt FROM search_events_daily"
+    )
+    op.drop_table("search_events_daily")
+    op.rename_table("search_events_daily_new", "search_events_daily")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _create("search_events_daily_old", with_item=False)
+    op.execute(
+        f"INSERT INTO search_events_daily_old ({COLUMNS}, cnt) "
+        f"SELECT {COLUMNS}, SUM(cnt) FROM search_events_daily GROUP BY {COLUMNS}"
+    )
+    op.drop_table("search_events_daily")
+    op.rename_table("search_events_daily_old", "search_events_daily")
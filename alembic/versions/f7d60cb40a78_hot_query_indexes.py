@@ -0,0 +1,107 @@
+"""hot query indexes + tables missing from init
+
+Revision ID: f7d60cb40a78
+Revises: 2a7712fa7221
+Create Date: 2026-10-18 10:05:21.418207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7d60cb40a78'
+down_revision: Union[str, Sequence[str], None] = '2a7712fa7221'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# таблицы ниже до этой ревизии создавал только create_all в lifespan —
+# на живых базах они уже есть, поэтому везде if_not_exists
+NEW_INDEXES = [
+    ("ix_reviews_status_featured_created", "reviews", ["status", "is_featured", "created_at"]),
+    ("ix_reviews_created_at", "reviews", ["created_at"]),
+    ("ix_contact_messages_status_read_created", "contact_messages", ["status", "is_read", "created_at"]),
+    ("ix_contact_messages_created_at", "contact_messages", ["created_at"]),
+    ("ix_search_events_lang_created_query", "search_events", ["lang", "created_at", "query_norm"]),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("email", sa.String(length=255), nullable=True),
+        sa.Column("phone", sa.String(length=40), nullable=True),
+        sa.Column("password_hash", sa.String(length=255), nullable=False),
+        sa.Column("role", sa.String(length=20), nullable=False, server_default="user"),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=True, server_default=sa.text("(CURRENT_TIMESTAMP)")),
+        sa.PrimaryKeyConstraint("id"),
+        if_not_exists=True,
+    )
+    op.create_index("ix_users_email", "users", ["email"], unique=True, if_not_exists=True)
+    op.create_index("ix_users_phone", "users", ["phone"], unique=True, if_not_exists=True)
+
+    op.create_table(
+        "search_events",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("query", sa.String(length=200), nullable=False),
+        sa.Column("query_norm", sa.String(length=200), nullable=False),
+        sa.Column("lang", sa.String(length=5), nullable=False, server_default="ua"),
+        sa.Column("session_id", sa.String(length=64), nullable=True),
+        sa.Column("chosen_route", sa.String(length=200), nullable=True),
+        sa.Column("chosen_item_id", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.text("(CURRENT_TIMESTAMP)")),
+        sa.PrimaryKeyConstraint("id"),
+        if_not_exists=True,
+    )
+    op.create_index("ix_search_events_query_norm", "search_events", ["query_norm"], if_not_exists=True)
+    op.create_index("ix_search_events_session_id", "search_events", ["session_id"], if_not_exists=True)
+
+    op.create_table(
+        "search_trending_daily",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("lang", sa.String(length=5), nullable=False),
+        sa.Column("query_norm", sa.String(length=200), nullable=False),
+        sa.Column("cnt", sa.Integer(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("day", "lang", "query_norm"),
+        if_not_exists=True,
+    )
+
+    op.create_table(
+        "search_events_daily",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("lang", sa.String(length=5), nullable=False),
+        sa.Column("query_norm", sa.String(length=200), nullable=False),
+        sa.Column("chosen_route", sa.String(length=200), nullable=False, server_default=""),
+        sa.Column("cnt", sa.Integer(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("day", "lang", "query_norm", "chosen_route"),
+        if_not_exists=True,
+    )
+
+    op.create_table(
+        "search_stats_hourly",
+        sa.Column("hour", sa.DateTime(), nullable=False),
+        sa.Column("lang", sa.String(length=5), nullable=False),
+        sa.Column("query_norm", sa.String(length=200), nullable=False),
+        sa.Column("chosen_route", sa.String(length=200), nullable=False, server_default=""),
+        sa.Column("zero_result", sa.Boolean(), nullable=False, server_default=sa.text("0")),
+        sa.Column("cnt", sa.Integer(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("hour", "lang", "query_norm", "chosen_route", "zero_result"),
+        if_not_exists=True,
+    )
+
+    for name, table, columns in NEW_INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _ in reversed(NEW_INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
+
+    for table in ("search_stats_hourly", "search_events_daily", "search_trending_daily", "search_events", "users"):
+        op.drop_table(table, if_exists=True)
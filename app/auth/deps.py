@@ -1,35 +1,53 @@
 import os
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
-from sqlalchemy.ext.asyncio import AsyncSession
+from jose import JWTError
 
+from app.auth.principal_cache import Principal, principal_cache
+from app.auth.revocation import revocations
+from app.auth.security import decode_token
 from app.models.user import User
 from app.database import AsyncSessionLocal
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
-JWT_SECRET = os.getenv("JWT_SECRET", "dev-secret-change-me")
-JWT_ALG = os.getenv("JWT_ALG", "HS256")
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "dev-token")
 
 async def get_db():
     async with AsyncSessionLocal() as s:
         yield s
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: AsyncSession = Depends(get_db),
-) -> User:
-    try:
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALG])
-        sub = payload.get("sub")
-        if not sub:
+def require_admin(x_admin_token: str | None):
+    if x_admin_token != ADMIN_TOKEN:
+        raise HTTPException(status_code=401, detail="Not authorized")
+
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> Principal:
+    """
+    Пользователь по Bearer-токену; на попадании в principal_cache — без БД.
+    Возвращает Principal (id, email, phone, role) — неизменяемый снимок, а не ORM-объект
+    User: он не привязан к сессии, и его нельзя менять/сохранять. Обработчику, которому
+    нужна строка users, — db.get(User, principal.id) в своей сессии.
+    """
+    claims = principal_cache.token_claims(token)
+    if claims is None:
+        try:
+            payload = decode_token(token)
+            user_id, jti = int(payload["sub"]), payload.get("jti")
+        except (JWTError, ValueError):
             raise HTTPException(401, "Invalid token")
-        user_id = int(sub)
-    except (JWTError, ValueError):
-        raise HTTPException(401, "Invalid token")
+        principal_cache.put_token(token, user_id, jti, payload.get("exp"))
+    else:
+        user_id, jti = claims
+    if revocations.is_revoked(jti):
+        raise HTTPException(401, "Token revoked")
 
-    u = await db.get(User, user_id)
-    if not u:
-        raise HTTPException(401, "User not found")
-    return u
+    p = principal_cache.principal(user_id)
+    if p is None:
+        generation = principal_cache.principals.generation
+        async with AsyncSessionLocal() as db:
+            u = await db.get(User, user_id)
+        if not u:
+            raise HTTPException(401, "User not found")
+        p = Principal.from_user(u)
+        principal_cache.put_principal(p, generation)
+    return p
@@ -0,0 +1,173 @@
+"""
+Локальная проверка Google ID-токена (Sign in with Google) по JWKS.
+
+Подпись RS256 проверяется ключами Google из GOOGLE_JWKS_URL, iss — одним
+из GOOGLE_ISSUERS, aud — GOOGLE_CLIENT_ID (если задан), exp — как обычно.
+Вход не ходит в tokeninfo: запрос к Google нужен только за ключами.
+
+Ключи кэшируются на max-age из Cache-Control ответа (минус Age) и
+обновляются фоновой задачей заранее; при ошибке остаются старые ключи,
+повтор — с растущей паузой. Неизвестный kid (Google сменил ключ раньше
+срока) — внеочередное обновление, не чаще GOOGLE_JWKS_MIN_REFRESH_SEC.
+Все запросы — через один долгоживущий httpx.AsyncClient (lifespan: start/stop).
+GOOGLE_JWKS_URL настраивается — тесты подставляют локальную заглушку
+(tests/stand_ins.py: JwksStandIn).
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import re
+import time
+
+import httpx
+from jose import jwt, JWTError
+
+log = logging.getLogger(__name__)
+
+GOOGLE_JWKS_URL = os.getenv("GOOGLE_JWKS_URL", "https://www.googleapis.com/oauth2/v3/certs").strip()
+GOOGLE_ISSUERS = tuple(
+    x.strip()
+    for x in os.getenv("GOOGLE_ISSUERS", "accounts.google.com,https://accounts.google.com").split(",")
+    if x.strip()
+)
+GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID", "").strip()
+GOOGLE_JWKS_DEFAULT_TTL_SEC = 3600  # ответ без max-age
+GOOGLE_JWKS_REFRESH_MARGIN_SEC = 300  # обновлять заранее
+GOOGLE_JWKS_MIN_REFRESH_SEC = 30
+GOOGLE_JWKS_TIMEOUT_SEC = float(os.getenv("GOOGLE_JWKS_TIMEOUT_SEC", "5"))
+
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+
+class GoogleTokenError(Exception):
+    pass
+
+
+def _ttl(resp: httpx.Response) -> float:
+    m = _MAX_AGE_RE.search(resp.headers.get("cache-control", ""))
+    if not m:
+        return GOOGLE_JWKS_DEFAULT_TTL_SEC
+    try:
+        age = int(resp.headers.get("age", "0"))
+    except ValueError:
+        age = 0
+    return max(0, int(m.group(1)) - age)
+
+
+class GoogleJwks:
+    def __init__(self, url: str = GOOGLE_JWKS_URL):
+        self.url = url
+        self.keys: dict[str, dict] = {}
+        self.expires_at = 0.0
+        self.fetches = 0
+        self._fetched_at = 0.0
+        self._client: httpx.AsyncClient | None = None
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Lifespan: общий клиент и фоновая загрузка/обновление (старт приложения не ждёт Google)."""
+        self._client = httpx.AsyncClient(timeout=GOOGLE_JWKS_TIMEOUT_SEC)
+        self._task = asyncio.create_task(self._refresher())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def refresh(self) -> None:
+        client = self._client or httpx.AsyncClient(timeout=GOOGLE_JWKS_TIMEOUT_SEC)
+        try:
+            resp = await client.get(self.url)
+            resp.raise_for_status()
+            keys = {k["kid"]: k for k in resp.json()["keys"] if k.get("kid")}
+        finally:
+            if client is not self._client:
+                await client.aclose()
+        if not keys:
+            raise GoogleTokenError("empty JWKS")
+        self.keys = keys
+        self._fetched_at = time.monotonic()
+        self.expires_at = self._fetched_at + _ttl(resp)
+        self.fetches += 1
+
+    async def _refresh_locked(self, force: bool) -> None:
+        async with self._lock:
+            now = time.monotonic()
+            # пока ждали lock, ключи мог обновить соседний запрос
+            if force and now - self._fetched_at < GOOGLE_JWKS_MIN_REFRESH_SEC:
+                return
+            if not force and self.keys and now < self.expires_at:
+                return
+            await self.refresh()
+
+    async def _refresher(self) -> None:
+        delay = 5.0
+        while True:
+            if self.keys:
+                wait = self.expires_at - time.monotonic() - GOOGLE_JWKS_REFRESH_MARGIN_SEC
+                await asyncio.sleep(max(GOOGLE_JWKS_MIN_REFRESH_SEC, wait))
+            try:
+                async with self._lock:
+                    await self.refresh()
+                delay = 5.0
+            except Exception as e:
+                log.warning("google jwks refresh failed: %s", e)
+                # старые ключи (если есть) остаются; следующая попытка — через delay
+                self.expires_at = time.monotonic() + delay + GOOGLE_JWKS_REFRESH_MARGIN_SEC
+                if not self.keys:
+                    await asyncio.sleep(delay)
+                delay = min(delay * 2, 600)
+
+    async def key(self, kid: str) -> dict:
+        if not self.keys or time.monotonic() >= self.expires_at:
+            try:
+                await self._refresh_locked(force=False)
+            except Exception as e:
+                if not self.keys:
+                    raise GoogleTokenError(f"cannot load Google keys: {e}") from None
+                log.warning("google jwks expired, refresh failed, using cached keys: %s", e)
+        k = self.keys.get(kid)
+        if k is None:
+            try:
+                await self._refresh_locked(force=True)
+            except Exception as e:
+                log.warning("google jwks refresh for unknown kid failed: %s", e)
+            k = self.keys.get(kid)
+        if k is None:
+            raise GoogleTokenError("unknown signing key")
+        return k
+
+    async def verify(self, credential: str, client_id: str = GOOGLE_CLIENT_ID) -> dict:
+        """Проверить ID-токен, вернуть claims (sub, email, aud, ...)."""
+        try:
+            header = jwt.get_unverified_header(credential)
+        except JWTError:
+            raise GoogleTokenError("malformed token") from None
+        if header.get("alg") != "RS256":
+            raise GoogleTokenError("unexpected algorithm")
+        key = await self.key(header.get("kid", ""))
+        try:
+            return jwt.decode(
+                credential,
+                key,
+                algorithms=["RS256"],
+                audience=client_id or None,
+                issuer=GOOGLE_ISSUERS,
+                options={"verify_aud": bool(client_id), "verify_at_hash": False},
+            )
+        except JWTError as e:
+            raise GoogleTokenError(str(e)) from None
+
+
+google_jwks = GoogleJwks()
+
@@ -0,0 +1,120 @@
+"""
+Кэш аутентифицированного пользователя для get_current_user.
+
+Два уровня, оба LRU с TTL:
+    claims     — токен -> (user_id, jti); живёт до exp токена, повторный jwt.decode не нужен;
+    principals — user_id -> Principal(id, email, phone, role); PRINCIPAL_CACHE_TTL_SEC.
+Попадание в оба — запрос без сессии и без обращения к БД.
+
+Удаление пользователя (delete_user / user_delete) и смена роли вызывают
+invalidate_user(id) — следующий запрос перечитает пользователя (и получит 401,
+если его нет). Кэш в памяти процесса: другие воркеры увидят изменение не позже
+чем через TTL. PRINCIPAL_CACHE_TTL_SEC=0 выключает кэш.
+"""
+from __future__ import annotations
+
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Hashable
+
+PRINCIPAL_CACHE_TTL_SEC = float(os.getenv("PRINCIPAL_CACHE_TTL_SEC", "60"))
+PRINCIPAL_CACHE_MAX = int(os.getenv("PRINCIPAL_CACHE_MAX", "10000"))
+
+
+@dataclass(frozen=True)
+class Principal:
+    id: int
+    email: str | None
+    phone: str | None
+    role: str
+
+    @classmethod
+    def from_user(cls, u) -> Principal:
+        return cls(id=u.id, email=u.email, phone=u.phone, role=u.role)
+
+
+class TtlLru:
+    def __init__(self, name: str, maxsize: int = PRINCIPAL_CACHE_MAX):
+        self.name = name
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.generation = 0
+        self._items: OrderedDict[Hashable, tuple[Any, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key: Hashable) -> Any | None:
+        item = self._items.get(key)
+        if item is not None:
+            if item[1] > time.time():
+                self._items.move_to_end(key)
+                self.hits += 1
+                return item[0]
+            del self._items[key]
+        self.misses += 1
+        return None
+
+    def put(self, key: Hashable, value: Any, expires_at: float, generation: int | None = None) -> None:
+        """generation — значение self.generation до чтения из БД: если между ними была инвалидация, не кладём."""
+        if generation is not None and generation != self.generation:
+            return
+        if expires_at <= time.time() or self.maxsize <= 0:
+            return
+        self._items[key] = (value, expires_at)
+        self._items.move_to_end(key)
+        while len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        self.generation += 1
+        self._items.pop(key, None)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "name": self.name,
+            "version": self.generation,
+            "entries": len(self._items),
+            "hits": self.hits,
+            "stale_hits": 0,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+class PrincipalCache:
+    def __init__(self, ttl_sec: float = PRINCIPAL_CACHE_TTL_SEC, maxsize: int = PRINCIPAL_CACHE_MAX):
+        self.ttl_sec = ttl_sec
+        self.claims = TtlLru("jwt-claims", maxsize if ttl_sec > 0 else 0)
+        self.principals = TtlLru("principals", maxsize if ttl_sec > 0 else 0)
+
+    def token_claims(self, token: str) -> tuple[int, str | None] | None:
+        """(user_id, jti) уже проверенного токена."""
+        return self.claims.get(token)
+
+    def put_token(self, token: str, user_id: int, jti: str | None, exp: float | None) -> None:
+        self.claims.put(token, (user_id, jti), exp if exp is not None else time.time() + self.ttl_sec)
+
+    def principal(self, user_id: int) -> Principal | None:
+        return self.principals.get(user_id)
+
+    def put_principal(self, p: Principal, generation: int) -> None:
+        self.principals.put(p.id, p, time.time() + self.ttl_sec, generation)
+
+    def invalidate_user(self, user_id: int) -> None:
+        self.principals.pop(user_id)
+
+    def stats(self) -> list[dict]:
+        return [self.claims.stats(), self.principals.stats()]
+
+
+principal_cache = PrincipalCache()
+
+
+def invalidate_user(user_id: int) -> None:
+    """Вызывать после commit удаления пользователя или смены его роли."""
+    principal_cache.invalidate_user(user_id)
@@ -0,0 +1,129 @@
+"""
+Отзыв JWT по jti: logout и ротация refresh-токенов.
+
+Refresh-токен одноразовый: POST /api/auth/refresh отзывает его jti и выдаёт
+новую пару с тем же fam (семейство — цепочка ротаций одного входа). Проверка
+и отзыв — один INSERT ... ON CONFLICT DO NOTHING RETURNING по unique jti:
+из двух одновременных /refresh с одним токеном (в любых воркерах) выигрывает
+ровно один. Повторное предъявление уже использованного токена — признак
+утечки: отзывается всё семейство, в том числе токен, выданный «настоящему»
+клиенту. Для refresh источник истины — только БД.
+
+Access-токены проверяются на каждом запросе (get_current_user), поэтому их
+отозванные jti держатся в памяти: dict jti -> exp, проверка — O(1) lookup.
+Это точное множество, не Bloom-фильтр: в нём только logout'ы за последние
+ACCESS_TTL_MIN минут. Строки из revoked_tokens подтягиваются по id раз в
+REVOCATION_SYNC_SEC (logout в другом воркере начинает действовать не позже
+этого), в своём процессе — сразу. Истёкшие записи вычищаются из памяти и из
+БД раз в REVOCATION_PURGE_MIN минут: отзывать токен после его exp незачем.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+
+from sqlalchemy import delete, exists, literal, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth.security import REFRESH_TTL_DAYS
+from app.database import AsyncSessionLocal
+from app.models.user import RevokedToken
+
+log = logging.getLogger(__name__)
+
+REVOCATION_SYNC_SEC = float(os.getenv("REVOCATION_SYNC_SEC", "5"))
+REVOCATION_PURGE_MIN = int(os.getenv("REVOCATION_PURGE_MIN", "60"))
+
+
+class RevocationStore:
+    def __init__(self):
+        self._access: dict[str, float] = {}  # jti -> exp
+        self._last_id = 0
+
+    def __len__(self) -> int:
+        return len(self._access)
+
+    def is_revoked(self, jti: str | None) -> bool:
+        return jti is not None and jti in self._access
+
+    async def revoke_access(self, db: AsyncSession, jti: str, user_id: int, exp: int) -> None:
+        """Отозвать access-токен (logout). Commit — на вызывающем."""
+        await db.execute(
+            sqlite_insert(RevokedToken)
+            .values(jti=jti, kind="access", user_id=user_id, expires_at=exp)
+            .on_conflict_do_nothing(index_elements=["jti"])
+        )
+        self._access[jti] = exp
+
+    async def revoke_family(self, db: AsyncSession, family: str, user_id: int) -> None:
+        # живые токены семейства истекают не позже, чем через REFRESH_TTL_DAYS
+        exp = int(time.time()) + REFRESH_TTL_DAYS * 86400
+        await db.execute(
+            sqlite_insert(RevokedToken)
+            .values(jti=family, kind="family", user_id=user_id, expires_at=exp)
+            .on_conflict_do_nothing(index_elements=["jti"])
+        )
+
+    async def use_refresh(self, db: AsyncSession, jti: str, family: str, user_id: int, exp: int) -> bool:
+        """
+        Погасить refresh-токен. True — токен был действующим и теперь отозван;
+        False — уже использован или семейство отозвано (семейство отзывается).
+        """
+        family_revoked = exists().where(RevokedToken.jti == family)
+        row = await db.execute(
+            sqlite_insert(RevokedToken)
+            .from_select(
+                ["jti", "kind", "user_id", "expires_at"],
+                select(literal(jti), literal("refresh"), literal(user_id), literal(exp)).where(~family_revoked),
+            )
+            .on_conflict_do_nothing(index_elements=["jti"])
+            .returning(RevokedToken.id)
+        )
+        if row.first() is not None:
+            return True
+        await self.revoke_family(db, family, user_id)
+        return False
+
+    async def load(self) -> int:
+        """Подтянуть новые отзывы access-токенов (в т.ч. из других воркеров)."""
+        now = int(time.time())
+        async with AsyncSessionLocal() as db:
+            rows = (await db.execute(
+                select(RevokedToken.id, RevokedToken.jti, RevokedToken.kind, RevokedToken.expires_at)
+                .where(RevokedToken.id > self._last_id)
+                .order_by(RevokedToken.id)
+            )).all()
+        for id_, jti, kind, exp in rows:
+            self._last_id = id_
+            if kind == "access" and exp > now:
+                self._access[jti] = exp
+        return len(rows)
+
+    async def purge(self) -> int:
+        now = int(time.time())
+        self._access = {jti: exp for jti, exp in self._access.items() if exp > now}
+        async with AsyncSessionLocal() as db:
+            res = await db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= now))
+            await db.commit()
+        return res.rowcount
+
+    async def refresher(self) -> None:
+        """Фоновая задача lifespan: синхронизация и чистка."""
+        last_purge = time.monotonic()
+        while True:
+            await asyncio.sleep(REVOCATION_SYNC_SEC)
+            try:
+                await self.load()
+                if time.monotonic() - last_purge >= REVOCATION_PURGE_MIN * 60:
+                    last_purge = time.monotonic()
+                    purged = await self.purge()
+                    if purged:
+                        log.info("revoked tokens purged: %d", purged)
+            except Exception:
+                log.exception("revocation sync failed")
+
+
+revocations = RevocationStore()
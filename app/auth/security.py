@@ -1,21 +1,103 @@
 from datetime import datetime, timedelta
 from passlib.context import CryptContext
-from jose import jwt
+from jose import jwt, JWTError
+import asyncio
 import os
+import secrets
+from concurrent.futures import ThreadPoolExecutor
 
-pwd = CryptContext(schemes=["argon2"], deprecated="auto")
+# Параметры argon2 (по умолчанию — как у passlib, существующие хэши не трогаются).
+# После изменения старые хэши пересчитываются при успешном входе (verify_and_update).
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "3"))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", "65536"))  # KiB
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "4"))
+
+# argon2 — C-код без GIL: в пуле потоков он не блокирует event loop.
+# ARGON2_WORKERS ограничивает CPU и память (ARGON2_MEMORY_COST на поток),
+# ARGON2_QUEUE_MAX — сколько хэшей может ждать/считаться; сверх — сразу отказ.
+ARGON2_WORKERS = int(os.getenv("ARGON2_WORKERS", "2"))
+ARGON2_QUEUE_MAX = int(os.getenv("ARGON2_QUEUE_MAX", "16"))
+
+# синхронный CryptContext наружу не отдаётся: хэшировать и проверять — только через password_hasher
+_pwd = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    argon2__rounds=ARGON2_TIME_COST,
+    argon2__memory_cost=ARGON2_MEMORY_COST,
+    argon2__parallelism=ARGON2_PARALLELISM,
+)
 
 JWT_SECRET = os.getenv("JWT_SECRET", "dev-secret-change-me")
 JWT_ALG = os.getenv("JWT_ALG", "HS256")
 ACCESS_TTL_MIN = int(os.getenv("ACCESS_TTL_MIN", "60"))
+REFRESH_TTL_DAYS = int(os.getenv("REFRESH_TTL_DAYS", "30"))
+
+class PasswordHasherBusy(Exception):
+    pass
+
+
+class PasswordHasher:
+    """Ограниченный пул для argon2: ARGON2_WORKERS потоков, не больше queue_max задач."""
+
+    def __init__(
+        self,
+        workers: int = ARGON2_WORKERS,
+        queue_max: int = ARGON2_QUEUE_MAX,
+        context: CryptContext = _pwd,
+    ):
+        self.workers = workers
+        self.context = context
+        self.queue_max = max(queue_max, workers)
+        self.rejected = 0
+        self._pending = 0
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="argon2")
+
+    @property
+    def pending(self) -> int:
+        return self._pending
 
-def hash_password(p: str) -> str:
-    return pwd.hash(p)
+    async def _run(self, fn, *args):
+        # счётчик трогается только из event loop — без блокировок
+        if self._pending >= self.queue_max:
+            self.rejected += 1
+            raise PasswordHasherBusy()
+        self._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._pool, fn, *args)
+        finally:
+            self._pending -= 1
 
-def verify_password(p: str, hashed: str) -> bool:
-    return pwd.verify(p, hashed)
+    async def hash(self, p: str) -> str:
+        return await self._run(self.context.hash, p)
+
+    async def verify_and_update(self, p: str, hashed: str) -> tuple[bool, str | None]:
+        """(верен ли пароль, новый хэш — если параметры argon2 поменялись)."""
+        return await self._run(self.context.verify_and_update, p, hashed)
+
+
+password_hasher = PasswordHasher()
+
+
+def new_jti() -> str:
+    return secrets.token_urlsafe(16)
 
 def create_access_token(sub: str) -> str:
     exp = datetime.utcnow() + timedelta(minutes=ACCESS_TTL_MIN)
-    payload = {"sub": sub, "exp": exp}
-    return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALG)
\ No newline at end of file
+    payload = {"sub": sub, "exp": exp, "jti": new_jti()}
+    return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALG)
+
+def create_refresh_token(sub: str, family: str | None = None) -> str:
+    """family (fam) — id цепочки ротаций одного входа, при ротации переходит в новый токен."""
+    exp = datetime.utcnow() + timedelta(days=REFRESH_TTL_DAYS)
+    payload = {"sub": sub, "exp": exp, "jti": new_jti(), "fam": family or new_jti(), "typ": "refresh"}
+    return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALG)
+
+def decode_token(token: str, typ: str = "access") -> dict:
+    """Подпись, exp и тип токена; JWTError, если что-то не так."""
+    payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALG])
+    if payload.get("typ", "access") != typ or not payload.get("sub"):
+        raise JWTError("wrong token type")
+    # access-токены без jti (выданы до ротации) живут до exp, отозвать их нельзя
+    if typ == "refresh" and not (payload.get("jti") and payload.get("fam")):
+        raise JWTError("malformed refresh token")
+    return payload
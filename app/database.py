@@ -19,3 +19,13 @@ AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
 
 class Base(DeclarativeBase):
     pass
+
+
+def ensure_indexes(conn) -> None:
+    """
+    create_all создаёт индексы только вместе с новой таблицей; индексы,
+    добавленные в __table_args__ позже, докатываем на уже существующие (sync conn).
+    """
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
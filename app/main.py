@@ -1,24 +1,74 @@
 from dotenv import load_dotenv
 load_dotenv()
 
+import asyncio
 import os
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.database import engine, Base
+from app.auth.google_jwks import google_jwks
+from app.auth.revocation import REVOCATION_SYNC_SEC, revocations
+from app.database import engine, Base, ensure_indexes
 from app.routers import contact, services, reviews, search
 from app.routers.auth import router as auth_router
 from app.routers.admin import router as admin_router
+from app.utils.click_rank import CLICK_RANK_REFRESH_MIN, click_rank_refresher, refresh_click_rank
+from app.utils.fts import ensure_fts
+from app.utils.outbox import OUTBOX_WORKER, ensure_outbox, outbox_worker
+from app.utils.review_stats import ensure_review_stats
+from app.utils.search_log_writer import search_log_writer
+from app.utils.search_stats import backfill_stats
+from app.utils.search_maintenance import SEARCH_MAINTENANCE_INTERVAL_MIN, search_maintenance_loop
+from app.utils.sentiment_backfill import SENTIMENT_RESCORE_ON_START, rescore_on_start
+from app.utils.trending import TRENDING_EDGE_REFRESH_SEC, load_trending, trending_edge_refresher
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(ensure_indexes)
+        await ensure_fts(conn)
+        await ensure_review_stats(conn)
+        await ensure_outbox(conn)
+    await search.rebuild_suggest_index()
+    await backfill_stats()
+    await load_trending()
+    await refresh_click_rank()
+    await revocations.load()
+
+    search_log_writer.start()
+    google_jwks.start()
+    if OUTBOX_WORKER:
+        outbox_worker.start()
+
+    tasks: list[asyncio.Task] = []
+    if search.SUGGEST_INDEX_REFRESH_SEC > 0:
+        tasks.append(asyncio.create_task(search.suggest_index_refresher()))
+    if CLICK_RANK_REFRESH_MIN > 0:
+        tasks.append(asyncio.create_task(click_rank_refresher()))
+    if TRENDING_EDGE_REFRESH_SEC > 0:
+        tasks.append(asyncio.create_task(trending_edge_refresher()))
+    if SEARCH_MAINTENANCE_INTERVAL_MIN > 0:
+        tasks.append(asyncio.create_task(search_maintenance_loop()))
+    if REVOCATION_SYNC_SEC > 0:
+        tasks.append(asyncio.create_task(revocations.refresher()))
+    if SENTIMENT_RESCORE_ON_START:
+        tasks.append(asyncio.create_task(rescore_on_start(reviews.reviews_changed)))
+
     yield
 
+    for t in tasks:
+        t.cancel()
+    for t in tasks:
+        with suppress(asyncio.CancelledError):
+            await t
+    await search_log_writer.stop()
+    await outbox_worker.stop()
+    await google_jwks.stop()
+
 
 def cors_origins() -> list[str]:
     raw = os.getenv("CORS_ORIGINS", "")
@@ -37,6 +87,7 @@ def cors_origins() -> list[str]:
 
 app = FastAPI(
     title="LebedI",
+    version="0.2.0",
     lifespan=lifespan,
     docs_url="/api/docs",
     openapi_url="/api/openapi.json",
@@ -1,2 +1,2 @@
-from .models import ContactMessage, ServiceItem, Review
-from .user import User
\ No newline at end of file
+from .models import ContactMessage, OutboxEvent, ServiceItem, Review, ReviewStats, SearchEvent, SearchEventDaily, SearchStatsHourly
+from .user import RevokedToken, User
\ No newline at end of file
@@ -1,8 +1,8 @@
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import date, datetime
 
-from sqlalchemy import String, Text, DateTime, Boolean, Integer, text
+from sqlalchemy import String, Text, Date, DateTime, Boolean, Integer, Index, text
 from sqlalchemy import text as sa_text
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.sql import func
@@ -12,6 +12,12 @@ from app.database import Base
 
 class ContactMessage(Base):
     __tablename__ = "contact_messages"
+    __table_args__ = (
+        # /api/contact/all: status=? AND is_read=? ORDER BY created_at DESC, id DESC
+        Index("ix_contact_messages_status_read_created", "status", "is_read", "created_at"),
+        # то же без фильтра по status
+        Index("ix_contact_messages_created_at", "created_at"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
 
@@ -33,6 +39,41 @@ class ContactMessage(Base):
         Boolean, nullable=False, default=False, server_default=text("0")
     )
 
+class OutboxEvent(Base):
+    """
+    Transactional outbox: уведомление о событии (новая заявка и т.п.) пишется
+    той же транзакцией, что и само событие (триггер); доставляет app.utils.outbox.
+    channel='fanout' — строка триггера, воркер раскладывает её на строки по каналам
+    (webhook | viber | smtp), повторы у каналов независимы.
+    status: pending | sent | failed. next_attempt_at — когда пробовать снова
+    (и аренда на время доставки).
+    """
+    __tablename__ = "outbox_events"
+    __table_args__ = (
+        # воркер: status='pending' AND next_attempt_at<=? ORDER BY next_attempt_at
+        Index("ix_outbox_events_status_next", "status", "next_attempt_at"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+
+    kind: Mapped[str] = mapped_column(String(40), nullable=False)
+    ref_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    channel: Mapped[str] = mapped_column(String(20), nullable=False)
+    payload: Mapped[str] = mapped_column(Text, nullable=False)  # JSON
+
+    status: Mapped[str] = mapped_column(String(20), nullable=False, server_default=text("'pending'"))
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, default=datetime.utcnow, server_default=func.now()
+    )
+    next_attempt_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, default=datetime.utcnow, server_default=func.now()
+    )
+    sent_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+
 class ServiceItem(Base):
     """
     Контент для фронта: услуги/направления.
@@ -70,6 +111,12 @@ class ServiceItem(Base):
 
 class Review(Base):
     __tablename__ = "reviews"
+    __table_args__ = (
+        # публичная лента: status='published' ORDER BY is_featured DESC, created_at DESC
+        Index("ix_reviews_status_featured_created", "status", "is_featured", "created_at"),
+        # /api/reviews/all: keyset по (created_at, id)
+        Index("ix_reviews_created_at", "created_at"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
 
@@ -103,8 +150,27 @@ class Review(Base):
     )
 
 
+class ReviewStats(Base):
+    """
+    Сводка по отзывам: (status, sentiment) -> количество и сумма оценок.
+    Ведётся триггерами на reviews (app.utils.review_stats) в той же транзакции,
+    что и запись отзыва. sentiment = '' — отзыв без sentiment.
+    """
+    __tablename__ = "review_stats"
+
+    status: Mapped[str] = mapped_column(String(20), primary_key=True)
+    sentiment: Mapped[str] = mapped_column(String(20), primary_key=True, server_default="")
+
+    cnt: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    rating_sum: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+
+
 class SearchEvent(Base):
     __tablename__ = "search_events"
+    __table_args__ = (
+        # окно по языку (крайний час trending, аналитика): lang=? AND created_at в диапазоне — покрывающий
+        Index("ix_search_events_lang_created_query", "lang", "created_at", "query_norm"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
 
@@ -119,4 +185,38 @@ class SearchEvent(Base):
 
     created_at: Mapped[datetime] = mapped_column(
         DateTime, nullable=False, server_default=func.now()
-    )
\ No newline at end of file
+    )
+
+
+class SearchEventDaily(Base):
+    """
+    Сжатая история search_events: сырые события старше срока хранения
+    сворачиваются сюда (app.utils.search_maintenance) и удаляются.
+    chosen_route = '' — поиск без перехода, chosen_item_id = 0 — без выбора item.
+    """
+    __tablename__ = "search_events_daily"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    lang: Mapped[str] = mapped_column(String(5), primary_key=True)
+    query_norm: Mapped[str] = mapped_column(String(200), primary_key=True)
+    chosen_route: Mapped[str] = mapped_column(String(200), primary_key=True, server_default="")
+    chosen_item_id: Mapped[int] = mapped_column(Integer, primary_key=True, server_default="0")
+
+    cnt: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+
+
+class SearchStatsHourly(Base):
+    """
+    Почасовые агрегаты для аналитики поиска (app.utils.search_stats).
+    Пишутся вместе с search_events пачкой, аналитика не сканирует сырые события.
+    zero_result — по запросу не нашлось ни одной подсказки.
+    """
+    __tablename__ = "search_stats_hourly"
+
+    hour: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+    lang: Mapped[str] = mapped_column(String(5), primary_key=True)
+    query_norm: Mapped[str] = mapped_column(String(200), primary_key=True)
+    chosen_route: Mapped[str] = mapped_column(String(200), primary_key=True, server_default="")
+    zero_result: Mapped[bool] = mapped_column(Boolean, primary_key=True, server_default=text("0"))
+
+    cnt: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import String, DateTime, func, Integer, Boolean
+from sqlalchemy import String, DateTime, func, Integer, Boolean, Index
 from app.database import Base
 
 class User(Base):
@@ -15,3 +15,22 @@ class User(Base):
     role: Mapped[str] = mapped_column(String(20), nullable=False, server_default="user")
 
     created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
+class RevokedToken(Base):
+    """
+    Отозванные jti (app.auth.revocation). kind: access — токен доступа (logout),
+    refresh — использованный при ротации refresh-токен, family — вся цепочка
+    ротаций (logout или повторное использование refresh-токена).
+    expires_at — unix time, не раньше exp самого токена; после него строка не нужна.
+    """
+    __tablename__ = "revoked_tokens"
+    __table_args__ = (
+        Index("ix_revoked_tokens_expires_at", "expires_at"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    jti: Mapped[str] = mapped_column(String(32), unique=True, nullable=False)
+    kind: Mapped[str] = mapped_column(String(10), nullable=False)
+    user_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    expires_at: Mapped[int] = mapped_column(Integer, nullable=False)
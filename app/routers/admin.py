@@ -1,13 +1,30 @@
 import os
-print("ADMIN_BOOTSTRAP_SECRET =", repr(os.getenv("ADMIN_BOOTSTRAP_SECRET")))
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime, timedelta
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
 from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import AsyncSessionLocal
 from app.models.user import User
-from app.auth.security import hash_password
-from app.schemas.admin import AdminBootstrapIn, UserOut
+from app.auth.deps import require_admin
+from app.auth.principal_cache import invalidate_user, principal_cache
+from app.auth.security import PasswordHasherBusy, password_hasher
+from app.routers.auth import hasher_busy, user_conflict
+from app.schemas.admin import (
+    AdminBootstrapIn, UserOut,
+    SearchQueryStat, SearchTopOut, RouteCtr, SearchCtrOut, VolumePoint, SearchVolumeOut,
+    CacheStat, OutboxStat,
+)
+from app.utils import search_stats
+from app.schemas.pagination import Page
+from app.utils.fast_json import json_response
+from app.utils.pagination import PAGE_DEFAULT, PAGE_MAX, keyset_page
+from app.utils.outbox import outbox_counts
+from app.utils.rate_limit import limiter
+from app.utils.response_cache import cache_stats
+from app.utils.writes import insert_returning
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
 
@@ -35,36 +52,37 @@ async def bootstrap_admin(payload: AdminBootstrapIn, db: AsyncSession = Depends(
     if not payload.email and not payload.phone:
         raise HTTPException(400, "Provide email or phone")
 
-    if payload.email:
-        exists = await db.scalar(select(User).where(User.email == payload.email))
-        if exists:
-            raise HTTPException(409, "Email already used")
-
-    if payload.phone:
-        exists = await db.scalar(select(User).where(User.phone == payload.phone))
-        if exists:
-            raise HTTPException(409, "Phone already used")
-
-    u = User(
-        email=payload.email,
-        phone=payload.phone,
-        password_hash=hash_password(payload.password),
-        role="admin",
-    )
-    db.add(u)
-    await db.commit()
-    await db.refresh(u)
+    try:
+        password_hash = await password_hasher.hash(payload.password)
+    except PasswordHasherBusy:
+        raise hasher_busy()
 
-    return u
+    try:
+        u = await insert_returning(db, User, dict(
+            email=payload.email,
+            phone=payload.phone,
+            password_hash=password_hash,
+            role="admin",
+        ))
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        raise user_conflict(e)
+
+    return json_response(u, UserOut)
 
 
 # -------------------------
 # 2) Get all users
 # -------------------------
-@router.get("/users", response_model=list[UserOut])
-async def list_users(db: AsyncSession = Depends(get_db)):
-    res = await db.execute(select(User).order_by(User.id.desc()))
-    return res.scalars().all()
+@router.get("/users", response_model=Page[UserOut])
+async def list_users(
+    cursor: str | None = None,
+    limit: int = Query(PAGE_DEFAULT, ge=1, le=PAGE_MAX),
+    db: AsyncSession = Depends(get_db),
+):
+    page = await keyset_page(db, select(User), [User.id], cursor, limit)
+    return json_response(page, Page[UserOut])
 
 
 # -------------------------
@@ -75,7 +93,7 @@ async def get_user(user_id: int, db: AsyncSession = Depends(get_db)):
     u = await db.get(User, user_id)
     if not u:
         raise HTTPException(404, "User not found")
-    return u
+    return json_response(u, UserOut)
 
 
 # -------------------------
@@ -89,4 +107,103 @@ async def delete_user(user_id: int, db: AsyncSession = Depends(get_db)):
 
     await db.delete(u)
     await db.commit()
+    invalidate_user(user_id)
     return {"ok": True, "deleted_id": user_id}
+
+
+# -------------------------
+# 5) Search analytics (search_stats_hourly + search_events_daily)
+# -------------------------
+class SearchRange:
+    def __init__(
+        self,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        lang: str | None = Query(None, pattern="^(ua|ru)$"),
+        x_admin_token: str | None = Header(default=None),
+    ):
+        require_admin(x_admin_token)
+        self.until = until or datetime.utcnow()
+        self.since = since or self.until - timedelta(days=7)
+        self.lang = lang
+
+
+@router.get("/search/top", response_model=SearchTopOut)
+async def search_top(
+    r: SearchRange = Depends(),
+    limit: int = Query(20, ge=1, le=200),
+    db: AsyncSession = Depends(get_db),
+):
+    rows = await search_stats.top_queries(db, r.since, r.until, r.lang, limit)
+    return json_response(SearchTopOut(
+        since=r.since, until=r.until,
+        items=[SearchQueryStat(query_norm=q, cnt=n) for q, n in rows],
+    ))
+
+
+@router.get("/search/zero-results", response_model=SearchTopOut)
+async def search_zero_results(
+    r: SearchRange = Depends(),
+    limit: int = Query(20, ge=1, le=200),
+    db: AsyncSession = Depends(get_db),
+):
+    rows = await search_stats.top_queries(db, r.since, r.until, r.lang, limit, zero_only=True)
+    return json_response(SearchTopOut(
+        since=r.since, until=r.until,
+        items=[SearchQueryStat(query_norm=q, cnt=n) for q, n in rows],
+    ))
+
+
+@router.get("/search/ctr", response_model=SearchCtrOut)
+async def search_ctr(r: SearchRange = Depends(), db: AsyncSession = Depends(get_db)):
+    total, rows = await search_stats.route_clicks(db, r.since, r.until, r.lang)
+    return json_response(SearchCtrOut(
+        since=r.since, until=r.until, searches=total,
+        routes=[RouteCtr(route=route, clicks=n, ctr=round(n / total, 4) if total else 0.0) for route, n in rows],
+    ))
+
+
+@router.get("/search/volume", response_model=SearchVolumeOut)
+async def search_volume(
+    r: SearchRange = Depends(),
+    bucket: str = Query("day", pattern="^(hour|day)$"),
+    db: AsyncSession = Depends(get_db),
+):
+    rows = await search_stats.volume(db, r.since, r.until, r.lang, bucket)
+    return json_response(SearchVolumeOut(
+        since=r.since, until=r.until, bucket=bucket,
+        points=[VolumePoint(bucket=b, lang=lang, cnt=n) for b, lang, n in rows],
+    ))
+
+
+# -------------------------
+# Кэши ответов: попадания/промахи
+# -------------------------
+@router.get("/cache", response_model=list[CacheStat])
+async def cache_counters(x_admin_token: str | None = Header(default=None)):
+    require_admin(x_admin_token)
+    return json_response([*cache_stats(), *principal_cache.stats()], list[CacheStat])
+
+
+# -------------------------
+# Outbox уведомлений: очередь по каналам
+# -------------------------
+@router.get("/outbox", response_model=list[OutboxStat])
+async def outbox_state(
+    db: AsyncSession = Depends(get_db),
+    x_admin_token: str | None = Header(default=None),
+):
+    require_admin(x_admin_token)
+    rows = await outbox_counts(db)
+    return json_response(
+        [OutboxStat(channel=c, status=s, cnt=n, oldest=t) for c, s, n, t in rows], list[OutboxStat]
+    )
+
+
+# -------------------------
+# Rate limit: пропущено/отбито по политикам (этот процесс)
+# -------------------------
+@router.get("/rate-limits")
+async def rate_limit_counters(x_admin_token: str | None = Header(default=None)):
+    require_admin(x_admin_token)
+    return json_response(limiter.stats(), dict)
@@ -1,17 +1,28 @@
 import os
 import secrets
-import httpx
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy import select, or_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from jose import JWTError
 
 from app.database import AsyncSessionLocal
 from app.models.user import User
-from app.schemas.auth import RegisterIn, LoginIn, TokenOut, MeOut, GoogleVerifyIn
-from app.auth.security import hash_password, verify_password, create_access_token
-from app.auth.deps import get_current_user
+from app.schemas.auth import RegisterIn, LoginIn, TokenOut, MeOut, GoogleVerifyIn, UserBriefOut, RefreshIn, LogoutIn
+from app.auth.security import (
+    PasswordHasherBusy, create_access_token, create_refresh_token, decode_token, password_hasher,
+)
+from app.auth.deps import get_current_user, oauth2_scheme
+from app.auth.revocation import revocations
+from app.auth.google_jwks import GoogleTokenError, google_jwks
+from app.auth.principal_cache import Principal, invalidate_user
 from app.schemas.auth import MeOut
+from app.schemas.pagination import Page
+from app.utils.fast_json import json_response
+from app.utils.pagination import PAGE_DEFAULT, PAGE_MAX, keyset_page
+from app.utils.rate_limit import rate_limit
+from app.utils.writes import insert_returning, unique_violation
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
@@ -21,117 +32,175 @@ async def get_db():
 
 GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID", "").strip()
 
+
+def hasher_busy() -> HTTPException:
+    return HTTPException(503, "Server busy, retry later", headers={"Retry-After": "1"})
+
+
+def user_conflict(e: IntegrityError) -> HTTPException:
+    """409 по UNIQUE users.email / users.phone (вместо SELECT перед INSERT)."""
+    column = unique_violation(e)
+    if column == "email":
+        return HTTPException(409, "Email already used")
+    if column == "phone":
+        return HTTPException(409, "Phone already used")
+    raise e
+
+
+def issue_tokens(user_id: int, family: str | None = None) -> TokenOut:
+    sub = str(user_id)
+    return TokenOut(access_token=create_access_token(sub), refresh_token=create_refresh_token(sub, family))
+
 # ---------- email/phone register ----------
-@router.post("/register", response_model=TokenOut)
+@router.post("/register", response_model=TokenOut, dependencies=[Depends(rate_limit("auth_register"))])
 async def register(payload: RegisterIn, db: AsyncSession = Depends(get_db)):
     if not payload.email and not payload.phone:
         raise HTTPException(400, "Provide email or phone")
     if len(payload.password) < 6:
         raise HTTPException(400, "Password too short")
 
-    if payload.email:
-        exists = await db.scalar(select(User).where(User.email == payload.email))
-        if exists:
-            raise HTTPException(409, "Email already used")
-
-    if payload.phone:
-        exists = await db.scalar(select(User).where(User.phone == payload.phone))
-        if exists:
-            raise HTTPException(409, "Phone already used")
+    try:
+        password_hash = await password_hasher.hash(payload.password)
+    except PasswordHasherBusy:
+        raise hasher_busy()
 
-    u = User(email=payload.email, phone=payload.phone, password_hash=hash_password(payload.password))
-    db.add(u)
-    await db.commit()
-    await db.refresh(u)
+    # занятые email/phone ловит UNIQUE — один INSERT, без SELECT перед ним
+    try:
+        u = await insert_returning(
+            db, User, {"email": payload.email, "phone": payload.phone, "password_hash": password_hash}
+        )
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        raise user_conflict(e)
 
-    token = create_access_token(str(u.id))
-    return {"access_token": token, "token_type": "bearer"}
+    return json_response(issue_tokens(u.id))
 
 
 # ---------- email/phone login ----------
-@router.post("/login", response_model=TokenOut)
+@router.post("/login", response_model=TokenOut, dependencies=[Depends(rate_limit("auth_login"))])
 async def login(payload: LoginIn, db: AsyncSession = Depends(get_db)):
     q = select(User).where(or_(User.email == payload.login, User.phone == payload.login))
     u = await db.scalar(q)
 
-    if not u or not verify_password(payload.password, u.password_hash):
+    if not u:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    try:
+        ok, new_hash = await password_hasher.verify_and_update(payload.password, u.password_hash)
+    except PasswordHasherBusy:
+        raise hasher_busy()
+    if not ok:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    if new_hash:
+        # параметры ARGON2_* поменялись — тихо перехэшировать
+        u.password_hash = new_hash
+        await db.commit()
 
-    token = create_access_token(str(u.id))
-    return {"access_token": token, "token_type": "bearer"}
+    return json_response(issue_tokens(u.id))
 
 
 # ---------- Google verify (ScanText-style) ----------
-@router.post("/google/verify", response_model=TokenOut)
+@router.post("/google/verify", response_model=TokenOut, dependencies=[Depends(rate_limit("auth_login"))])
 async def google_verify(payload: GoogleVerifyIn, db: AsyncSession = Depends(get_db)):
     if not payload.credential:
         raise HTTPException(400, "Missing credential")
 
-    # 🔎 Проверка ID-токена через Google
-    url = "https://oauth2.googleapis.com/tokeninfo"
-
-    async with httpx.AsyncClient(timeout=15) as client:
-        resp = await client.get(url, params={"id_token": payload.credential})
-
-    if resp.status_code != 200:
-        raise HTTPException(401, detail=f"Google token invalid: {resp.text}")
-
-    data = resp.json()
-
-    # защита: токен должен быть выдан твоему приложению
-    GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID", "").strip()
-    aud = data.get("aud")
-    if GOOGLE_CLIENT_ID and aud != GOOGLE_CLIENT_ID:
-        raise HTTPException(401, "Google token has wrong audience")
+    # 🔎 Проверка ID-токена локально: подпись по JWKS Google, iss, aud, exp
+    try:
+        data = await google_jwks.verify(payload.credential, GOOGLE_CLIENT_ID)
+    except GoogleTokenError as e:
+        raise HTTPException(401, detail=f"Google token invalid: {e}")
 
     email = data.get("email")
     sub = data.get("sub")
-    aud = data.get("aud")
 
     if not email or not sub:
         raise HTTPException(401, "Google token invalid (no email/sub)")
 
-    # Проверяем, что токен выдан именно нашему приложению
-    if GOOGLE_CLIENT_ID and aud != GOOGLE_CLIENT_ID:
-        raise HTTPException(401, "Google token has wrong audience")
-
     # 🔍 Ищем пользователя
     u = await db.scalar(select(User).where(User.email == email))
 
     if not u:
         # создаем нового пользователя с безопасным случайным паролем
         random_pass = secrets.token_urlsafe(16)
-
-        u = User(
-            email=email,
-            phone=None,
-            password_hash=hash_password(random_pass),
-            role="user"
-        )
-
-        db.add(u)
-        await db.commit()
-        await db.refresh(u)
-
-    token = create_access_token(str(u.id))
-
-    return {
-        "access_token": token,
-        "token_type": "bearer"
-    }
+        try:
+            password_hash = await password_hasher.hash(random_pass)
+        except PasswordHasherBusy:
+            raise hasher_busy()
+
+        try:
+            u = await insert_returning(
+                db, User, {"email": email, "phone": None, "password_hash": password_hash, "role": "user"}
+            )
+            await db.commit()
+        except IntegrityError:
+            # параллельный первый вход с тем же email успел создать пользователя
+            await db.rollback()
+            u = await db.scalar(select(User).where(User.email == email))
+            if not u:
+                raise
+
+    return json_response(issue_tokens(u.id))
+
+
+# ---------- refresh / logout ----------
+@router.post("/refresh", response_model=TokenOut, dependencies=[Depends(rate_limit("auth_refresh"))])
+async def refresh(payload: RefreshIn, db: AsyncSession = Depends(get_db)):
+    """Ротация: refresh-токен одноразовый, в ответе новая пара того же семейства."""
+    try:
+        claims = decode_token(payload.refresh_token, "refresh")
+        user_id = int(claims["sub"])
+    except (JWTError, ValueError):
+        raise HTTPException(401, "Invalid refresh token")
+
+    if not await db.scalar(select(User.id).where(User.id == user_id)):
+        raise HTTPException(401, "User not found")
+    ok = await revocations.use_refresh(db, claims["jti"], claims["fam"], user_id, claims["exp"])
+    await db.commit()
+    if not ok:
+        # повторное предъявление — семейство уже отозвано в use_refresh
+        raise HTTPException(401, "Refresh token revoked")
+
+    return json_response(issue_tokens(user_id, claims["fam"]))
+
+
+@router.post("/logout")
+async def logout(
+    payload: LogoutIn | None = None,
+    token: str = Depends(oauth2_scheme),
+    u: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Отзывает текущий access-токен и (если передан) всё семейство refresh-токена."""
+    claims = decode_token(token)  # уже проверен в get_current_user
+    if claims.get("jti"):
+        await revocations.revoke_access(db, claims["jti"], u.id, claims["exp"])
+    if payload and payload.refresh_token:
+        try:
+            rc = decode_token(payload.refresh_token, "refresh")
+        except JWTError:
+            rc = None
+        if rc and rc["sub"] == str(u.id):
+            await revocations.revoke_family(db, rc["fam"], u.id)
+    await db.commit()
+    return {"ok": True}
 
 # ---------- Users: GET all / GET by id / DELETE by id ----------
-@router.get("/users")
-async def users_all(db: AsyncSession = Depends(get_db)):
-    rows = (await db.execute(select(User))).scalars().all()
-    return [{"id": u.id, "email": u.email, "phone": u.phone} for u in rows]
-
-@router.get("/users/{user_id}")
+@router.get("/users", response_model=Page[UserBriefOut])
+async def users_all(
+    cursor: str | None = None,
+    limit: int = Query(PAGE_DEFAULT, ge=1, le=PAGE_MAX),
+    db: AsyncSession = Depends(get_db),
+):
+    page = await keyset_page(db, select(User), [User.id], cursor, limit)
+    return json_response(page, Page[UserBriefOut])
+
+@router.get("/users/{user_id}", response_model=UserBriefOut)
 async def user_by_id(user_id: int, db: AsyncSession = Depends(get_db)):
     u = await db.get(User, user_id)
     if not u:
         raise HTTPException(404, "User not found")
-    return {"id": u.id, "email": u.email, "phone": u.phone}
+    return json_response(u, UserBriefOut)
 
 @router.delete("/users/{user_id}")
 async def user_delete(user_id: int, db: AsyncSession = Depends(get_db)):
@@ -140,8 +209,9 @@ async def user_delete(user_id: int, db: AsyncSession = Depends(get_db)):
         raise HTTPException(404, "User not found")
     await db.delete(u)
     await db.commit()
+    invalidate_user(user_id)
     return {"ok": True, "deleted_id": user_id}
 
 @router.get("/me", response_model=MeOut)
-async def me(u: User = Depends(get_current_user)):
-    return {"id": u.id, "email": u.email, "phone": u.phone, "role": u.role}
\ No newline at end of file
+async def me(u: Principal = Depends(get_current_user)):
+    return json_response(u, MeOut)
\ No newline at end of file
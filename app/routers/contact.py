@@ -1,11 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from datetime import datetime
 
+from app.auth.deps import require_admin
 from app.database import AsyncSessionLocal
 from app.models import ContactMessage
-from app.schemas.contact import ContactMessageIn, ContactMessageOut, ContactMessageUpdate
+from app.schemas.bulk import BulkResult
+from app.schemas.contact import (
+    ContactBulkIn, ContactMessageIn, ContactMessageOut, ContactMessageUpdate, SendResponse,
+)
+from app.schemas.pagination import Page
+from app.utils.bulk import bulk_update
+from app.utils.fast_json import dump_json, json_response
+from app.utils.http_cache import CACHE_CONTROL_CONTACT_INFO, cache_headers, not_modified
+from app.utils.outbox import outbox_worker
+from app.utils.pagination import PAGE_DEFAULT, PAGE_MAX, keyset_page
+from app.utils.rate_limit import rate_limit
+from app.utils.response_cache import DataVersion
+from app.utils.writes import insert_returning, update_returning
 
 router = APIRouter(prefix="/api/contact", tags=["contact"])
 
@@ -15,33 +28,50 @@ async def get_db():
         yield session
 
 
+CONTACT_INFO = {
+    "viber": {
+        "iryna": "https://viber.com",
+        "serhii": "https://viber.com",
+        "group": "https://viber.com",
+    },
+    "email": "hello@lsresort.studio",
+    "phone": "+38 (000) 000-00-00",
+}
+CONTACT_INFO_BODY = dump_json(CONTACT_INFO, dict)
+# контакты зашиты в код — версия меняется только с деплоем (BOOT в ETag)
+contact_info_version = DataVersion("contact-info")
+
+
 @router.get("/info")
-async def contact_info():
-    return {
-        "viber": {
-            "iryna": "https://viber.com",
-            "serhii": "https://viber.com",
-            "group": "https://viber.com",
-        },
-        "email": "hello@lsresort.studio",
-        "phone": "+38 (000) 000-00-00",
-    }
-
-
-@router.post("/send")
+async def contact_info(request: Request):
+    etag, lm = contact_info_version.etag(), contact_info_version.last_modified
+    if (r := not_modified(request, etag, lm, CACHE_CONTROL_CONTACT_INFO)) is not None:
+        return r
+    return Response(
+        content=CONTACT_INFO_BODY,
+        media_type="application/json",
+        headers=cache_headers(etag, lm, CACHE_CONTROL_CONTACT_INFO),
+    )
+
+
+@router.post("/send", response_model=SendResponse, dependencies=[Depends(rate_limit("contact_send"))])
 async def send_message(data: ContactMessageIn, db: AsyncSession = Depends(get_db)):
-    msg = ContactMessage(**data.model_dump(), created_at=datetime.utcnow())
-    db.add(msg)
+    msg = await insert_returning(db, ContactMessage, {**data.model_dump(), "created_at": datetime.utcnow()})
+    # строку outbox пишет триггер той же транзакцией — здесь только разбудить воркер
     await db.commit()
-    await db.refresh(msg)
-    return {"ok": True, "id": msg.id, "received_at": msg.created_at, "note": "Повідомлення отримано. Ми відповімо найближчим часом."}
+    outbox_worker.wake()
+    return json_response(SendResponse(
+        ok=True, id=msg.id, received_at=msg.created_at,
+        note="Повідомлення отримано. Ми відповімо найближчим часом.",
+    ))
 
 
-@router.get("/all", response_model=list[ContactMessageOut])
+@router.get("/all", response_model=Page[ContactMessageOut])
 async def get_all_messages(
     status: str | None = None,
     unread_only: bool = False,
-    limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = None,
+    limit: int = Query(PAGE_DEFAULT, ge=1, le=PAGE_MAX),
     db: AsyncSession = Depends(get_db),
 ):
     q = select(ContactMessage)
@@ -49,10 +79,26 @@ async def get_all_messages(
         q = q.where(ContactMessage.status == status)
     if unread_only:
         q = q.where(ContactMessage.is_read == False)  # noqa: E712
-    q = q.order_by(ContactMessage.created_at.desc()).limit(limit)
 
-    res = await db.execute(q)
-    return [ContactMessageOut.model_validate(x) for x in res.scalars().all()]
+    page = await keyset_page(db, q, [ContactMessage.created_at, ContactMessage.id], cursor, limit)
+    return json_response(page, Page[ContactMessageOut])
+
+
+# Массовая модерация входящих (админ): прочитано/закрыто/спам одним UPDATE
+@router.post("/bulk", response_model=BulkResult)
+async def bulk_messages(
+    data: ContactBulkIn,
+    db: AsyncSession = Depends(get_db),
+    x_admin_token: str | None = Header(default=None),
+):
+    require_admin(x_admin_token)
+
+    where = []
+    if data.filter is not None:
+        where = [getattr(ContactMessage, k) == v for k, v in data.filter.model_dump(exclude_none=True).items()]
+    result = await bulk_update(db, ContactMessage, data.set.model_dump(exclude_none=True), data.ids, where)
+    await db.commit()
+    return json_response(result, BulkResult)
 
 
 @router.get("/{message_id}", response_model=ContactMessageOut)
@@ -61,23 +107,16 @@ async def get_message(message_id: int, db: AsyncSession = Depends(get_db)):
     msg = res.scalar_one_or_none()
     if not msg:
         raise HTTPException(404, "Message not found")
-    return ContactMessageOut.model_validate(msg)
+    return json_response(msg, ContactMessageOut)
 
 
 @router.patch("/{message_id}", response_model=ContactMessageOut)
 async def update_message(message_id: int, patch: ContactMessageUpdate, db: AsyncSession = Depends(get_db)):
-    res = await db.execute(select(ContactMessage).where(ContactMessage.id == message_id))
-    msg = res.scalar_one_or_none()
+    msg = await update_returning(db, ContactMessage, message_id, patch.model_dump(exclude_unset=True))
     if not msg:
         raise HTTPException(404, "Message not found")
-
-    data = patch.model_dump(exclude_unset=True)
-    for k, v in data.items():
-        setattr(msg, k, v)
-
     await db.commit()
-    await db.refresh(msg)
-    return ContactMessageOut.model_validate(msg)
+    return json_response(msg, ContactMessageOut)
 
 
 @router.delete("/{message_id}")
@@ -1,21 +1,45 @@
-import os
 from datetime import datetime
+import os
+from functools import partial
 
-from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.auth.deps import require_admin
 from app.database import AsyncSessionLocal
 from app.models import Review
-from app.schemas.reviews import ReviewCreate, ReviewCreateFull, ReviewOut, ReviewPatch
-from app.utils.sentiment import sentiment_from_rating
-print("SENTIMENT FUNC SOURCE:", __file__)
-print("CHECK:", sentiment_from_rating(3))
+from app.schemas.bulk import BulkResult
+from app.schemas.pagination import Page
+from app.schemas.reviews import (
+    ReviewBulkIn, ReviewCreate, ReviewCreateFull, ReviewOut, ReviewPatch, ReviewStatsOut,
+)
+from app.utils.bulk import bulk_update
+from app.utils.fast_json import dump_json, json_response
+from app.utils.http_cache import CACHE_CONTROL_REVIEWS, cache_headers, not_modified
+from app.utils.pagination import PAGE_DEFAULT, PAGE_MAX, keyset_page
+from app.utils.rate_limit import rate_limit
+from app.utils.response_cache import DataVersion, ResponseCache
+from app.utils.review_stats import load_review_stats, recompute_review_stats
+from app.utils.sentiment import sentiment_for
+from app.utils.writes import insert_returning, update_returning
 
 
 router = APIRouter(prefix="/api/reviews", tags=["reviews"])
 
-ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "dev-token")
+# версия всех отзывов (/stats, only_published=false): любая запись через этот роутер
+reviews_version = DataVersion("reviews")
+
+# опубликованная лента по limit — готовые байты; сбрасывается, только если
+# запись задела опубликованный отзыв
+REVIEWS_FEED_SERVE_STALE = os.getenv("REVIEWS_FEED_SERVE_STALE", "0") == "1"
+reviews_feed = ResponseCache("reviews-feed", serve_stale=REVIEWS_FEED_SERVE_STALE)
+
+
+def reviews_changed(feed: bool = True) -> None:
+    reviews_version.bump()
+    if feed:
+        reviews_feed.invalidate()
 
 
 async def get_db():
@@ -23,33 +47,103 @@ async def get_db():
         yield session
 
 
-def require_admin(x_admin_token: str | None):
-    if x_admin_token != ADMIN_TOKEN:
-        raise HTTPException(status_code=401, detail="Not authorized")
+async def build_feed_body(limit: int) -> bytes:
+    async with AsyncSessionLocal() as db:
+        res = await db.execute(
+            select(Review)
+            .where(Review.status == "published")
+            .order_by(Review.is_featured.desc(), Review.created_at.desc())
+            .limit(limit)
+        )
+        return dump_json(res.scalars().all(), list[ReviewOut])
 
 
 # Публичный список (published)
 @router.get("/", response_model=list[ReviewOut])
 async def list_reviews(
+    request: Request,
     limit: int = Query(6, ge=1, le=100),
     only_published: bool = True,
     db: AsyncSession = Depends(get_db),
 ):
-    q = select(Review)
     if only_published:
-        q = q.where(Review.status == "published")
-    q = q.order_by(Review.is_featured.desc(), Review.created_at.desc()).limit(limit)
-
+        lm = reviews_feed.last_modified
+        if (r := not_modified(request, reviews_feed.etag(limit), lm, CACHE_CONTROL_REVIEWS)) is not None:
+            return r
+        cached = await reviews_feed.get_or_build(partial(build_feed_body, limit), limit)
+        # устаревшее тело (serve_stale) — со своими валидаторами, иначе клиент
+        # по If-Modified-Since получит 304 на свежую ленту и останется со старой
+        return Response(
+            content=cached.body,
+            media_type="application/json",
+            headers=cache_headers(cached.etag, cached.last_modified, CACHE_CONTROL_REVIEWS),
+        )
+
+    # сессия открывается лениво — на 304 соединение с БД не берётся
+    etag = reviews_version.etag(f"{limit}-all")
+    lm = reviews_version.last_modified
+    if (r := not_modified(request, etag, lm, CACHE_CONTROL_REVIEWS)) is not None:
+        return r
+
+    q = select(Review).order_by(Review.is_featured.desc(), Review.created_at.desc()).limit(limit)
     res = await db.execute(q)
-    return [ReviewOut.model_validate(x) for x in res.scalars().all()]
+    return json_response(
+        res.scalars().all(), list[ReviewOut], headers=cache_headers(etag, lm, CACHE_CONTROL_REVIEWS)
+    )
 
 
-# Все отзывы (dev/админка) — без фильтра
-@router.get("/all", response_model=list[ReviewOut])
-async def list_reviews_all(db: AsyncSession = Depends(get_db)):
-    q = select(Review).order_by(Review.created_at.desc())
-    res = await db.execute(q)
-    return [ReviewOut.model_validate(x) for x in res.scalars().all()]
+# Все отзывы (dev/админка) — без фильтра, постранично: новые первыми
+@router.get("/all", response_model=Page[ReviewOut])
+async def list_reviews_all(
+    cursor: str | None = None,
+    limit: int = Query(PAGE_DEFAULT, ge=1, le=PAGE_MAX),
+    db: AsyncSession = Depends(get_db),
+):
+    page = await keyset_page(db, select(Review), [Review.created_at, Review.id], cursor, limit)
+    return json_response(page, Page[ReviewOut])
+
+
+# Сводка: средняя оценка и разбивки (review_stats, ведётся триггерами)
+@router.get("/stats", response_model=ReviewStatsOut)
+async def review_stats(request: Request, db: AsyncSession = Depends(get_db)):
+    etag = reviews_version.etag("stats")
+    lm = reviews_version.last_modified
+    if (r := not_modified(request, etag, lm, CACHE_CONTROL_REVIEWS)) is not None:
+        return r
+
+    total = rating_sum = 0
+    by_sentiment: dict[str, int] = {}
+    by_status: dict[str, int] = {}
+    for status, sentiment, cnt, rsum in await load_review_stats(db):
+        by_status[status] = by_status.get(status, 0) + cnt
+        if status == "published":
+            total += cnt
+            rating_sum += rsum
+            key = sentiment or "unknown"
+            by_sentiment[key] = by_sentiment.get(key, 0) + cnt
+
+    return json_response(
+        ReviewStatsOut(
+            total=total,
+            avg_rating=round(rating_sum / total, 2) if total else None,
+            by_sentiment=by_sentiment,
+            by_status=by_status,
+        ),
+        headers=cache_headers(etag, lm, CACHE_CONTROL_REVIEWS),
+    )
+
+
+# Пересчёт сводки из reviews (админ) — на случай расхождения
+@router.post("/stats/recompute")
+async def review_stats_recompute(
+    dry_run: bool = False,
+    x_admin_token: str | None = Header(default=None),
+):
+    require_admin(x_admin_token)
+    result = await recompute_review_stats(dry_run=dry_run)
+    if result["fixed"]:
+        reviews_changed(feed=False)
+    return result
 
 
 # Один отзыв по id
@@ -58,25 +152,24 @@ async def get_review(review_id: int, db: AsyncSession = Depends(get_db)):
     r = await db.get(Review, review_id)
     if not r:
         raise HTTPException(404, "Review not found")
-    return ReviewOut.model_validate(r)
+    return json_response(r, ReviewOut)
 
 
-# Публичное создание отзыва с сайта (всегда pending + авто-sentiment)
-@router.post("/", response_model=ReviewOut)
+# Публичное создание отзыва с сайта (всегда pending + авто-sentiment по оценке и тексту)
+@router.post("/", response_model=ReviewOut, dependencies=[Depends(rate_limit("review_create"))])
 async def create_review(data: ReviewCreate, db: AsyncSession = Depends(get_db)):
-    r = Review(
+    r = await insert_returning(db, Review, dict(
         author_name=data.author_name,
         text=data.text,
         rating=data.rating,
-        sentiment=sentiment_from_rating(data.rating),  # ✅ авто
+        sentiment=sentiment_for(data.text, data.rating),  # ✅ авто: оценка + текст
         status="pending",
         is_featured=False,
         created_at=datetime.utcnow(),
-    )
-    db.add(r)
+    ))
     await db.commit()
-    await db.refresh(r)
-    return ReviewOut.model_validate(r)
+    reviews_changed(feed=False)  # pending — ленту не трогает
+    return json_response(r, ReviewOut)
 
 
 # Админское создание “полного” отзыва (published/pending + sentiment optional)
@@ -88,9 +181,9 @@ async def create_review_full(
 ):
     require_admin(x_admin_token)
 
-    sentiment = data.sentiment or sentiment_from_rating(data.rating)
+    sentiment = data.sentiment or sentiment_for(data.text, data.rating)
 
-    r = Review(
+    r = await insert_returning(db, Review, dict(
         author_name=data.author_name,
         text=data.text,
         rating=data.rating,
@@ -98,11 +191,30 @@ async def create_review_full(
         status=data.status,
         is_featured=data.is_featured,
         created_at=data.created_at or datetime.utcnow(),
-    )
-    db.add(r)
+    ))
+    await db.commit()
+    reviews_changed(feed=r.status == "published")
+    return json_response(r, ReviewOut)
+
+
+# Массовая модерация (админ): один UPDATE ... RETURNING на весь список/фильтр
+@router.post("/bulk", response_model=BulkResult)
+async def admin_bulk_reviews(
+    data: ReviewBulkIn,
+    db: AsyncSession = Depends(get_db),
+    x_admin_token: str | None = Header(default=None),
+):
+    require_admin(x_admin_token)
+
+    where = []
+    if data.filter is not None:
+        where = [getattr(Review, k) == v for k, v in data.filter.model_dump(exclude_none=True).items()]
+    result = await bulk_update(db, Review, data.set.model_dump(exclude_none=True), data.ids, where)
     await db.commit()
-    await db.refresh(r)
-    return ReviewOut.model_validate(r)
+    if result["updated"]:
+        # прежние статусы обновлённых строк не известны — сбрасываем ленту целиком
+        reviews_changed()
+    return json_response(result, BulkResult)
 
 
 # PATCH (админ)
@@ -115,22 +227,23 @@ async def admin_patch_review(
 ):
     require_admin(x_admin_token)
 
-    r = await db.get(Review, review_id)
-    if not r:
-        raise HTTPException(404, "Review not found")
-
     data = patch.model_dump(exclude_unset=True)
 
-    # если админ поменял rating, а sentiment не указал — можно авто-обновить
+    # админ поменял rating, а sentiment не указал — пересчитать, как при создании:
+    # оценка + текст отзыва (текст читается из строки только в этом случае)
     if "rating" in data and "sentiment" not in data:
-        data["sentiment"] = sentiment_from_rating(data["rating"])
-
-    for k, v in data.items():
-        setattr(r, k, v)
+        text = await db.scalar(select(Review.text).where(Review.id == review_id))
+        if text is None:
+            raise HTTPException(404, "Review not found")
+        data["sentiment"] = sentiment_for(text, data["rating"])
 
+    r = await update_returning(db, Review, review_id, data)
+    if not r:
+        raise HTTPException(404, "Review not found")
     await db.commit()
-    await db.refresh(r)
-    return ReviewOut.model_validate(r)
+    # RETURNING отдаёт новые значения: прежний status мог быть published, только если его меняли
+    reviews_changed(feed=r.status == "published" or "status" in data)
+    return json_response(r, ReviewOut)
 
 
 # DELETE (админ)
@@ -145,6 +258,8 @@ async def delete_review(
     r = await db.get(Review, review_id)
     if not r:
         raise HTTPException(404, "Review not found")
+    was_published = r.status == "published"
     await db.delete(r)
     await db.commit()
+    reviews_changed(feed=was_published)
     return {"ok": True, "deleted_id": review_id}
@@ -1,16 +1,41 @@
 from __future__ import annotations
-from datetime import datetime, timedelta
+from datetime import datetime
+import asyncio
+import logging
+import os
 import re
 
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy import select, func, desc
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.auth.deps import get_db
-from app.models.models import SearchEvent
-from app.schemas.search import SuggestResponse, SuggestItem, SearchLogIn, SearchLogOut
+from app.database import AsyncSessionLocal
+from app.models.models import SearchEvent, ServiceItem
+from app.schemas.search import (
+    SuggestResponse, SuggestItem, SearchLogIn, SearchLogOut, SearchHit, SearchQueryResponse,
+)
+from app.utils import fts
+from app.utils.fast_json import json_response
+from app.utils.fuzzy import query_variants
+from app.utils.http_cache import CACHE_CONTROL_PRIVATE, CACHE_CONTROL_SUGGEST, cache_headers, not_modified
+from app.utils.rate_limit import rate_limit
+from app.utils.recent_cache import recent_queries
+from app.utils.response_cache import DataVersion
+from app.utils.click_rank import CLICK_RANK_WEIGHT, click_rank
+from app.utils.search_index import SUGGEST_LIMIT, IndexEntry, SuggestIndex, suggest_index
+from app.utils.search_log_writer import SearchLogQueueFull, search_log_writer
+from app.utils.trending import trending as trending_counters
 
 router = APIRouter(prefix="/api/search", tags=["search"])
+log = logging.getLogger(__name__)
+
+# каталог правится и напрямую в БД — поэтому кроме явного rebuild есть и периодический
+SUGGEST_INDEX_REFRESH_SEC = int(os.getenv("SUGGEST_INDEX_REFRESH_SEC", "300"))
+
+# пустой запрос без session_id: страницы (INTENTS, статичны) + trending;
+# ETag = версия trending, Last-Modified не отдаём
+suggest_pages_version = DataVersion("suggest")
 
 def normalize_q(q: str) -> str:
     q = (q or "").strip().lower()
@@ -51,41 +76,104 @@ INTENTS = [
     },
 ]
 
-def intent_suggestions(q_norm: str, lang: str) -> list[SuggestItem]:
-    items: list[SuggestItem] = []
+def _suggest_item(entry: IndexEntry, lang: str, score: float) -> SuggestItem:
+    return SuggestItem(
+        title=entry.title(lang),
+        route=entry.route,
+        type=entry.kind,
+        score=round(score, 2),
+        item_id=entry.item_id,
+    )
+
+
+def intent_suggestions(q_norm: str, lang: str, variants: list[str] | None = None) -> list[SuggestItem]:
     if not q_norm:
-        return items
-    for it in INTENTS:
-        hits = sum(1 for kw in it["keywords"] if kw in q_norm)
-        if hits:
-            title = it["title_ua"] if lang == "ua" else it["title_ru"]
-            items.append(SuggestItem(title=title, route=it["route"], type="intent", score=float(hits) * 10))
-    return sorted(items, key=lambda x: x.score, reverse=True)[:8]
+        return []
+    index = suggest_index.index
+    scores = {
+        hit.entry: hit.score
+        for hit in index.search(q_norm, variants or (), limit=SUGGEST_LIMIT * 2)
+    }
+
+    # подмешиваем то, что по этому префиксу выбирали раньше
+    boosts: dict[IndexEntry, float] = {}
+    for key, share in click_rank.lookup(q_norm).items():
+        if key.startswith("item:"):
+            entry = index.by_item(int(key[5:]))
+        else:
+            entry = index.by_route(key)
+        if entry is not None:
+            boosts[entry] = max(boosts.get(entry, 0.0), share * CLICK_RANK_WEIGHT)
+    for entry, boost in boosts.items():
+        scores[entry] = scores.get(entry, 0.0) + boost
+
+    ranked = sorted(scores.items(), key=lambda x: -x[1])[:SUGGEST_LIMIT]
+    return [_suggest_item(entry, lang, score) for entry, score in ranked]
+
+
+async def rebuild_suggest_index() -> None:
+    """Пересобрать индекс подсказок: INTENTS + активные услуги каталога."""
+    async with AsyncSessionLocal() as db:
+        res = await db.execute(
+            select(ServiceItem)
+            .where(ServiceItem.is_active == True)  # noqa: E712
+            .order_by(ServiceItem.type, ServiceItem.sort_order, ServiceItem.id)
+        )
+        services = res.scalars().all()
+    suggest_index.replace(SuggestIndex.build(INTENTS, services))
+
+
+async def suggest_index_refresher() -> None:
+    while True:
+        await asyncio.sleep(SUGGEST_INDEX_REFRESH_SEC)
+        try:
+            await rebuild_suggest_index()
+        except Exception:
+            log.exception("suggest index rebuild failed")
+
+async def session_recent(db: AsyncSession, session_id: str, q_norm: str) -> list[SuggestItem]:
+    rows = recent_queries.get(session_id)
+    if rows is None:
+        res = await db.execute(
+            select(SearchEvent.query, SearchEvent.query_norm)
+            .where(SearchEvent.session_id == session_id)
+            .order_by(SearchEvent.id.desc())
+            .limit(recent_queries.per_session * 4)
+        )
+        rows = recent_queries.fill(session_id, res.all())
+
+    return [
+        SuggestItem(title=query, route=f"/search?q={qn}", type="recent", score=1.0)
+        for query, qn in rows
+        if qn != q_norm and qn.startswith(q_norm)
+    ]
 
 @router.get("/suggest", response_model=SuggestResponse)
 async def suggest(
+    request: Request,
     q: str = Query("", max_length=200),
     lang: str = Query("ua", pattern="^(ua|ru)$"),
+    session_id: str | None = Query(None, max_length=64),
     db: AsyncSession = Depends(get_db),
 ):
     q_norm = normalize_q(q)
+    headers = None
+    if not q_norm and not session_id:
+        etag = suggest_pages_version.etag(f"{lang}-{trending_counters.version}")
+        if (r := not_modified(request, etag, None, CACHE_CONTROL_SUGGEST)) is not None:
+            return r
+        headers = cache_headers(etag, None, CACHE_CONTROL_SUGGEST)
+    elif not q_norm:
+        headers = {"Cache-Control": CACHE_CONTROL_PRIVATE}
+
+    recent = await session_recent(db, session_id, q_norm) if session_id else []
+
+    variants = [normalize_q(v) for v in query_variants(q)]
+    items = intent_suggestions(q_norm, lang, variants)
 
-    items = intent_suggestions(q_norm, lang)
-
-    # trending 7 days
-    since = datetime.utcnow() - timedelta(days=7)
-    stmt = (
-        select(SearchEvent.query_norm, func.count(SearchEvent.id).label("cnt"))
-        .where(SearchEvent.created_at >= since)
-        .where(SearchEvent.lang == lang)
-        .group_by(SearchEvent.query_norm)
-        .order_by(desc("cnt"))
-        .limit(8)
-    )
-    rows = (await db.execute(stmt)).all()
     trending = [
-        SuggestItem(title=r[0], route=f"/search?q={r[0]}", type="trending", score=float(r[1]))
-        for r in rows if r[0]
+        SuggestItem(title=qn, route=f"/search?q={qn}", type="trending", score=float(cnt))
+        for qn, cnt in trending_counters.top(lang)
     ]
 
     if not q_norm:
@@ -98,26 +186,52 @@ async def suggest(
             )
             for it in INTENTS
         ]
-        return SuggestResponse(q=q, lang=lang, items=base, trending=trending)
+        return json_response(
+            SuggestResponse(q=q, lang=lang, items=base, trending=trending, recent=recent), headers=headers
+        )
 
-    return SuggestResponse(q=q, lang=lang, items=items, trending=trending)
+    return json_response(SuggestResponse(q=q, lang=lang, items=items, trending=trending, recent=recent))
 
-@router.post("/log", response_model=SearchLogOut)
-async def log_search(
-    payload: SearchLogIn,
+@router.get("/query", response_model=SearchQueryResponse)
+async def search_query(
+    q: str = Query("", max_length=200),
+    limit: int = Query(10, ge=1, le=50),
     db: AsyncSession = Depends(get_db),
 ):
+    m = fts.match_expr(normalize_q(q))
+    if not m:
+        return json_response(SearchQueryResponse(q=q))
+
+    services = [
+        SearchHit(kind="service", id=r[0], title=r[2], snippet=r[3] or "",
+                  route=f"/{r[1]}?item={r[0]}", score=round(-r[4], 6))
+        for r in await fts.search_services(db, m, limit)
+    ]
+    reviews = [
+        SearchHit(kind="review", id=r[0], title=r[1], snippet=r[2] or "",
+                  route=f"/reviews?item={r[0]}", score=round(-r[3], 6))
+        for r in await fts.search_reviews(db, m, limit)
+    ]
+    return json_response(SearchQueryResponse(q=q, services=services, reviews=reviews))
+
+@router.post("/log", response_model=SearchLogOut, dependencies=[Depends(rate_limit("search_log"))])
+async def log_search(payload: SearchLogIn):
+    now = datetime.utcnow()
+    query = payload.query.strip()[:200]
     q_norm = normalize_q(payload.query)
+    try:
+        await search_log_writer.submit({
+            "query": query,
+            "query_norm": q_norm,
+            "lang": payload.lang,
+            "session_id": payload.session_id,
+            "chosen_route": payload.chosen_route,
+            "chosen_item_id": payload.chosen_item_id,
+            "created_at": now,
+        })
+    except SearchLogQueueFull:
+        raise HTTPException(503, "Search log is busy, retry later", headers={"Retry-After": "1"})
 
-    event = SearchEvent(
-        query=payload.query.strip()[:200],
-        query_norm=q_norm,
-        lang=payload.lang,
-        session_id=payload.session_id,
-        chosen_route=payload.chosen_route,
-        chosen_item_id=payload.chosen_item_id,
-    )
-    db.add(event)
-    await db.commit()
-    await db.refresh(event)
-    return SearchLogOut(ok=True, id=event.id, created_at=event.created_at)
\ No newline at end of file
+    if payload.session_id:
+        recent_queries.add(payload.session_id, query, q_norm)
+    return json_response(SearchLogOut(ok=True, created_at=now))
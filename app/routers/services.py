@@ -1,34 +1,130 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update
 
+from app.auth.deps import require_admin
 from app.database import AsyncSessionLocal
 from app.models import ServiceItem
-from app.schemas.services import ServicesResponse, ServiceItemOut
+from app.routers.search import rebuild_suggest_index
+from app.schemas.services import (
+    ServicesResponse, ServiceItemOut, ServiceItemCreate, ServiceItemPatch, ServiceReorderIn,
+)
+from app.utils.fast_json import dump_json, json_response
+from app.utils.http_cache import CACHE_CONTROL_SERVICES, cache_headers, not_modified
+from app.utils.response_cache import ResponseCache
+from app.utils.writes import insert_returning, update_returning
 
 router = APIRouter(prefix="/api/services", tags=["services"])
 
+# каталог меняется редко — отдаём готовые байты, сбрасываем на каждой админской записи
+services_cache = ResponseCache("services")
+
 
 async def get_db():
     async with AsyncSessionLocal() as session:
         yield session
 
 
+async def build_services_body() -> bytes:
+    async with AsyncSessionLocal() as db:
+        q = (
+            select(ServiceItem)
+            .where(ServiceItem.is_active == True)  # noqa: E712
+            .order_by(ServiceItem.type, ServiceItem.sort_order, ServiceItem.id)
+        )
+        res = await db.execute(q)
+        items = res.scalars().all()
+
+    grouped: dict[str, list[ServiceItem]] = {"massage": [], "training": [], "herbs": []}
+    for x in items:
+        if x.type in grouped:
+            grouped[x.type].append(x)
+    return dump_json(grouped, ServicesResponse)
+
+
+async def catalog_changed() -> None:
+    services_cache.invalidate()
+    await rebuild_suggest_index()
+
+
 @router.get("/", response_model=ServicesResponse)
-async def get_services(db: AsyncSession = Depends(get_db)):
-    q = (
-        select(ServiceItem)
-        .where(ServiceItem.is_active == True)  # noqa: E712
-        .order_by(ServiceItem.type, ServiceItem.sort_order, ServiceItem.id)
+async def get_services(request: Request):
+    lm = services_cache.last_modified
+    if (r := not_modified(request, services_cache.etag(), lm, CACHE_CONTROL_SERVICES)) is not None:
+        return r
+    cached = await services_cache.get_or_build(build_services_body)
+    return Response(
+        content=cached.body,
+        media_type="application/json",
+        headers=cache_headers(cached.etag, cached.last_modified, CACHE_CONTROL_SERVICES),
+    )
+
+
+# -------- админка (X-Admin-Token) --------
+@router.post("/", response_model=ServiceItemOut)
+async def create_service(
+    data: ServiceItemCreate,
+    db: AsyncSession = Depends(get_db),
+    x_admin_token: str | None = Header(default=None),
+):
+    require_admin(x_admin_token)
+
+    s = await insert_returning(db, ServiceItem, data.model_dump())
+    await db.commit()
+    await catalog_changed()
+    return json_response(s, ServiceItemOut)
+
+
+@router.patch("/{service_id}", response_model=ServiceItemOut)
+async def update_service(
+    service_id: int,
+    patch: ServiceItemPatch,
+    db: AsyncSession = Depends(get_db),
+    x_admin_token: str | None = Header(default=None),
+):
+    require_admin(x_admin_token)
+
+    s = await update_returning(db, ServiceItem, service_id, patch.model_dump(exclude_unset=True))
+    if not s:
+        raise HTTPException(404, "Service not found")
+    await db.commit()
+    await catalog_changed()
+    return json_response(s, ServiceItemOut)
+
+
+@router.post("/reorder")
+async def reorder_services(
+    data: ServiceReorderIn,
+    db: AsyncSession = Depends(get_db),
+    x_admin_token: str | None = Header(default=None),
+):
+    require_admin(x_admin_token)
+
+    ids = {x.id for x in data.items}
+    found = set((await db.scalars(select(ServiceItem.id).where(ServiceItem.id.in_(ids)))).all())
+    if ids - found:
+        raise HTTPException(404, f"Service not found: {sorted(ids - found)}")
+
+    await db.execute(
+        update(ServiceItem),
+        [{"id": x.id, "sort_order": x.sort_order} for x in data.items],
     )
-    res = await db.execute(q)
-    items = res.scalars().all()
+    await db.commit()
+    await catalog_changed()
+    return {"ok": True, "updated": len(data.items)}
+
 
-    def pack(t: str) -> list[ServiceItemOut]:
-        return [ServiceItemOut.model_validate(x) for x in items if x.type == t]
+@router.post("/{service_id}/deactivate", response_model=ServiceItemOut)
+async def deactivate_service(
+    service_id: int,
+    db: AsyncSession = Depends(get_db),
+    x_admin_token: str | None = Header(default=None),
+):
+    require_admin(x_admin_token)
 
-    return {
-        "massage": pack("massage"),
-        "training": pack("training"),
-        "herbs": pack("herbs"),
-    }
+    s = await update_returning(db, ServiceItem, service_id, {"is_active": False})
+    if not s:
+        raise HTTPException(404, "Service not found")
+    await db.commit()
+    await catalog_changed()
+    return json_response(s, ServiceItemOut)
@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from pydantic import BaseModel, EmailStr, Field
 
 class AdminBootstrapIn(BaseModel):
@@ -13,3 +15,49 @@ class UserOut(BaseModel):
     role: str
 
     model_config = {"from_attributes": True}
+
+class SearchQueryStat(BaseModel):
+    query_norm: str
+    cnt: int
+
+class SearchTopOut(BaseModel):
+    since: datetime
+    until: datetime
+    items: list[SearchQueryStat]
+
+class RouteCtr(BaseModel):
+    route: str
+    clicks: int
+    ctr: float
+
+class SearchCtrOut(BaseModel):
+    since: datetime
+    until: datetime
+    searches: int
+    routes: list[RouteCtr]
+
+class VolumePoint(BaseModel):
+    bucket: str
+    lang: str
+    cnt: int
+
+class SearchVolumeOut(BaseModel):
+    since: datetime
+    until: datetime
+    bucket: str
+    points: list[VolumePoint]
+
+class CacheStat(BaseModel):
+    name: str
+    version: int
+    entries: int
+    hits: int
+    stale_hits: int
+    misses: int
+    hit_rate: float
+
+class OutboxStat(BaseModel):
+    channel: str
+    status: str
+    cnt: int
+    oldest: datetime | None
@@ -14,10 +14,24 @@ class GoogleVerifyIn(BaseModel):
 
 class TokenOut(BaseModel):
     access_token: str
+    refresh_token: str | None = None
     token_type: str = "bearer"
 
+class RefreshIn(BaseModel):
+    refresh_token: str = Field(..., min_length=10)
+
+class LogoutIn(BaseModel):
+    refresh_token: str | None = None
+
 class MeOut(BaseModel):
     id: int
     email: EmailStr | None
     phone: str | None
     role: str
+
+class UserBriefOut(BaseModel):
+    id: int
+    email: str | None
+    phone: str | None
+
+    model_config = {"from_attributes": True}
@@ -0,0 +1,15 @@
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+BULK_MAX_IDS = 1000
+
+
+class BulkItemResult(BaseModel):
+    id: int
+    outcome: Literal["updated", "unchanged", "not_found"]
+
+
+class BulkResult(BaseModel):
+    updated: int
+    results: list[BulkItemResult] = Field(default_factory=list)
@@ -1,7 +1,9 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field, field_validator, model_validator
 from datetime import datetime
 from typing import Literal
 
+from app.schemas.bulk import BULK_MAX_IDS
+
 
 class ContactMessageIn(BaseModel):
     name: str
@@ -31,9 +33,43 @@ class ContactMessageUpdate(BaseModel):
     is_read: bool | None = None
     status: Literal["new", "closed", "spam"] | None = None
 
+    @field_validator("is_read", "status")
+    @classmethod
+    def not_null(cls, v):
+        if v is None:
+            raise ValueError("must not be null")
+        return v
+
 
 class SendResponse(BaseModel):
     ok: bool
     id: int
     received_at: datetime
     note: str
+
+
+class ContactBulkFilter(BaseModel):
+    status: Literal["new", "closed", "spam"] | None = None
+    is_read: bool | None = None
+
+
+class ContactBulkSet(BaseModel):
+    status: Literal["new", "closed", "spam"] | None = None
+    is_read: bool | None = None
+
+
+class ContactBulkIn(BaseModel):
+    # либо ids, либо непустой filter
+    ids: list[int] | None = Field(None, min_length=1, max_length=BULK_MAX_IDS)
+    filter: ContactBulkFilter | None = None
+    set: ContactBulkSet
+
+    @model_validator(mode="after")
+    def _check(self):
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError("Provide either ids or filter")
+        if self.filter is not None and not self.filter.model_dump(exclude_none=True):
+            raise ValueError("Empty filter")
+        if not self.set.model_dump(exclude_none=True):
+            raise ValueError("Nothing to set")
+        return self
@@ -1,7 +1,9 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator, model_validator
 from typing import Optional, Literal
 from datetime import datetime
 
+from app.schemas.bulk import BULK_MAX_IDS
+
 Sentiment = Literal["positive", "neutral", "negative", "other"]
 Status = Literal["pending", "published", "hidden"]
 
@@ -33,5 +35,50 @@ class ReviewPatch(BaseModel):
     status: Optional[str] = None
     is_featured: Optional[bool] = None
     sentiment: Optional[Sentiment] = None
+    rating: Optional[int] = Field(None, ge=1, le=5)
+
+    model_config = {"from_attributes": True}
+
+    @field_validator("status", "is_featured", "rating")
+    @classmethod
+    def not_null(cls, v):
+        if v is None:
+            raise ValueError("must not be null")
+        return v
+
+
+class ReviewStatsOut(BaseModel):
+    # total / avg_rating / by_sentiment — по опубликованным, by_status — по всем
+    total: int
+    avg_rating: Optional[float] = None
+    by_sentiment: dict[str, int]
+    by_status: dict[str, int]
+
+
+class ReviewBulkFilter(BaseModel):
+    status: Optional[Status] = None
+    sentiment: Optional[Sentiment] = None
+    is_featured: Optional[bool] = None
+
+
+class ReviewBulkSet(BaseModel):
+    status: Optional[Status] = None
+    is_featured: Optional[bool] = None
+    sentiment: Optional[Sentiment] = None
+
+
+class ReviewBulkIn(BaseModel):
+    # либо ids, либо непустой filter
+    ids: Optional[list[int]] = Field(None, min_length=1, max_length=BULK_MAX_IDS)
+    filter: Optional[ReviewBulkFilter] = None
+    set: ReviewBulkSet
 
-    model_config = {"from_attributes": True}
\ No newline at end of file
+    @model_validator(mode="after")
+    def _check(self):
+        if (self.ids is None) == (self.filter is None):
+            raise ValueError("Provide either ids or filter")
+        if self.filter is not None and not self.filter.model_dump(exclude_none=True):
+            raise ValueError("Empty filter")
+        if not self.set.model_dump(exclude_none=True):
+            raise ValueError("Nothing to set")
+        return self
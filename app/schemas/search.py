@@ -1,28 +1,43 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
 
 class SuggestItem(BaseModel):
     title: str
     route: str
-    type: str  # intent | trending | recent | page
+    type: str  # intent | service | trending | recent | page
     score: float = 0.0
+    item_id: int | None = None
 
 class SuggestResponse(BaseModel):
     q: str
     lang: str
     items: list[SuggestItem]
     trending: list[SuggestItem] = []
+    recent: list[SuggestItem] = []
+
+class SearchHit(BaseModel):
+    kind: str  # service | review
+    id: int
+    title: str
+    snippet: str
+    route: str
+    score: float
+
+class SearchQueryResponse(BaseModel):
+    q: str
+    services: list[SearchHit] = []
+    reviews: list[SearchHit] = []
 
 class SearchLogIn(BaseModel):
     query: str
     lang: str = "ua"
-    session_id: str | None = None
+    session_id: str | None = Field(None, max_length=64)
     chosen_route: str | None = None
     chosen_item_id: int | None = None
 
 class SearchLogOut(BaseModel):
+    # с 0.2.0 без id: событие пишется пачкой в фоне (search_log_writer), id в ответе ещё нет
     ok: bool
-    id: int
     created_at: datetime
 
     model_config = {"from_attributes": True}
\ No newline at end of file
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, field_validator
 from typing import Literal
 
 
@@ -23,3 +23,40 @@ class ServicesResponse(BaseModel):
     training: list[ServiceItemOut]
     herbs: list[ServiceItemOut]
 
+
+
+class ServiceItemCreate(BaseModel):
+    type: ServiceType
+    title: str = Field(..., min_length=1, max_length=120)
+    description: str | None = None
+    duration_min: int | None = Field(None, ge=0)
+    price_uah: int | None = Field(None, ge=0)
+    is_active: bool = True
+    sort_order: int = 0
+
+
+class ServiceItemPatch(BaseModel):
+    type: ServiceType | None = None
+    title: str | None = Field(None, min_length=1, max_length=120)
+    description: str | None = None
+    duration_min: int | None = Field(None, ge=0)
+    price_uah: int | None = Field(None, ge=0)
+    is_active: bool | None = None
+    sort_order: int | None = None
+
+    # поле можно не передавать, но явный null для NOT NULL колонки — 422, а не 500 из БД
+    @field_validator("type", "title", "is_active", "sort_order")
+    @classmethod
+    def not_null(cls, v):
+        if v is None:
+            raise ValueError("must not be null")
+        return v
+
+
+class ServiceOrder(BaseModel):
+    id: int
+    sort_order: int
+
+
+class ServiceReorderIn(BaseModel):
+    items: list[ServiceOrder] = Field(..., min_length=1)
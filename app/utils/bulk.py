@@ -0,0 +1,36 @@
+"""
+Массовая модерация одним set-based UPDATE ... RETURNING id.
+
+Строки, уже находящиеся в целевом состоянии, не переписываются
+(IS DISTINCT FROM в WHERE) — триггеры и FTS не трогаются зря.
+Для списка id исходы по каждому: updated / unchanged / not_found;
+для фильтра — только updated.
+"""
+from __future__ import annotations
+
+from typing import Any
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def bulk_update(
+    db: AsyncSession, model: Any, changes: dict[str, Any], ids: list[int] | None, where: list
+) -> dict:
+    """В транзакции вызывающего, до commit(). Возвращает dict под схему BulkResult."""
+    differs = or_(*[getattr(model, k).is_distinct_from(v) for k, v in changes.items()])
+    cond = [model.id.in_(ids)] if ids is not None else where
+    res = await db.execute(
+        update(model).where(*cond, differs).values(**changes).returning(model.id),
+        execution_options={"synchronize_session": False},
+    )
+    updated = sorted(res.scalars().all())
+    results = [{"id": i, "outcome": "updated"} for i in updated]
+
+    if ids is not None:
+        rest = set(ids) - set(updated)
+        if rest:
+            found = set((await db.scalars(select(model.id).where(model.id.in_(rest)))).all())
+            results += [{"id": i, "outcome": "unchanged" if i in found else "not_found"} for i in rest]
+            results.sort(key=lambda r: r["id"])
+    return {"updated": len(updated), "results": results}
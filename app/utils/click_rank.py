@@ -0,0 +1,108 @@
+"""
+Ранжирование подсказок по истории выборов (chosen_route / chosen_item_id).
+
+Раз в CLICK_RANK_REFRESH_MIN минут по search_activity (search_events +
+search_events_daily, где выборы route и item переживают свёртку) за
+CLICK_RANK_DAYS дней строится таблица: префикс query_norm -> {ключ: доля выборов}, где ключ —
+route или "item:<id>". Таблица живёт в памяти и подменяется целиком,
+/suggest делает только dict-lookup по самому длинному известному префиксу.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+
+from app.database import AsyncSessionLocal
+from app.utils.search_maintenance import search_activity
+
+log = logging.getLogger(__name__)
+
+CLICK_RANK_REFRESH_MIN = int(os.getenv("CLICK_RANK_REFRESH_MIN", "10"))
+CLICK_RANK_DAYS = int(os.getenv("CLICK_RANK_DAYS", "90"))
+CLICK_RANK_WEIGHT = float(os.getenv("CLICK_RANK_WEIGHT", "20"))
+CLICK_RANK_MAX_QUERIES = 20000
+CLICK_RANK_MIN_PREFIX = 2
+CLICK_RANK_MAX_PREFIX = 24
+CLICK_RANK_TOP = 8
+
+
+def item_key(item_id: int) -> str:
+    return f"item:{item_id}"
+
+
+def build_table(rows: list[tuple[str, str, int]]) -> dict[str, dict[str, float]]:
+    """(query_norm, key, cnt) -> {prefix: {key: share}}."""
+    acc: dict[str, Counter] = defaultdict(Counter)
+    for q, key, cnt in rows:
+        if not q or not key:
+            continue
+        for n in range(CLICK_RANK_MIN_PREFIX, min(len(q), CLICK_RANK_MAX_PREFIX) + 1):
+            acc[q[:n]][key] += cnt
+
+    table: dict[str, dict[str, float]] = {}
+    for prefix, counts in acc.items():
+        total = sum(counts.values())
+        table[prefix] = {key: cnt / total for key, cnt in counts.most_common(CLICK_RANK_TOP)}
+    return table
+
+
+class ClickRank:
+    def __init__(self) -> None:
+        self.table: dict[str, dict[str, float]] = {}
+
+    def replace(self, table: dict[str, dict[str, float]]) -> None:
+        self.table = table
+
+    def lookup(self, q_norm: str) -> dict[str, float]:
+        table = self.table
+        for n in range(min(len(q_norm), CLICK_RANK_MAX_PREFIX), CLICK_RANK_MIN_PREFIX - 1, -1):
+            shares = table.get(q_norm[:n])
+            if shares:
+                return shares
+        return {}
+
+
+click_rank = ClickRank()
+
+
+async def refresh_click_rank() -> None:
+    since = datetime.utcnow() - timedelta(days=CLICK_RANK_DAYS)
+    async with AsyncSessionLocal() as db:
+        sa = search_activity(since)
+        total = func.sum(sa.c.cnt).label("total")
+        routes = await db.execute(
+            select(sa.c.query_norm, sa.c.chosen_route, total)
+            .where(sa.c.chosen_route != "")
+            .group_by(sa.c.query_norm, sa.c.chosen_route)
+            .order_by(total.desc())
+            .limit(CLICK_RANK_MAX_QUERIES)
+        )
+        items = await db.execute(
+            select(sa.c.query_norm, sa.c.chosen_item_id, total)
+            .where(sa.c.chosen_item_id != 0)
+            .group_by(sa.c.query_norm, sa.c.chosen_item_id)
+            .order_by(total.desc())
+            .limit(CLICK_RANK_MAX_QUERIES)
+        )
+        route_rows = [(q, route, n) for q, route, n in routes.all()]
+        item_rows = [(q, item_key(item_id), n) for q, item_id, n in items.all()]
+
+    # доли по маршрутам и по item-ам нормируются отдельно: один выбор пишет оба поля
+    table = build_table(route_rows)
+    for prefix, shares in build_table(item_rows).items():
+        table[prefix] = {**table.get(prefix, {}), **shares}
+    click_rank.replace(table)
+
+
+async def click_rank_refresher() -> None:
+    while True:
+        await asyncio.sleep(CLICK_RANK_REFRESH_MIN * 60)
+        try:
+            await refresh_click_rank()
+        except Exception:
+            log.exception("click rank refresh failed")
@@ -0,0 +1,50 @@
+"""
+Быстрый путь JSON-ответов.
+
+Раньше строки ORM проходили model_validate в обработчике, затем ещё раз
+валидировались FastAPI по response_model, превращались в dict и
+кодировались json.dumps. Здесь — одна валидация (TypeAdapter,
+from_attributes) и сериализация сразу в bytes на стороне pydantic-core.
+Обработчик возвращает готовый Response, FastAPI его не трогает;
+response_model на маршруте остаётся только для OpenAPI.
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any, Mapping
+
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def adapter(tp: Any) -> TypeAdapter:
+    return TypeAdapter(tp)
+
+
+def dump_json(content: Any, tp: Any = None) -> bytes:
+    """
+    tp=None — content уже модель pydantic, просто кодируем.
+    Иначе content (ORM-объекты, dict'ы, модели) валидируется по tp один раз.
+    """
+    if tp is None:
+        return content.model_dump_json().encode()
+    ta = adapter(tp)
+    return ta.dump_json(ta.validate_python(content, from_attributes=True))
+
+
+def json_response(
+    content: Any,
+    tp: Any = None,
+    *,
+    status_code: int = 200,
+    headers: Mapping[str, str] | None = None,
+) -> Response:
+    if tp is None and not isinstance(content, BaseModel):
+        raise TypeError("json_response: tp is required for non-model content")
+    return Response(
+        content=dump_json(content, tp),
+        status_code=status_code,
+        media_type="application/json",
+        headers=headers,
+    )
@@ -0,0 +1,122 @@
+"""
+FTS5-индексы для /api/search/query: service_items_fts и reviews_fts.
+
+Таблицы external-content (текст хранится только в базовых таблицах),
+синхронизируются триггерами. unicode61 не сводит кириллические "диакритики",
+поэтому в индекс пишется свёрнутый текст (ё->е, й->и, ї->і, є->е, ґ->г),
+а запрос сворачивается так же — "йога"/"иога", "ёлка"/"елка" находят друг друга.
+Свёртка посимвольная, позиции токенов совпадают, snippet() берёт оригинал.
+"""
+from __future__ import annotations
+
+import re
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+FOLD = {
+    "ё": "е", "Ё": "Е",
+    "й": "и", "Й": "И",
+    "ї": "і", "Ї": "І",
+    "є": "е", "Є": "Е",
+    "ґ": "г", "Ґ": "Г",
+}
+_FOLD_TABLE = str.maketrans(FOLD)
+
+FTS_TOKENIZE = "unicode61 remove_diacritics 2"
+FTS_MAX_TERMS = 8
+SNIPPET_OPEN = "["
+SNIPPET_CLOSE = "]"
+SNIPPET_TOKENS = 12
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def fold(s: str) -> str:
+    return s.translate(_FOLD_TABLE)
+
+
+def _fold_sql(expr: str) -> str:
+    for a, b in FOLD.items():
+        expr = f"replace({expr}, '{a}', '{b}')"
+    return expr
+
+
+def _fts_ddl(table: str, fts: str, columns: list[str]) -> list[str]:
+    cols = ", ".join(columns)
+    new_vals = ", ".join(_fold_sql(f"new.{c}") for c in columns)
+    old_vals = ", ".join(_fold_sql(f"old.{c}") for c in columns)
+    ins = f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_vals});"
+    dele = f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_vals});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{cols}, content='{table}', content_rowid='id', tokenize='{FTS_TOKENIZE}')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN {ins} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN {dele} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN {dele} {ins} END",
+    ]
+
+
+def _fts_fill(table: str, fts: str, columns: list[str]) -> str:
+    cols = ", ".join(columns)
+    vals = ", ".join(_fold_sql(c) for c in columns)
+    return f"INSERT INTO {fts}(rowid, {cols}) SELECT id, {vals} FROM {table}"
+
+
+FTS_TABLES = {
+    "service_items_fts": ("service_items", ["title", "description"]),
+    "reviews_fts": ("reviews", ["author_name", "text"]),
+}
+
+
+async def ensure_fts(conn: AsyncConnection) -> None:
+    """Создать FTS-таблицы и триггеры, если их нет (lifespan, после create_all)."""
+    for fts, (table, columns) in FTS_TABLES.items():
+        exists = (
+            await conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :n"), {"n": fts}
+            )
+        ).first()
+        for stmt in _fts_ddl(table, fts, columns):
+            await conn.execute(text(stmt))
+        if not exists:
+            await conn.execute(text(_fts_fill(table, fts, columns)))
+
+
+def match_expr(q: str) -> str | None:
+    """'масаж спин' -> '"масаж"* "спин"*' (AND префиксов)."""
+    terms = list(dict.fromkeys(_TERM_RE.findall(fold(q.lower()))))[:FTS_MAX_TERMS]
+    if not terms:
+        return None
+    return " ".join(f'"{t}"*' for t in terms)
+
+
+_SERVICES_SQL = text(f"""
+    SELECT s.id, s.type, s.title,
+           snippet(service_items_fts, -1, '{SNIPPET_OPEN}', '{SNIPPET_CLOSE}', '…', {SNIPPET_TOKENS}),
+           bm25(service_items_fts, 10.0, 1.0) AS rank
+    FROM service_items_fts
+    JOIN service_items s ON s.id = service_items_fts.rowid
+    WHERE service_items_fts MATCH :m AND s.is_active = 1
+    ORDER BY rank
+    LIMIT :limit
+""")
+
+_REVIEWS_SQL = text(f"""
+    SELECT r.id, r.author_name,
+           snippet(reviews_fts, 1, '{SNIPPET_OPEN}', '{SNIPPET_CLOSE}', '…', {SNIPPET_TOKENS}),
+           bm25(reviews_fts, 2.0, 1.0) AS rank
+    FROM reviews_fts
+    JOIN reviews r ON r.id = reviews_fts.rowid
+    WHERE reviews_fts MATCH :m AND r.status = 'published'
+    ORDER BY rank
+    LIMIT :limit
+""")
+
+
+async def search_services(db: AsyncSession, m: str, limit: int) -> list:
+    return (await db.execute(_SERVICES_SQL, {"m": m, "limit": limit})).all()
+
+
+async def search_reviews(db: AsyncSession, m: str, limit: int) -> list:
+    return (await db.execute(_REVIEWS_SQL, {"m": m, "limit": limit})).all()
@@ -0,0 +1,160 @@
+"""
+Нечёткий поиск для подсказок: триграммный индекс + ограниченный Левенштейн.
+
+Кандидаты набираются по общим триграммам (от редких к частым, с потолком
+просмотренных постингов FUZZY_POSTINGS_BUDGET), до edit distance доходят
+только FUZZY_MAX_CANDIDATES лучших — время ответа не зависит от размера словаря.
+Плюс варианты запроса: набор в латинской раскладке ("vfcfk" -> "масаж")
+и транслитерация ("masazh" -> "масаж").
+"""
+from __future__ import annotations
+
+import heapq
+import re
+from collections import Counter
+from dataclasses import dataclass
+
+FUZZY_MIN_LEN = 4
+FUZZY_MAX_CANDIDATES = 48
+FUZZY_POSTINGS_BUDGET = 20000
+FUZZY_MIN_OVERLAP = 0.3
+
+_LATIN_RE = re.compile(r"[a-z]")
+
+_QWERTY = "qwertyuiop[]asdfghjkl;'zxcvbnm,.`"
+_JCUKEN_RU = "йцукенгшщзхъфывапролджэячсмитьбюё"
+_JCUKEN_UA = "йцукенгшщзхїфівапролджєячсмитьбю'"
+LAYOUT_RU = str.maketrans(_QWERTY, _JCUKEN_RU)
+LAYOUT_UA = str.maketrans(_QWERTY, _JCUKEN_UA)
+
+_TRANSLIT_COMMON = [
+    ("shch", "щ"), ("sch", "щ"), ("zh", "ж"), ("kh", "х"), ("ch", "ч"), ("sh", "ш"),
+    ("ts", "ц"), ("yu", "ю"), ("ya", "я"), ("ja", "я"), ("ju", "ю"),
+    ("a", "а"), ("b", "б"), ("v", "в"), ("w", "в"), ("g", "г"), ("d", "д"), ("e", "е"),
+    ("z", "з"), ("k", "к"), ("q", "к"), ("l", "л"), ("m", "м"), ("n", "н"), ("o", "о"),
+    ("p", "п"), ("r", "р"), ("s", "с"), ("t", "т"), ("u", "у"), ("f", "ф"), ("c", "ц"),
+    ("x", "кс"), ("j", "й"),
+]
+_TRANSLIT = {
+    "ua": [("yi", "ї"), ("ye", "є"), ("i", "і"), ("y", "и"), ("h", "г")] + _TRANSLIT_COMMON,
+    "ru": [("yo", "ё"), ("i", "и"), ("y", "ы"), ("h", "х")] + _TRANSLIT_COMMON,
+}
+
+
+def translit(s: str, lang: str) -> str:
+    rules = _TRANSLIT[lang]
+    out: list[str] = []
+    i = 0
+    while i < len(s):
+        for lat, cyr in rules:
+            if s.startswith(lat, i):
+                out.append(cyr)
+                i += len(lat)
+                break
+        else:
+            out.append(s[i])
+            i += 1
+    return "".join(out)
+
+
+def query_variants(raw: str) -> list[str]:
+    """Варианты сырого запроса для латиницы: раскладка ru/ua и транслит ru/ua."""
+    s = (raw or "").lower()
+    if not _LATIN_RE.search(s):
+        return []
+    variants = [
+        s.translate(LAYOUT_RU),
+        s.translate(LAYOUT_UA),
+        translit(s, "ua"),
+        translit(s, "ru"),
+    ]
+    return [v for v in dict.fromkeys(variants) if v != s]
+
+
+def trigrams(term: str) -> set[str]:
+    padded = f"^{term}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def bounded_distance(a: str, b: str, max_d: int) -> int:
+    """Damerau-Левенштейн (OSA) с отсечкой: > max_d возвращается как max_d + 1."""
+    if abs(len(a) - len(b)) > max_d:
+        return max_d + 1
+    prev2: list[int] | None = None
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        row_min = i
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            v = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if prev2 is not None and i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                v = min(v, prev2[j - 2] + 1)
+            cur[j] = v
+            row_min = min(row_min, v)
+        if row_min > max_d:
+            return max_d + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+def max_edits(term: str) -> int:
+    if len(term) <= 4:
+        return 1
+    if len(term) <= 8:
+        return 2
+    return 3
+
+
+@dataclass(frozen=True)
+class FuzzyMatch:
+    term: str
+    distance: int
+
+
+class NGramIndex:
+    def __init__(self, terms: list[str]):
+        self.terms = terms
+        postings: dict[str, list[int]] = {}
+        for term_id, term in enumerate(terms):
+            for g in trigrams(term):
+                postings.setdefault(g, []).append(term_id)
+        self._postings = postings
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def lookup(self, q: str, limit: int = 5) -> list[FuzzyMatch]:
+        if len(q) < FUZZY_MIN_LEN:
+            return []
+        grams = trigrams(q)
+        lists = sorted(
+            (self._postings[g] for g in grams if g in self._postings), key=len
+        )
+        overlap: Counter = Counter()
+        budget = FUZZY_POSTINGS_BUDGET
+        for posting in lists:
+            if budget <= 0:
+                break
+            overlap.update(posting[:budget])
+            budget -= len(posting)
+
+        need = max(1, int(len(grams) * FUZZY_MIN_OVERLAP))
+        candidates = heapq.nlargest(
+            FUZZY_MAX_CANDIDATES,
+            ((n, term_id) for term_id, n in overlap.items() if n >= need),
+        )
+
+        max_d = max_edits(q)
+        found: list[FuzzyMatch] = []
+        for _, term_id in candidates:
+            term = self.terms[term_id]
+            # и целое слово, и его начало той же длины: "масах" ~ "масаж", "масажист"
+            d = min(
+                bounded_distance(q, term, max_d),
+                bounded_distance(q, term[:len(q)], max_d),
+            )
+            if d <= max_d:
+                found.append(FuzzyMatch(term, d))
+        found.sort(key=lambda m: (m.distance, len(m.term), m.term))
+        return found[:limit]
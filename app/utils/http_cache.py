@@ -0,0 +1,75 @@
+"""
+Условные GET (If-None-Match / If-Modified-Since -> 304) и Cache-Control.
+
+Валидаторы берутся из версий данных (DataVersion), а не из хэша
+отрендеренного тела — поэтому проверка делается в начале обработчика,
+до запросов в БД. Политики Cache-Control задаются на маршрут через env.
+"""
+from __future__ import annotations
+
+import os
+from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response
+
+CACHE_CONTROL_SERVICES = os.getenv(
+    "CACHE_CONTROL_SERVICES", "public, max-age=60, stale-while-revalidate=600"
+)
+CACHE_CONTROL_REVIEWS = os.getenv(
+    "CACHE_CONTROL_REVIEWS", "public, max-age=30, stale-while-revalidate=300"
+)
+CACHE_CONTROL_CONTACT_INFO = os.getenv(
+    "CACHE_CONTROL_CONTACT_INFO", "public, max-age=3600, stale-while-revalidate=86400"
+)
+CACHE_CONTROL_SUGGEST = os.getenv(
+    "CACHE_CONTROL_SUGGEST", "public, max-age=15, stale-while-revalidate=60"
+)
+# ответы с персональными данными (recent по session_id) — только в браузере
+CACHE_CONTROL_PRIVATE = "private, no-cache"
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    """Слабое сравнение (RFC 9110 §13.1.2): для GET достаточно."""
+    if header.strip() == "*":
+        return True
+    target = _opaque(etag)
+    return any(_opaque(t) == target for t in header.split(","))
+
+
+def is_not_modified(request: Request, etag: str, last_modified: datetime | None = None) -> bool:
+    inm = request.headers.get("if-none-match")
+    if inm is not None:
+        # If-None-Match важнее If-Modified-Since
+        return etag_matches(inm, etag)
+    ims = request.headers.get("if-modified-since")
+    if ims and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(ims)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            return False
+        return last_modified <= since
+    return False
+
+
+def cache_headers(etag: str, last_modified: datetime | None, cache_control: str) -> dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    return headers
+
+
+def not_modified(
+    request: Request, etag: str, last_modified: datetime | None, cache_control: str
+) -> Response | None:
+    """304 с теми же валидаторами, если клиентская копия свежая; иначе None."""
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=cache_headers(etag, last_modified, cache_control))
+    return None
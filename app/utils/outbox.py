@@ -0,0 +1,478 @@
+"""
+Transactional outbox: уведомления персоналу о новых заявках.
+
+Строку outbox_events для новой заявки пишет триггер на contact_messages —
+той же транзакцией и тем же INSERT, без лишнего обращения к БД, пока держится
+write-lock: заявка без уведомления или уведомление без заявки невозможны,
+откуда бы ни пришла запись. POST /api/contact/send после commit только будит
+воркер (Event.set) — доставка запрос никогда не задерживает.
+
+OutboxWorker (фоновая задача lifespan) забирает пачку созревших строк одним
+UPDATE ... RETURNING — это и аренда: next_attempt_at сдвигается на
+OUTBOX_LEASE_SEC, так что второй процесс ту же строку не возьмёт, а после
+падения она созреет снова. Строка триггера (channel='fanout') раскладывается
+на строки по включённым каналам/получателям — у каждой свои повторы. Доставка
+пачки: HTTP (webhook, Viber-подобный API) параллельно через общий
+httpx.AsyncClient, письма — одним SMTP-соединением в потоке. Итог пачки — одна
+транзакция. Ошибка — повтор с экспоненциальной задержкой и jitter, после
+OUTBOX_MAX_ATTEMPTS или при ответе 4xx — failed.
+
+Каналы включаются переменными окружения:
+    NOTIFY_WEBHOOK_URL                      — POST JSON события
+    NOTIFY_VIBER_TOKEN, NOTIFY_VIBER_RECEIVERS (через запятую), NOTIFY_VIBER_URL
+    NOTIFY_SMTP_HOST, NOTIFY_SMTP_TO (через запятую), NOTIFY_SMTP_FROM, ...
+Без каналов строки триггера просто закрываются и удаляются по сроку хранения.
+
+Разовая доставка без приложения: python -m app.utils.outbox --once
+(доставка, повторы и backoff — tests/test_outbox.py с локальной заглушкой).
+"""
+from dotenv import load_dotenv
+load_dotenv()
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import smtplib
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+
+import httpx
+from sqlalchemy import delete, func, insert, select, text, update
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.database import AsyncSessionLocal
+from app.models.models import OutboxEvent
+
+log = logging.getLogger(__name__)
+
+OUTBOX_WORKER = os.getenv("OUTBOX_WORKER", "1") == "1"  # 0 — только CLI --once
+OUTBOX_BATCH = int(os.getenv("OUTBOX_BATCH", "50"))
+OUTBOX_CONCURRENCY = int(os.getenv("OUTBOX_CONCURRENCY", "10"))
+OUTBOX_FLUSH_MS = int(os.getenv("OUTBOX_FLUSH_MS", "200"))
+OUTBOX_POLL_SEC = float(os.getenv("OUTBOX_POLL_SEC", "30"))
+OUTBOX_LEASE_SEC = int(os.getenv("OUTBOX_LEASE_SEC", "120"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))
+OUTBOX_BACKOFF_BASE_SEC = float(os.getenv("OUTBOX_BACKOFF_BASE_SEC", "5"))
+OUTBOX_BACKOFF_MAX_SEC = float(os.getenv("OUTBOX_BACKOFF_MAX_SEC", "3600"))
+OUTBOX_RETENTION_DAYS = int(os.getenv("OUTBOX_RETENTION_DAYS", "30"))  # sent; failed хранятся
+OUTBOX_PURGE_EVERY_SEC = 3600
+NOTIFY_TIMEOUT_SEC = float(os.getenv("NOTIFY_TIMEOUT_SEC", "10"))
+
+NOTIFY_WEBHOOK_URL = os.getenv("NOTIFY_WEBHOOK_URL", "").strip()
+
+NOTIFY_VIBER_URL = os.getenv("NOTIFY_VIBER_URL", "https://chatapi.viber.com/pa/send_message").strip()
+NOTIFY_VIBER_TOKEN = os.getenv("NOTIFY_VIBER_TOKEN", "").strip()
+NOTIFY_VIBER_SENDER = os.getenv("NOTIFY_VIBER_SENDER", "LS Resort")
+NOTIFY_VIBER_RECEIVERS = [x.strip() for x in os.getenv("NOTIFY_VIBER_RECEIVERS", "").split(",") if x.strip()]
+
+NOTIFY_SMTP_HOST = os.getenv("NOTIFY_SMTP_HOST", "").strip()
+NOTIFY_SMTP_PORT = int(os.getenv("NOTIFY_SMTP_PORT", "587"))
+NOTIFY_SMTP_USER = os.getenv("NOTIFY_SMTP_USER", "")
+NOTIFY_SMTP_PASSWORD = os.getenv("NOTIFY_SMTP_PASSWORD", "")
+NOTIFY_SMTP_STARTTLS = os.getenv("NOTIFY_SMTP_STARTTLS", "1") == "1"
+NOTIFY_SMTP_FROM = os.getenv("NOTIFY_SMTP_FROM", NOTIFY_SMTP_USER or "noreply@localhost")
+NOTIFY_SMTP_TO = [x.strip() for x in os.getenv("NOTIFY_SMTP_TO", "").split(",") if x.strip()]
+
+
+def _targets() -> list[tuple[str, dict]]:
+    """(channel, адресат) для каждого включённого канала."""
+    out: list[tuple[str, dict]] = []
+    if NOTIFY_WEBHOOK_URL:
+        out.append(("webhook", {}))
+    if NOTIFY_VIBER_TOKEN:
+        out.extend(("viber", {"receiver": r}) for r in NOTIFY_VIBER_RECEIVERS)
+    if NOTIFY_SMTP_HOST and NOTIFY_SMTP_TO:
+        out.append(("smtp", {"to": NOTIFY_SMTP_TO}))
+    return out
+
+
+FANOUT = "fanout"
+
+OUTBOX_DDL = [
+    "CREATE TRIGGER IF NOT EXISTS contact_messages_outbox_ai AFTER INSERT ON contact_messages BEGIN "
+    "INSERT INTO outbox_events(kind, ref_id, channel, payload, status, attempts, created_at, next_attempt_at) "
+    "VALUES ('contact_message', new.id, 'fanout', json_object("
+    "'id', new.id, 'name', new.name, 'phone', new.phone, 'email', new.email, 'topic', new.topic, "
+    "'message', new.message, 'preferred_contact', new.preferred_contact, 'created_at', new.created_at"
+    "), 'pending', 0, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP); END",
+]
+
+
+async def ensure_outbox(conn: AsyncConnection) -> None:
+    """Триггер outbox (lifespan, после create_all)."""
+    for stmt in OUTBOX_DDL:
+        await conn.execute(text(stmt))
+
+
+def _expand(job: "_Job") -> list[dict]:
+    """Строка триггера -> строки по каналам (вставляются в транзакции итога пачки)."""
+    now = datetime.utcnow()
+    return [
+        {
+            "kind": job.kind,
+            "ref_id": job.ref_id,
+            "channel": channel,
+            "payload": json.dumps({"event": job.payload, **to}, ensure_ascii=False),
+            "status": "pending",
+            "attempts": 0,
+            "created_at": now,
+            "next_attempt_at": now,
+        }
+        for channel, to in _targets()
+    ]
+
+
+# -------------------------
+# Текст уведомления
+# -------------------------
+def _subject(kind: str, event: dict) -> str:
+    if kind == "contact_message":
+        return f"Нова заявка #{event.get('id')}: {event.get('name', '')}"
+    return f"{kind} #{event.get('id')}"
+
+
+def _text(kind: str, event: dict) -> str:
+    if kind == "contact_message":
+        lines = [
+            _subject(kind, event),
+            f"Телефон: {event.get('phone', '')}",
+            f"Email: {event.get('email') or '-'}",
+            f"Тема: {event.get('topic') or '-'}",
+            f"Зв'язок: {event.get('preferred_contact', '')}",
+            "",
+            event.get("message", ""),
+        ]
+        return "\n".join(lines)
+    return json.dumps(event, ensure_ascii=False)
+
+
+# -------------------------
+# Доставка
+# -------------------------
+@dataclass
+class _Job:
+    id: int
+    kind: str
+    ref_id: int | None
+    channel: str
+    payload: dict
+    attempts: int
+
+
+class DeliveryError(Exception):
+    def __init__(self, message: str, permanent: bool = False):
+        super().__init__(message)
+        self.permanent = permanent
+
+
+def _check_http(resp: httpx.Response) -> None:
+    if resp.status_code == 429 or resp.status_code >= 500:
+        raise DeliveryError(f"HTTP {resp.status_code}")
+    if resp.status_code >= 400:
+        raise DeliveryError(f"HTTP {resp.status_code}: {resp.text[:200]}", permanent=True)
+
+
+async def _deliver_http(client: httpx.AsyncClient, job: _Job) -> None:
+    event = job.payload["event"]
+    try:
+        if job.channel == "webhook":
+            resp = await client.post(
+                NOTIFY_WEBHOOK_URL,
+                json={"id": job.id, "kind": job.kind, "event": event},
+                headers={"Idempotency-Key": f"outbox-{job.id}"},
+            )
+            _check_http(resp)
+        elif job.channel == "viber":
+            resp = await client.post(
+                NOTIFY_VIBER_URL,
+                json={
+                    "receiver": job.payload["receiver"],
+                    "min_api_version": 1,
+                    "sender": {"name": NOTIFY_VIBER_SENDER},
+                    "type": "text",
+                    "text": _text(job.kind, event),
+                },
+                headers={"X-Viber-Auth-Token": NOTIFY_VIBER_TOKEN},
+            )
+            _check_http(resp)
+            # Viber отвечает 200 и кодом ошибки в теле
+            status = resp.json().get("status", 0)
+            if status != 0:
+                raise DeliveryError(f"viber status {status}: {resp.json().get('status_message', '')}")
+        else:
+            raise DeliveryError(f"unknown channel {job.channel}", permanent=True)
+    except httpx.HTTPError as e:
+        raise DeliveryError(f"{type(e).__name__}: {e}") from None
+    except ValueError as e:  # невалидный JSON ответа
+        raise DeliveryError(f"bad response: {e}") from None
+
+
+def _send_smtp(jobs: list[_Job]) -> dict[int, DeliveryError | None]:
+    """Все письма пачки одним соединением (в потоке)."""
+    try:
+        with smtplib.SMTP(NOTIFY_SMTP_HOST, NOTIFY_SMTP_PORT, timeout=NOTIFY_TIMEOUT_SEC) as smtp:
+            if NOTIFY_SMTP_STARTTLS:
+                smtp.starttls()
+            if NOTIFY_SMTP_USER:
+                smtp.login(NOTIFY_SMTP_USER, NOTIFY_SMTP_PASSWORD)
+            result: dict[int, DeliveryError | None] = {}
+            for job in jobs:
+                msg = EmailMessage()
+                msg["From"] = NOTIFY_SMTP_FROM
+                msg["To"] = ", ".join(job.payload["to"])
+                msg["Subject"] = _subject(job.kind, job.payload["event"])
+                msg.set_content(_text(job.kind, job.payload["event"]))
+                try:
+                    smtp.send_message(msg)
+                    result[job.id] = None
+                except smtplib.SMTPRecipientsRefused as e:
+                    result[job.id] = DeliveryError(f"recipients refused: {e.recipients}", permanent=True)
+                except smtplib.SMTPResponseException as e:
+                    result[job.id] = DeliveryError(f"SMTP {e.smtp_code}", permanent=500 <= e.smtp_code < 600)
+            return result
+    except (OSError, smtplib.SMTPException) as e:
+        err = DeliveryError(f"{type(e).__name__}: {e}")
+        return {job.id: err for job in jobs}
+
+
+def backoff_sec(attempts: int) -> float:
+    """attempts-я неудача -> пауза base * 2^(attempts-1), не больше max, jitter ±20%."""
+    delay = min(OUTBOX_BACKOFF_MAX_SEC, OUTBOX_BACKOFF_BASE_SEC * 2 ** (attempts - 1))
+    return delay * random.uniform(0.8, 1.2)
+
+
+class OutboxWorker:
+    def __init__(
+        self,
+        batch_size: int = OUTBOX_BATCH,
+        concurrency: int = OUTBOX_CONCURRENCY,
+        flush_ms: int = OUTBOX_FLUSH_MS,
+        poll_sec: float = OUTBOX_POLL_SEC,
+    ):
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.flush_s = flush_ms / 1000
+        self.poll_sec = poll_sec
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self._wake: asyncio.Event | None = None
+        self._stopping = False
+        self._task: asyncio.Task | None = None
+        self._client: httpx.AsyncClient | None = None
+        self._last_purge = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        self._wake = asyncio.Event()
+        self._stopping = False
+        self._client = httpx.AsyncClient(
+            timeout=NOTIFY_TIMEOUT_SEC,
+            limits=httpx.Limits(max_connections=self.concurrency),
+        )
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Доставить текущую пачку и остановиться (lifespan); остальное — при следующем старте."""
+        if self.running:
+            self._stopping = True
+            self._wake.set()
+            await self._task
+        self._task = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def wake(self) -> None:
+        """Из обработчика запроса после commit: не ждёт ничего."""
+        if self._wake is not None:
+            self._wake.set()
+
+    def stats(self) -> dict:
+        return {"sent": self.sent, "retried": self.retried, "failed": self.failed}
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while not self._stopping:
+            self._wake.clear()
+            try:
+                claimed = await self.run_once()
+                if claimed >= self.batch_size:
+                    continue  # очередь не пуста — следующую пачку сразу
+                if loop.time() - self._last_purge >= OUTBOX_PURGE_EVERY_SEC:
+                    self._last_purge = loop.time()
+                    await purge_sent()
+                timeout = await self._idle_timeout()
+            except Exception:
+                log.exception("outbox worker iteration failed")
+                timeout = self.poll_sec
+            if timeout > 0:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout)
+                except asyncio.TimeoutError:
+                    continue
+                # разбудили заявкой — подождать соседние, чтобы взять их одной пачкой
+                if not self._stopping and self.flush_s > 0:
+                    await asyncio.sleep(self.flush_s)
+
+    async def _idle_timeout(self) -> float:
+        """До ближайшего повтора, но не дольше poll_sec (строки от других процессов)."""
+        async with AsyncSessionLocal() as db:
+            nxt = await db.scalar(
+                select(func.min(OutboxEvent.next_attempt_at)).where(OutboxEvent.status == "pending")
+            )
+        if nxt is None:
+            return self.poll_sec
+        return max(0.0, min(self.poll_sec, (nxt - datetime.utcnow()).total_seconds()))
+
+    async def run_once(self) -> int:
+        """Забрать и доставить одну пачку. Возвращает число забранных строк."""
+        jobs = await self._claim()
+        if not jobs:
+            return 0
+        fanout = [j for j in jobs if j.channel == FANOUT]
+        jobs = [j for j in jobs if j.channel != FANOUT]
+        results = await self._deliver(jobs) if jobs else {}
+        await self._record(jobs, results, fanout)
+        return len(jobs) + len(fanout)
+
+    async def _claim(self) -> list[_Job]:
+        now = datetime.utcnow()
+        due = (
+            select(OutboxEvent.id)
+            .where(OutboxEvent.status == "pending", OutboxEvent.next_attempt_at <= now)
+            .order_by(OutboxEvent.next_attempt_at)
+            .limit(self.batch_size)
+        )
+        async with AsyncSessionLocal() as db:
+            rows = (
+                await db.execute(
+                    update(OutboxEvent)
+                    .where(OutboxEvent.id.in_(due.scalar_subquery()))
+                    .values(
+                        next_attempt_at=now + timedelta(seconds=OUTBOX_LEASE_SEC),
+                        attempts=OutboxEvent.attempts + 1,
+                    )
+                    .returning(
+                        OutboxEvent.id, OutboxEvent.kind, OutboxEvent.ref_id,
+                        OutboxEvent.channel, OutboxEvent.payload, OutboxEvent.attempts,
+                    )
+                )
+            ).all()
+            await db.commit()
+        return [_Job(r[0], r[1], r[2], r[3], json.loads(r[4]), r[5]) for r in rows]
+
+    async def _deliver(self, jobs: list[_Job]) -> dict[int, DeliveryError | None]:
+        client = self._client or httpx.AsyncClient(timeout=NOTIFY_TIMEOUT_SEC)
+        sem = asyncio.Semaphore(self.concurrency)
+
+        async def one(job: _Job) -> tuple[int, DeliveryError | None]:
+            async with sem:
+                try:
+                    await _deliver_http(client, job)
+                    return job.id, None
+                except DeliveryError as e:
+                    return job.id, e
+
+        smtp_jobs = [j for j in jobs if j.channel == "smtp"]
+        http = [one(j) for j in jobs if j.channel != "smtp"]
+        try:
+            results = dict(await asyncio.gather(*http))
+            if smtp_jobs:
+                results.update(await asyncio.to_thread(_send_smtp, smtp_jobs))
+        finally:
+            if client is not self._client:
+                await client.aclose()
+        return results
+
+    async def _record(
+        self, jobs: list[_Job], results: dict[int, DeliveryError | None], fanout: list[_Job]
+    ) -> None:
+        now = datetime.utcnow()
+        sent_ids = [j.id for j in fanout]
+        children = [row for j in fanout for row in _expand(j)]
+        rows = []
+        for job in jobs:
+            err = results.get(job.id)
+            if err is None:
+                sent_ids.append(job.id)
+            elif err.permanent or job.attempts >= OUTBOX_MAX_ATTEMPTS:
+                rows.append({"id": job.id, "status": "failed", "last_error": str(err), "next_attempt_at": now})
+                self.failed += 1
+                log.warning("outbox %s #%d failed after %d attempts: %s", job.channel, job.id, job.attempts, err)
+            else:
+                rows.append({
+                    "id": job.id,
+                    "status": "pending",
+                    "last_error": str(err),
+                    "next_attempt_at": now + timedelta(seconds=backoff_sec(job.attempts)),
+                })
+                self.retried += 1
+        self.sent += len(sent_ids) - len(fanout)
+        # обычный случай — всё доставлено: один UPDATE, write-lock на миллисекунды
+        async with AsyncSessionLocal() as db:
+            if children:
+                await db.execute(insert(OutboxEvent), children)
+            if sent_ids:
+                await db.execute(
+                    update(OutboxEvent)
+                    .where(OutboxEvent.id.in_(sent_ids))
+                    .values(status="sent", sent_at=now, last_error=None)
+                )
+            if rows:
+                await db.execute(update(OutboxEvent), rows)
+            await db.commit()
+
+
+async def purge_sent(retention_days: int = OUTBOX_RETENTION_DAYS) -> int:
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    async with AsyncSessionLocal() as db:
+        res = await db.execute(
+            delete(OutboxEvent).where(OutboxEvent.status == "sent", OutboxEvent.sent_at < cutoff)
+        )
+        await db.commit()
+    return res.rowcount
+
+
+async def outbox_counts(db: AsyncSession) -> list[tuple[str, str, int, datetime | None]]:
+    """(channel, status, cnt, самое старое created_at) — для админки."""
+    rows = await db.execute(
+        select(OutboxEvent.channel, OutboxEvent.status, func.count(), func.min(OutboxEvent.created_at))
+        .group_by(OutboxEvent.channel, OutboxEvent.status)
+        .order_by(OutboxEvent.channel, OutboxEvent.status)
+    )
+    return [tuple(r) for r in rows.all()]
+
+
+outbox_worker = OutboxWorker()
+
+
+# -------------------------
+# CLI
+# -------------------------
+async def _drain() -> dict:
+    worker = OutboxWorker()
+    while await worker.run_once():
+        pass
+    return worker.stats()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Deliver outbox notifications")
+    parser.add_argument("--once", action="store_true", help="deliver everything due now and exit")
+    args = parser.parse_args()
+    if args.once:
+        print(asyncio.run(_drain()))
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
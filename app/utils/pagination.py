@@ -0,0 +1,80 @@
+"""
+Keyset-пагинация (cursor) для админских списков.
+
+Страница = WHERE (k1, k2) < (последняя строка прошлой страницы)
+ORDER BY k1 DESC, k2 DESC LIMIT n+1 — стоимость не зависит от глубины,
+вставки между запросами не сдвигают и не дублируют строки.
+Последний ключ обязан быть уникальным (id).
+
+Курсор — base64url от JSON сырых значений ключей. Значения берутся
+как есть из SQLite (type_coerce без CAST), без обратного преобразования
+в datetime: строки с CURRENT_TIMESTAMP и с микросекундами сравниваются
+с курсором так же, как между собой в индексе.
+"""
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from typing import Any, Sequence
+
+from fastapi import HTTPException
+from sqlalchemy import Select, String, literal, tuple_, type_coerce
+from sqlalchemy.ext.asyncio import AsyncSession
+
+PAGE_DEFAULT = 50
+PAGE_MAX = 200
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps(list(values), separators=(",", ":"), ensure_ascii=False).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, n: int) -> list[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, ValueError):
+        raise HTTPException(400, "Invalid cursor")
+    if (
+        not isinstance(values, list)
+        or len(values) != n
+        or not all(isinstance(v, (str, int)) and not isinstance(v, bool) for v in values)
+    ):
+        raise HTTPException(400, "Invalid cursor")
+    return values
+
+
+def keyset_select(q: Select, keys: Sequence, after: Sequence[Any] | None, limit: int) -> Select:
+    """Запрос страницы: строки после after (сырые значения ключей), limit+1 для has_more."""
+    if after:
+        bound = [literal(v) for v in after]
+        if len(keys) == 1:
+            q = q.where(keys[0] < bound[0])
+        else:
+            q = q.where(tuple_(*keys) < tuple_(*bound))
+
+    return (
+        q.add_columns(*[type_coerce(k, String).label(f"_k{i}") for i, k in enumerate(keys)])
+        .order_by(*[k.desc() for k in keys])
+        .limit(limit + 1)
+    )
+
+
+async def keyset_page(
+    db: AsyncSession, q: Select, keys: Sequence, cursor: str | None, limit: int
+) -> dict:
+    """
+    q — select(Model) с фильтрами, без order_by/limit; keys — столбцы сортировки (DESC).
+    Возвращает dict под схему Page: items (ORM-объекты), next_cursor, has_more.
+    """
+    after = decode_cursor(cursor, len(keys)) if cursor else None
+    rows = (await db.execute(keyset_select(q, keys, after, limit))).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        "items": [r[0] for r in rows],
+        "next_cursor": encode_cursor(rows[-1][1:]) if has_more else None,
+        "has_more": has_more,
+    }
@@ -0,0 +1,237 @@
+"""
+Ограничение частоты для публичных пишущих эндпоинтов (token bucket по IP и маршруту).
+
+Политика — "N/SECONDS": ведро на N запросов, пополняется N за SECONDS
+(равномерно), т.е. допускается всплеск до N и дальше в среднем N за окно.
+Подключается зависимостью маршрута:
+    @router.post("/send", dependencies=[Depends(rate_limit("contact_send"))])
+FastAPI решает зависимости маршрута раньше параметров эндпоинта (get_db,
+тело в БД, хэш пароля), так что 429 уходит до любой работы с БД/argon2.
+
+Бэкенды (RATE_LIMIT_BACKEND):
+    memory — словарь в процессе, O(1) на проверку; ведра, простоявшие дольше
+             полного пополнения, вытесняются (они эквивалентны отсутствующим).
+    sqlite — отдельный файл RATE_LIMIT_SQLITE_PATH, общий для воркеров uvicorn:
+             проверка и списание — один UPSERT ... RETURNING, атомарно между
+             процессами. Основную БД не трогает (единственный writer занят делом).
+             sqlite3 блокирующий, поэтому проверка уходит в поток (asyncio.to_thread),
+             а busy_timeout — RATE_LIMIT_SQLITE_BUSY_MS: файл занят дольше —
+             запрос пропускается (fail open), а не ждёт в очереди за счётчиком.
+
+IP клиента — request.client.host; за reverse-proxy (RATE_LIMIT_TRUST_PROXY=1)
+последний адрес X-Forwarded-For (его дописал наш proxy, подделать нельзя).
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from fastapi import HTTPException, Request
+
+log = logging.getLogger(__name__)
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "1") == "1"
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")  # memory | sqlite
+RATE_LIMIT_SQLITE_PATH = os.getenv("RATE_LIMIT_SQLITE_PATH", "./ratelimit.db")
+RATE_LIMIT_TRUST_PROXY = os.getenv("RATE_LIMIT_TRUST_PROXY", "0") == "1"
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+RATE_LIMIT_SQLITE_BUSY_MS = int(os.getenv("RATE_LIMIT_SQLITE_BUSY_MS", "5"))
+
+# имя -> "N/SECONDS"; переопределяется RATE_LIMIT_<ИМЯ>, "0" — без ограничения
+DEFAULT_POLICIES = {
+    "contact_send": "5/600",
+    "review_create": "3/600",
+    "search_log": "120/60",
+    "auth_login": "10/300",
+    "auth_register": "5/3600",
+    "auth_refresh": "30/300",
+}
+
+
+@dataclass(frozen=True)
+class Policy:
+    name: str
+    capacity: float
+    rate: float  # токенов в секунду
+
+    @classmethod
+    def parse(cls, name: str, spec: str) -> Policy | None:
+        spec = spec.strip()
+        if spec in ("", "0"):
+            return None
+        n, _, sec = spec.partition("/")
+        capacity, window = float(n), float(sec or 1)
+        if capacity <= 0 or window <= 0:
+            raise ValueError(f"bad rate limit {name}={spec!r}, expected N/SECONDS")
+        return cls(name, capacity, capacity / window)
+
+    @property
+    def full_after(self) -> float:
+        """Через сколько секунд простоя ведро гарантированно полное."""
+        return self.capacity / self.rate
+
+
+def load_policies() -> dict[str, Policy | None]:
+    return {
+        name: Policy.parse(name, os.getenv(f"RATE_LIMIT_{name.upper()}", spec))
+        for name, spec in DEFAULT_POLICIES.items()
+    }
+
+
+class MemoryBackend:
+    blocking = False
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        # key -> [tokens, ts]; порядок — по последнему обращению (старые слева)
+        self._buckets: OrderedDict[tuple[str, str], list[float]] = OrderedDict()
+        self._idle_max = 0.0
+
+    def take(self, policy: Policy, ip: str) -> float:
+        """Списать токен. 0 — можно; иначе через сколько секунд появится токен."""
+        now = time.monotonic()
+        key = (policy.name, ip)
+        b = self._buckets.get(key)
+        if b is None:
+            b = self._buckets[key] = [policy.capacity, now]
+        else:
+            self._buckets.move_to_end(key)
+            b[0] = min(policy.capacity, b[0] + (now - b[1]) * policy.rate)
+            b[1] = now
+        self._idle_max = max(self._idle_max, policy.full_after)
+        self._evict(now)
+
+        if b[0] >= 1:
+            b[0] -= 1
+            return 0.0
+        return (1 - b[0]) / policy.rate
+
+    def _evict(self, now: float) -> None:
+        # слева — давно не трогали; полные ведра выбрасываем, переполнение режем жёстко
+        while self._buckets:
+            key, (_, ts) = next(iter(self._buckets.items()))
+            if now - ts < self._idle_max and len(self._buckets) <= self.max_keys:
+                break
+            self._buckets.popitem(last=False)
+
+
+class SqliteBackend:
+    DDL = (
+        "CREATE TABLE IF NOT EXISTS rate_buckets ("
+        "key TEXT PRIMARY KEY, tokens REAL NOT NULL, ts REAL NOT NULL) WITHOUT ROWID"
+    )
+    # пополнить и списать одним оператором; не хватило токена — строка не меняется и не возвращается
+    TAKE = (
+        "INSERT INTO rate_buckets(key, tokens, ts) VALUES (:key, :cap - 1, :now) "
+        "ON CONFLICT(key) DO UPDATE SET "
+        "tokens = min(:cap, tokens + (:now - ts) * :rate) - 1, ts = :now "
+        "WHERE min(:cap, tokens + (:now - ts) * :rate) >= 1 "
+        "RETURNING tokens"
+    )
+    SWEEP_EVERY = 1000
+    blocking = True
+
+    def __init__(self, path: str = RATE_LIMIT_SQLITE_PATH, busy_ms: int = RATE_LIMIT_SQLITE_BUSY_MS):
+        self.path = path
+        self.busy_ms = busy_ms
+        self._local = threading.local()
+        self._calls = 0
+        self._idle_max = 0.0
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")  # счётчики, не данные
+            conn.execute(f"PRAGMA busy_timeout={int(self.busy_ms)}")
+            conn.execute(self.DDL)
+            self._local.conn = conn
+        return conn
+
+    def take(self, policy: Policy, ip: str) -> float:
+        now = time.time()
+        key = f"{policy.name}|{ip}"
+        conn = self._conn()
+        self._idle_max = max(self._idle_max, policy.full_after)
+        self._calls += 1
+        if self._calls % self.SWEEP_EVERY == 0:
+            conn.execute("DELETE FROM rate_buckets WHERE ts < ?", (now - self._idle_max,))
+
+        row = conn.execute(
+            self.TAKE, {"key": key, "cap": policy.capacity, "now": now, "rate": policy.rate}
+        ).fetchone()
+        if row is not None:
+            return 0.0
+        row = conn.execute("SELECT tokens, ts FROM rate_buckets WHERE key = ?", (key,)).fetchone()
+        tokens = min(policy.capacity, row[0] + (now - row[1]) * policy.rate) if row else 0.0
+        return max(0.0, (1 - tokens) / policy.rate)
+
+
+class RateLimiter:
+    def __init__(self, backend, policies: dict[str, Policy | None], enabled: bool = True):
+        self.backend = backend
+        self.policies = policies
+        self.enabled = enabled
+        self.allowed: dict[str, int] = {}
+        self.limited: dict[str, int] = {}
+
+    async def check(self, name: str, ip: str) -> float:
+        """0 — пропустить; иначе секунды до следующей попытки."""
+        policy = self.policies.get(name)
+        if not self.enabled or policy is None:
+            return 0.0
+        try:
+            if self.backend.blocking:
+                wait = await asyncio.to_thread(self.backend.take, policy, ip)
+            else:
+                wait = self.backend.take(policy, ip)
+        except sqlite3.Error:
+            # общий бэкенд недоступен или занят дольше busy_timeout — не роняем запросы из-за счётчика
+            log.exception("rate limit backend failed, allowing request")
+            return 0.0
+        counter = self.limited if wait else self.allowed
+        counter[name] = counter.get(name, 0) + 1
+        return wait
+
+    def stats(self) -> dict:
+        return {"allowed": dict(self.allowed), "limited": dict(self.limited)}
+
+
+def client_ip(request: Request) -> str:
+    if RATE_LIMIT_TRUST_PROXY:
+        xff = request.headers.get("x-forwarded-for")
+        if xff:
+            return xff.rsplit(",", 1)[-1].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def _make_backend():
+    if RATE_LIMIT_BACKEND == "sqlite":
+        return SqliteBackend()
+    return MemoryBackend()
+
+
+limiter = RateLimiter(_make_backend(), load_policies(), RATE_LIMIT_ENABLED)
+
+
+def rate_limit(name: str):
+    """Зависимость маршрута: 429 + Retry-After, если ведро пустое."""
+    if name not in limiter.policies:
+        raise KeyError(f"unknown rate limit policy {name!r}")
+
+    async def dependency(request: Request) -> None:
+        wait = await limiter.check(name, client_ip(request))
+        if wait:
+            raise HTTPException(
+                429, "Too many requests, retry later", headers={"Retry-After": str(math.ceil(wait))}
+            )
+
+    return dependency
@@ -0,0 +1,83 @@
+"""
+Недавние запросы сессии для /suggest (type="recent").
+
+LRU на SEARCH_RECENT_MAX_SESSIONS сессий, у каждой — кольцевой буфер
+на SEARCH_RECENT_PER_SESSION запросов. Поток новых session_id вытесняет
+самые старые сессии, память ограничена сверху.
+Сессия, впервые увиденная через log_search, помечается неполной:
+при первом чтении её история догружается из search_events.
+"""
+from __future__ import annotations
+
+import os
+from collections import OrderedDict, deque
+
+SEARCH_RECENT_MAX_SESSIONS = int(os.getenv("SEARCH_RECENT_MAX_SESSIONS", "10000"))
+SEARCH_RECENT_PER_SESSION = int(os.getenv("SEARCH_RECENT_PER_SESSION", "8"))
+
+
+class _Ring:
+    __slots__ = ("items", "complete")
+
+    def __init__(self, size: int, complete: bool):
+        self.items: deque[tuple[str, str]] = deque(maxlen=size)  # (query, query_norm), старые слева
+        self.complete = complete
+
+    def push(self, query: str, q_norm: str) -> None:
+        for i, (_, qn) in enumerate(self.items):
+            if qn == q_norm:
+                del self.items[i]
+                break
+        self.items.append((query, q_norm))
+
+
+class RecentQueries:
+    def __init__(
+        self,
+        max_sessions: int = SEARCH_RECENT_MAX_SESSIONS,
+        per_session: int = SEARCH_RECENT_PER_SESSION,
+    ):
+        self.max_sessions = max_sessions
+        self.per_session = per_session
+        self._sessions: OrderedDict[str, _Ring] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _slot(self, session_id: str, complete: bool) -> _Ring:
+        ring = self._sessions.get(session_id)
+        if ring is None:
+            ring = self._sessions[session_id] = _Ring(self.per_session, complete)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        else:
+            self._sessions.move_to_end(session_id)
+        return ring
+
+    def add(self, session_id: str, query: str, q_norm: str) -> None:
+        if q_norm:
+            self._slot(session_id, complete=False).push(query, q_norm)
+
+    def get(self, session_id: str) -> list[tuple[str, str]] | None:
+        """Свежие первыми; None — в кэше нет полной истории, нужен запрос в БД."""
+        ring = self._sessions.get(session_id)
+        if ring is None or not ring.complete:
+            return None
+        self._sessions.move_to_end(session_id)
+        return list(reversed(ring.items))
+
+    def fill(self, session_id: str, rows: list[tuple[str, str]]) -> list[tuple[str, str]]:
+        """rows из БД (свежие первыми) + то, что уже успело прийти через add()."""
+        ring = self._slot(session_id, complete=True)
+        pending = list(ring.items)
+        ring.items.clear()
+        for query, q_norm in reversed(rows):
+            if q_norm:
+                ring.push(query, q_norm)
+        for query, q_norm in pending:
+            ring.push(query, q_norm)
+        ring.complete = True
+        return list(reversed(ring.items))
+
+
+recent_queries = RecentQueries()
@@ -0,0 +1,142 @@
+"""
+In-process кэш готовых JSON-ответов (bytes + ETag).
+
+DataVersion — счётчик версии набора данных + время последнего изменения;
+из него строятся валидаторы (ETag / Last-Modified) без рендера тела.
+ResponseCache поверх него хранит закодированные тела: тело кодируется
+один раз на версию данных, invalidate() поднимает версию. Параллельные
+промахи собираются одной сборкой (lock), сборка, начатая до invalidate(),
+в кэш не попадает.
+
+serve_stale=True: после invalidate() старое тело (со своими старыми ETag
+и Last-Modified) отдаётся сразу, а свежее собирается в фоне — запрос не ждёт БД.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Hashable
+
+log = logging.getLogger(__name__)
+
+# разные процессы/рестарты не должны выдавать одинаковый ETag для разных данных
+_BOOT = os.urandom(4).hex()
+
+_caches: list["ResponseCache"] = []
+
+
+@dataclass(frozen=True)
+class CachedBody:
+    body: bytes
+    etag: str
+    last_modified: datetime  # версии, из которой собрано тело — не текущей
+
+
+def _now() -> datetime:
+    # Last-Modified передаётся с точностью до секунды
+    return datetime.now(timezone.utc).replace(microsecond=0)
+
+
+class DataVersion:
+    def __init__(self, name: str):
+        self.name = name
+        self.version = 0
+        self.last_modified = _now()
+
+    def etag(self, key: Hashable = None, version: int | None = None) -> str:
+        suffix = f"-{key}" if key is not None else ""
+        v = self.version if version is None else version
+        return f'W/"{self.name}-{_BOOT}-{v}{suffix}"'
+
+    def bump(self) -> None:
+        self.version += 1
+        self.last_modified = _now()
+
+
+class ResponseCache(DataVersion):
+    def __init__(self, name: str, serve_stale: bool = False):
+        super().__init__(name)
+        self.serve_stale = serve_stale
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self._entries: dict[Hashable, CachedBody] = {}
+        self._stale: dict[Hashable, CachedBody] = {}
+        self._refreshing: set[Hashable] = set()
+        self._tasks: set[asyncio.Task] = set()
+        self._lock = asyncio.Lock()
+        _caches.append(self)
+
+    def peek(self, key: Hashable = None) -> CachedBody | None:
+        return self._entries.get(key)
+
+    async def _build(self, builder: Callable[[], Awaitable[bytes]], key: Hashable) -> CachedBody:
+        """Под self._lock."""
+        self.misses += 1
+        version, last_modified = self.version, self.last_modified
+        entry = CachedBody(await builder(), self.etag(key, version), last_modified)
+        if version == self.version:
+            self._entries[key] = entry
+            self._stale.pop(key, None)
+        return entry
+
+    async def get_or_build(
+        self, builder: Callable[[], Awaitable[bytes]], key: Hashable = None
+    ) -> CachedBody:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            return entry
+
+        if self.serve_stale:
+            stale = self._stale.get(key)
+            if stale is not None:
+                self.stale_hits += 1
+                if key not in self._refreshing:
+                    self._refreshing.add(key)
+                    task = asyncio.create_task(self._refresh(builder, key))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+                return stale
+
+        async with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                return entry
+            return await self._build(builder, key)
+
+    async def _refresh(self, builder: Callable[[], Awaitable[bytes]], key: Hashable) -> None:
+        try:
+            async with self._lock:
+                if key not in self._entries:
+                    await self._build(builder, key)
+        except Exception:
+            log.exception("%s: background refresh failed", self.name)
+        finally:
+            self._refreshing.discard(key)
+
+    def invalidate(self) -> None:
+        self.bump()
+        if self.serve_stale:
+            self._stale.update(self._entries)
+        self._entries = {}
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses + self.stale_hits
+        return {
+            "name": self.name,
+            "version": self.version,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.stale_hits) / total, 4) if total else 0.0,
+        }
+
+
+def cache_stats() -> list[dict]:
+    return [c.stats() for c in _caches]
@@ -0,0 +1,119 @@
+"""
+Сводка по отзывам (review_stats) для "4.9 ★ из 312 отзывов" и разбивки по sentiment.
+
+review_stats: (status, sentiment) -> cnt, rating_sum. Ведётся триггерами на
+reviews — любой INSERT/DELETE/UPDATE OF status, sentiment, rating (роутер,
+массовая модерация, пересчёт sentiment, ручная правка в БД) меняет сводку
+той же транзакцией. Чтение — несколько строк, без агрегации по reviews.
+
+Расхождение (триггеры отключали, таблицу правили руками) чинит пересчёт:
+    python -m app.utils.review_stats [--check]
+или POST /api/reviews/stats/recompute (X-Admin-Token).
+"""
+from dotenv import load_dotenv
+load_dotenv()
+
+import argparse
+import asyncio
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.database import engine
+from app.models.models import ReviewStats
+
+_KEY = "status = {p}.status AND sentiment = coalesce({p}.sentiment, '')"
+
+
+def _add(p: str) -> str:
+    return (
+        "INSERT INTO review_stats(status, sentiment, cnt, rating_sum) "
+        f"VALUES ({p}.status, coalesce({p}.sentiment, ''), 1, {p}.rating) "
+        "ON CONFLICT(status, sentiment) DO UPDATE "
+        "SET cnt = cnt + 1, rating_sum = rating_sum + excluded.rating_sum;"
+    )
+
+
+def _sub(p: str) -> str:
+    return (
+        f"UPDATE review_stats SET cnt = cnt - 1, rating_sum = rating_sum - {p}.rating "
+        f"WHERE {_KEY.format(p=p)};"
+    )
+
+
+REVIEW_STATS_DDL = [
+    f"CREATE TRIGGER IF NOT EXISTS review_stats_ai AFTER INSERT ON reviews BEGIN {_add('new')} END",
+    f"CREATE TRIGGER IF NOT EXISTS review_stats_ad AFTER DELETE ON reviews BEGIN {_sub('old')} END",
+    "CREATE TRIGGER IF NOT EXISTS review_stats_au AFTER UPDATE OF status, sentiment, rating ON reviews "
+    f"BEGIN {_sub('old')} {_add('new')} END",
+]
+
+REVIEW_STATS_FILL = [
+    "DELETE FROM review_stats",
+    "INSERT INTO review_stats(status, sentiment, cnt, rating_sum) "
+    "SELECT status, coalesce(sentiment, ''), count(*), sum(rating) FROM reviews "
+    "GROUP BY status, coalesce(sentiment, '')",
+]
+
+
+async def ensure_review_stats(conn: AsyncConnection) -> None:
+    """Триггеры сводки (lifespan, после create_all); при первом создании — заполнить."""
+    exists = (
+        await conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'review_stats_ai'")
+        )
+    ).first()
+    for stmt in REVIEW_STATS_DDL:
+        await conn.execute(text(stmt))
+    if not exists:
+        for stmt in REVIEW_STATS_FILL:
+            await conn.execute(text(stmt))
+
+
+async def _snapshot(conn: AsyncConnection) -> dict[tuple[str, str], tuple[int, int]]:
+    rows = await conn.execute(
+        text("SELECT status, sentiment, cnt, rating_sum FROM review_stats WHERE cnt != 0")
+    )
+    return {(r[0], r[1]): (r[2], r[3]) for r in rows.all()}
+
+
+async def recompute_review_stats(dry_run: bool = False) -> dict:
+    """
+    Пересчитать сводку из reviews одной транзакцией.
+    Возвращает расхождения {'status/sentiment': [было, стало]} по (cnt, rating_sum).
+    """
+    async with engine.connect() as conn:
+        before = await _snapshot(conn)
+        for stmt in REVIEW_STATS_FILL:
+            await conn.execute(text(stmt))
+        after = await _snapshot(conn)
+        if dry_run:
+            await conn.rollback()
+        else:
+            await conn.commit()
+
+    drift = {}
+    for key in sorted(before.keys() | after.keys()):
+        if before.get(key) != after.get(key):
+            status, sentiment = key
+            drift[f"{status}/{sentiment or '-'}"] = [before.get(key, (0, 0)), after.get(key, (0, 0))]
+    return {"drift": drift, "fixed": bool(drift) and not dry_run}
+
+
+async def load_review_stats(db: AsyncSession) -> list[tuple[str, str, int, int]]:
+    rows = await db.execute(
+        select(ReviewStats.status, ReviewStats.sentiment, ReviewStats.cnt, ReviewStats.rating_sum)
+        .where(ReviewStats.cnt > 0)
+    )
+    return [tuple(r) for r in rows.all()]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Recompute review_stats from reviews")
+    parser.add_argument("--check", action="store_true", help="only report drift, do not write")
+    args = parser.parse_args()
+    print(asyncio.run(recompute_review_stats(dry_run=args.check)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+In-memory индекс для /api/search/suggest.
+
+token -> postings (entry_id, weight) + отсортированный список токенов,
+поэтому и точное совпадение, и дополнение префикса — это bisect, а не перебор.
+Если токен не нашёлся ни точно, ни префиксом — нечёткий поиск по словарю
+ключевых слов и названий услуг (app.utils.fuzzy).
+Индекс иммутабельный: при изменении каталога строится новый и подменяется целиком.
+"""
+from __future__ import annotations
+
+import re
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Iterable
+
+from app.utils.fuzzy import NGramIndex
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+INTENT_KEYWORD_WEIGHT = 10.0
+SERVICE_TITLE_WEIGHT = 6.0
+SERVICE_DESCRIPTION_WEIGHT = 2.0
+
+PREFIX_FACTOR = 0.8      # дополнение ("мас" -> "масаж") чуть ниже точного совпадения
+MIN_STEM_LEN = 3         # "масажі" -> "масаж"
+MAX_EXPANSIONS = 64      # потолок дополнений на один токен запроса
+FUZZY_FACTOR = 0.6       # опечатка: вес / distance
+VARIANT_FACTOR = 0.9     # раскладка / транслит
+SUGGEST_LIMIT = 8
+
+
+def tokenize(text: str | None) -> list[str]:
+    return TOKEN_RE.findall((text or "").lower())
+
+
+@dataclass(frozen=True)
+class IndexEntry:
+    kind: str  # intent | service
+    route: str
+    title_ua: str
+    title_ru: str
+    item_id: int | None = None
+
+    def title(self, lang: str) -> str:
+        return self.title_ua if lang == "ua" else self.title_ru
+
+
+@dataclass(frozen=True)
+class IndexHit:
+    entry: IndexEntry
+    score: float
+
+
+class SuggestIndex:
+    def __init__(
+        self,
+        entries: list[IndexEntry],
+        postings: dict[str, dict[int, float]],
+        fuzzy_terms: Iterable[str] = (),
+    ):
+        self.entries = entries
+        self._postings = postings
+        self._tokens = sorted(postings)
+        self._by_route = {e.route: e for e in entries}
+        self._by_item = {e.item_id: e for e in entries if e.item_id is not None}
+        self._fuzzy = NGramIndex(sorted(set(fuzzy_terms)))
+
+    @classmethod
+    def build(cls, intents: Iterable[dict], services: Iterable) -> "SuggestIndex":
+        entries: list[IndexEntry] = []
+        postings: dict[str, dict[int, float]] = {}
+        fuzzy_terms: list[str] = []
+
+        def add(entry_id: int, tokens: Iterable[str], weight: float) -> None:
+            for tok in tokens:
+                slot = postings.setdefault(tok, {})
+                if slot.get(entry_id, 0.0) < weight:
+                    slot[entry_id] = weight
+
+        for it in intents:
+            entry_id = len(entries)
+            entries.append(IndexEntry("intent", it["route"], it["title_ua"], it["title_ru"]))
+            for kw in it["keywords"]:
+                tokens = tokenize(kw)
+                add(entry_id, tokens, INTENT_KEYWORD_WEIGHT)
+                fuzzy_terms.extend(tokens)
+
+        for s in services:
+            entry_id = len(entries)
+            entries.append(
+                IndexEntry("service", f"/{s.type}?item={s.id}", s.title, s.title, item_id=s.id)
+            )
+            title_tokens = tokenize(s.title)
+            add(entry_id, title_tokens, SERVICE_TITLE_WEIGHT)
+            add(entry_id, tokenize(s.description), SERVICE_DESCRIPTION_WEIGHT)
+            fuzzy_terms.extend(title_tokens)
+
+        return cls(entries, postings, fuzzy_terms)
+
+    @classmethod
+    def empty(cls) -> "SuggestIndex":
+        return cls([], {})
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+    def by_route(self, route: str) -> IndexEntry | None:
+        return self._by_route.get(route)
+
+    def by_item(self, item_id: int) -> IndexEntry | None:
+        return self._by_item.get(item_id)
+
+    def _match_token(self, tok: str) -> dict[int, float]:
+        """entry_id -> лучший вес для одного токена запроса."""
+        found: dict[int, float] = {}
+
+        def take(posting: dict[int, float], factor: float) -> None:
+            for entry_id, w in posting.items():
+                w *= factor
+                if found.get(entry_id, 0.0) < w:
+                    found[entry_id] = w
+
+        # токен запроса длиннее ключевого слова: "масажі" -> "масаж"
+        for k in range(MIN_STEM_LEN, len(tok) + 1):
+            posting = self._postings.get(tok[:k])
+            if posting:
+                take(posting, 1.0)
+
+        # токен запроса — префикс: "мас" -> "масаж", "массаж"
+        i = bisect_left(self._tokens, tok)
+        n = 0
+        while i < len(self._tokens) and n < MAX_EXPANSIONS:
+            cand = self._tokens[i]
+            if not cand.startswith(tok):
+                break
+            if cand != tok:
+                take(self._postings[cand], PREFIX_FACTOR)
+            i += 1
+            n += 1
+
+        if not found:
+            for m in self._fuzzy.lookup(tok):
+                take(self._postings[m.term], FUZZY_FACTOR / m.distance)
+
+        return found
+
+    def _scores(self, q_norm: str) -> dict[int, float]:
+        scores: dict[int, float] = {}
+        for tok in dict.fromkeys(tokenize(q_norm)):
+            for entry_id, w in self._match_token(tok).items():
+                scores[entry_id] = scores.get(entry_id, 0.0) + w
+        return scores
+
+    def search(
+        self, q_norm: str, variants: Iterable[str] = (), limit: int = SUGGEST_LIMIT
+    ) -> list[IndexHit]:
+        scores = self._scores(q_norm)
+        for v in variants:
+            for entry_id, w in self._scores(v).items():
+                w *= VARIANT_FACTOR
+                if scores.get(entry_id, 0.0) < w:
+                    scores[entry_id] = w
+
+        ranked = sorted(scores.items(), key=lambda x: (-x[1], x[0]))[:limit]
+        return [IndexHit(self.entries[entry_id], score) for entry_id, score in ranked]
+
+
+class SuggestIndexHolder:
+    """Ссылка на текущий индекс; rebuild подменяет её одним присваиванием."""
+
+    def __init__(self) -> None:
+        self.index = SuggestIndex.empty()
+
+    def replace(self, index: SuggestIndex) -> None:
+        self.index = index
+
+
+suggest_index = SuggestIndexHolder()
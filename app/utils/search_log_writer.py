@@ -0,0 +1,132 @@
+"""
+Буферизованная запись search_events.
+
+POST /api/search/log только кладёт событие в ограниченную очередь;
+фоновая задача сбрасывает её пачками (executemany) в одной транзакции —
+по размеру SEARCH_LOG_BATCH или по таймеру SEARCH_LOG_FLUSH_MS.
+При переполнении очереди запрос ждёт не дольше SEARCH_LOG_PUT_TIMEOUT_MS
+и получает отказ (backpressure), память не растёт.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+
+from sqlalchemy import insert
+
+from app.database import AsyncSessionLocal
+from app.models.models import SearchEvent
+from app.utils.search_stats import record_stats, stats_counts
+from app.utils.trending import trending
+
+log = logging.getLogger(__name__)
+
+SEARCH_LOG_BATCH = int(os.getenv("SEARCH_LOG_BATCH", "500"))
+SEARCH_LOG_FLUSH_MS = int(os.getenv("SEARCH_LOG_FLUSH_MS", "500"))
+SEARCH_LOG_QUEUE_MAX = int(os.getenv("SEARCH_LOG_QUEUE_MAX", "10000"))
+SEARCH_LOG_PUT_TIMEOUT_MS = int(os.getenv("SEARCH_LOG_PUT_TIMEOUT_MS", "200"))
+SEARCH_LOG_FLUSH_RETRIES = 3
+
+_STOP = object()
+
+
+class SearchLogQueueFull(Exception):
+    pass
+
+
+class SearchLogWriter:
+    def __init__(
+        self,
+        batch_size: int = SEARCH_LOG_BATCH,
+        flush_ms: int = SEARCH_LOG_FLUSH_MS,
+        queue_max: int = SEARCH_LOG_QUEUE_MAX,
+        put_timeout_ms: int = SEARCH_LOG_PUT_TIMEOUT_MS,
+    ):
+        self.batch_size = batch_size
+        self.flush_s = flush_ms / 1000
+        self.queue_max = queue_max
+        self.put_timeout_s = put_timeout_ms / 1000
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        self._queue = asyncio.Queue(maxsize=self.queue_max)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Дописать всё, что в очереди, и остановиться (вызывается из lifespan)."""
+        if not self.running:
+            return
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+    async def submit(self, event: dict) -> None:
+        if not self.running:
+            # без lifespan (скрипты, тесты) — пишем сразу
+            await self._flush([event])
+            return
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            try:
+                await asyncio.wait_for(self._queue.put(event), self.put_timeout_s)
+            except asyncio.TimeoutError:
+                raise SearchLogQueueFull() from None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is _STOP:
+                break
+            batch = [first]
+            deadline = loop.time() + self.flush_s
+
+            while len(batch) < self.batch_size:
+                if self._queue.empty():
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    item = self._queue.get_nowait()
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._flush_with_retry(batch)
+
+    async def _flush_with_retry(self, batch: list[dict]) -> None:
+        for attempt in range(1, SEARCH_LOG_FLUSH_RETRIES + 1):
+            try:
+                await self._flush(batch)
+                return
+            except Exception:
+                if attempt == SEARCH_LOG_FLUSH_RETRIES:
+                    log.exception("search log flush failed, dropped %d events", len(batch))
+                    return
+                await asyncio.sleep(0.1 * 2 ** attempt)
+
+    async def _flush(self, batch: list[dict]) -> None:
+        stats = stats_counts(batch)
+        async with AsyncSessionLocal() as db:
+            await db.execute(insert(SearchEvent), batch)
+            await record_stats(db, stats)
+            await db.commit()
+
+        for (hour, lang, q, _route, _zero), n in stats.items():
+            trending.add(lang, q, hour, n)
+
+
+search_log_writer = SearchLogWriter()
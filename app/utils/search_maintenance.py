@@ -0,0 +1,198 @@
+"""
+Обслуживание search_events: сырые события старше SEARCH_EVENTS_RETENTION_DAYS
+сворачиваются в search_events_daily (day, lang, query_norm, chosen_route,
+chosen_item_id) -> cnt
+и удаляются. Каждая пачка (SEARCH_MAINTENANCE_CHUNK строк) — отдельная короткая
+транзакция: свёртка и удаление одних и тех же строк, поэтому повторный запуск
+после сбоя ничего не посчитает дважды, а write-lock держится миллисекунды.
+Почасовые агрегаты аналитики хранятся SEARCH_HOURLY_RETENTION_DAYS дней;
+более старые диапазоны аналитика читает из search_events_daily
+(app.utils.search_stats.stats_activity). Поэтому SEARCH_HOURLY_RETENTION_DAYS
+(если не 0) должен быть не меньше SEARCH_EVENTS_RETENTION_DAYS: иначе дни между
+двумя сроками уже вычищены из почасовых, но ещё не свёрнуты в дневные, и
+аналитика молча показывает за них ноль. Нарушение — ValueError при импорте.
+
+Запуск: в процессе (lifespan, каждые SEARCH_MAINTENANCE_INTERVAL_MIN минут) или
+    python -m app.utils.search_maintenance [--retention-days N] [--chunk N]
+"""
+from dotenv import load_dotenv
+load_dotenv()
+
+import argparse
+import asyncio
+import logging
+import os
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import delete, func, select, text, union_all
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.database import AsyncSessionLocal
+from app.models.models import SearchEvent, SearchEventDaily, SearchStatsHourly
+
+log = logging.getLogger(__name__)
+
+SEARCH_EVENTS_RETENTION_DAYS = int(os.getenv("SEARCH_EVENTS_RETENTION_DAYS", "30"))
+SEARCH_DAILY_RETENTION_DAYS = int(os.getenv("SEARCH_DAILY_RETENTION_DAYS", "730"))  # 0 — хранить всегда
+SEARCH_HOURLY_RETENTION_DAYS = int(os.getenv("SEARCH_HOURLY_RETENTION_DAYS", "400"))  # 0 — хранить всегда
+SEARCH_MAINTENANCE_CHUNK = int(os.getenv("SEARCH_MAINTENANCE_CHUNK", "2000"))
+SEARCH_MAINTENANCE_INTERVAL_MIN = int(os.getenv("SEARCH_MAINTENANCE_INTERVAL_MIN", "60"))  # 0 — только CLI
+SEARCH_MAINTENANCE_PAUSE_MS = 50
+
+
+def check_retention(events_days: int, hourly_days: int) -> None:
+    if hourly_days > 0 and hourly_days < events_days:
+        raise ValueError(
+            f"SEARCH_HOURLY_RETENTION_DAYS={hourly_days} < SEARCH_EVENTS_RETENTION_DAYS={events_days}: "
+            "days between them would be in neither search_stats_hourly nor search_events_daily"
+        )
+
+
+check_retention(SEARCH_EVENTS_RETENTION_DAYS, SEARCH_HOURLY_RETENTION_DAYS)
+
+
+def retention_cutoff(days: int) -> datetime:
+    """Полночь (UTC) days дней назад: всё раньше неё выходит за срок хранения."""
+    return datetime.combine(datetime.utcnow().date() - timedelta(days=days), time.min)
+
+
+async def compact_search_events(
+    retention_days: int = SEARCH_EVENTS_RETENTION_DAYS,
+    chunk: int = SEARCH_MAINTENANCE_CHUNK,
+) -> int:
+    """Свернуть и удалить сырые события старше retention_days. Возвращает число строк."""
+    cutoff = retention_cutoff(retention_days)
+    total = 0
+    while True:
+        async with AsyncSessionLocal() as db:
+            ids = select(SearchEvent.id).where(SearchEvent.created_at < cutoff).order_by(SearchEvent.id).limit(chunk)
+            last_id = await db.scalar(select(func.max(ids.subquery().c.id)))
+            if last_id is None:
+                break
+
+            in_chunk = (SearchEvent.id <= last_id, SearchEvent.created_at < cutoff)
+            day_col = func.date(SearchEvent.created_at)
+            route_col = func.coalesce(SearchEvent.chosen_route, "")
+            item_col = func.coalesce(SearchEvent.chosen_item_id, 0)
+            agg = (
+                select(
+                    day_col, SearchEvent.lang, SearchEvent.query_norm, route_col, item_col,
+                    func.count(SearchEvent.id),
+                )
+                .where(*in_chunk)
+                .group_by(day_col, SearchEvent.lang, SearchEvent.query_norm, route_col, item_col)
+            )
+            upsert = sqlite_insert(SearchEventDaily).from_select(
+                ["day", "lang", "query_norm", "chosen_route", "chosen_item_id", "cnt"], agg
+            )
+            upsert = upsert.on_conflict_do_update(
+                index_elements=["day", "lang", "query_norm", "chosen_route", "chosen_item_id"],
+                set_={"cnt": SearchEventDaily.cnt + upsert.excluded.cnt},
+            )
+            await db.execute(upsert)
+            res = await db.execute(delete(SearchEvent).where(*in_chunk))
+            await db.commit()
+
+        total += res.rowcount
+        await asyncio.sleep(SEARCH_MAINTENANCE_PAUSE_MS / 1000)
+    return total
+
+
+async def _purge_by_rowid(table: str, column: str, day_before: date, chunk: int) -> int:
+    total = 0
+    stmt = text(
+        f"DELETE FROM {table} WHERE rowid IN "
+        f"(SELECT rowid FROM {table} WHERE {column} < :d LIMIT :n)"
+    )
+    while True:
+        async with AsyncSessionLocal() as db:
+            res = await db.execute(stmt, {"d": day_before.isoformat(), "n": chunk})
+            await db.commit()
+        if not res.rowcount:
+            return total
+        total += res.rowcount
+        await asyncio.sleep(SEARCH_MAINTENANCE_PAUSE_MS / 1000)
+
+
+async def run_maintenance(
+    retention_days: int = SEARCH_EVENTS_RETENTION_DAYS,
+    daily_retention_days: int = SEARCH_DAILY_RETENTION_DAYS,
+    chunk: int = SEARCH_MAINTENANCE_CHUNK,
+    hourly_retention_days: int = SEARCH_HOURLY_RETENTION_DAYS,
+) -> dict:
+    check_retention(retention_days, hourly_retention_days)
+    result = {
+        "compacted_events": await compact_search_events(retention_days, chunk),
+        "purged_daily_rows": 0,
+        "purged_hourly_rows": 0,
+    }
+    if daily_retention_days > 0:
+        result["purged_daily_rows"] = await _purge_by_rowid(
+            SearchEventDaily.__tablename__, "day", retention_cutoff(daily_retention_days).date(), chunk
+        )
+    if hourly_retention_days > 0:
+        result["purged_hourly_rows"] = await _purge_by_rowid(
+            SearchStatsHourly.__tablename__, "hour", retention_cutoff(hourly_retention_days).date(), chunk
+        )
+    return result
+
+
+async def search_maintenance_loop() -> None:
+    while True:
+        try:
+            result = await run_maintenance()
+            log.info("search maintenance: %s", result)
+        except Exception:
+            log.exception("search maintenance failed")
+        await asyncio.sleep(SEARCH_MAINTENANCE_INTERVAL_MIN * 60)
+
+
+def search_activity(since: datetime | None = None):
+    """
+    Сырые события + дневные роллапы как один подзапрос
+    (day, lang, query_norm, chosen_route, chosen_item_id, cnt) — аналитике не важно,
+    где лежат данные. chosen_route = '' и chosen_item_id = 0 — выбора не было.
+    Границы не пересекаются: каждое событие либо в search_events, либо уже в search_events_daily.
+    since округляется вниз до полуночи на обеих сторонах: дневные строки не делятся,
+    поэтому и сырые события берутся целыми днями, начиная с since.date().
+    """
+    day_col = func.date(SearchEvent.created_at)
+    route_col = func.coalesce(SearchEvent.chosen_route, "")
+    item_col = func.coalesce(SearchEvent.chosen_item_id, 0)
+    raw = select(
+        day_col.label("day"),
+        SearchEvent.lang.label("lang"),
+        SearchEvent.query_norm.label("query_norm"),
+        route_col.label("chosen_route"),
+        item_col.label("chosen_item_id"),
+        func.count(SearchEvent.id).label("cnt"),
+    ).group_by(day_col, SearchEvent.lang, SearchEvent.query_norm, route_col, item_col)
+    daily = select(
+        func.date(SearchEventDaily.day).label("day"),
+        SearchEventDaily.lang,
+        SearchEventDaily.query_norm,
+        SearchEventDaily.chosen_route,
+        SearchEventDaily.chosen_item_id,
+        SearchEventDaily.cnt,
+    )
+    if since is not None:
+        start = datetime.combine(since.date(), time.min)
+        raw = raw.where(SearchEvent.created_at >= start)
+        daily = daily.where(SearchEventDaily.day >= start.date())
+    return union_all(raw, daily).subquery("search_activity")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compact and purge search_events")
+    parser.add_argument("--retention-days", type=int, default=SEARCH_EVENTS_RETENTION_DAYS)
+    parser.add_argument("--daily-retention-days", type=int, default=SEARCH_DAILY_RETENTION_DAYS)
+    parser.add_argument("--hourly-retention-days", type=int, default=SEARCH_HOURLY_RETENTION_DAYS)
+    parser.add_argument("--chunk", type=int, default=SEARCH_MAINTENANCE_CHUNK)
+    args = parser.parse_args()
+    print(asyncio.run(run_maintenance(
+        args.retention_days, args.daily_retention_days, args.chunk, args.hourly_retention_days
+    )))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Аналитика поиска поверх search_stats_hourly.
+
+Агрегаты (hour, lang, query_norm, chosen_route, zero_result) -> cnt пишутся
+той же транзакцией, что и пачка search_events (search_log_writer).
+Любой запрос аналитики — range scan по первичному ключу (hour, ...):
+стоимость зависит от числа часов и различных запросов в диапазоне,
+а не от объёма сырых событий.
+
+Почасовые агрегаты хранятся SEARCH_HOURLY_RETENTION_DAYS дней; более старая
+часть диапазона прозрачно читается из дневного роллапа search_events_daily
+(stats_activity). Там точность — сутки (volume с bucket=hour отдаёт полночь),
+а признака zero_result нет: zero-results считаются только по почасовым.
+"""
+from __future__ import annotations
+
+from collections import Counter
+from datetime import datetime
+
+from sqlalchemy import func, literal, select, union_all
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import AsyncSessionLocal
+from app.models.models import SearchEvent, SearchEventDaily, SearchStatsHourly
+from app.utils.search_index import suggest_index
+from app.utils.search_maintenance import SEARCH_HOURLY_RETENTION_DAYS, retention_cutoff
+
+StatsKey = tuple[datetime, str, str, str, bool]
+
+
+def hour_of(dt: datetime) -> datetime:
+    return dt.replace(minute=0, second=0, microsecond=0)
+
+
+def is_zero_result(q_norm: str) -> bool:
+    return bool(q_norm) and not suggest_index.index.search(q_norm, limit=1)
+
+
+def stats_counts(events: list[dict]) -> Counter:
+    zero: dict[str, bool] = {}
+    counts: Counter = Counter()
+    for e in events:
+        q = e["query_norm"]
+        if q not in zero:
+            zero[q] = is_zero_result(q)
+        counts[(hour_of(e["created_at"]), e["lang"], q, e["chosen_route"] or "", zero[q])] += 1
+    return counts
+
+
+async def record_stats(db: AsyncSession, counts: Counter) -> None:
+    """UPSERT агрегатов — в транзакции вызывающего, до commit()."""
+    if not counts:
+        return
+    stmt = sqlite_insert(SearchStatsHourly)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["hour", "lang", "query_norm", "chosen_route", "zero_result"],
+        set_={"cnt": SearchStatsHourly.cnt + stmt.excluded.cnt},
+    )
+    await db.execute(
+        stmt,
+        [
+            {"hour": h, "lang": lang, "query_norm": q, "chosen_route": route, "zero_result": zero, "cnt": n}
+            for (h, lang, q, route, zero), n in counts.items()
+        ],
+    )
+
+
+async def backfill_stats() -> None:
+    """Первый запуск: собрать агрегаты из того, что уже лежит в search_events."""
+    async with AsyncSessionLocal() as db:
+        if await db.scalar(select(SearchStatsHourly.hour).limit(1)) is not None:
+            return
+        hour_col = func.strftime("%Y-%m-%d %H:00:00", SearchEvent.created_at)
+        route_col = func.coalesce(SearchEvent.chosen_route, "")
+        rows = await db.execute(
+            select(hour_col, SearchEvent.lang, SearchEvent.query_norm, route_col, func.count(SearchEvent.id))
+            .group_by(hour_col, SearchEvent.lang, SearchEvent.query_norm, route_col)
+        )
+        counts: Counter = Counter()
+        for h, lang, q, route, n in rows.all():
+            counts[(datetime.fromisoformat(h), lang, q, route, is_zero_result(q))] += n
+        await record_stats(db, counts)
+        await db.commit()
+
+
+def stats_activity(since: datetime, until: datetime, lang: str | None):
+    """
+    search_stats_hourly + search_events_daily за [since, until) как один подзапрос
+    (hour, lang, query_norm, chosen_route, zero_result, cnt). Граница — срок хранения
+    почасовых: после неё только часы, до неё только дни, событие не считается дважды.
+    У дневных строк hour — полночь, zero_result — NULL.
+    """
+    start = hour_of(since)
+    hourly_from = start
+    if SEARCH_HOURLY_RETENTION_DAYS > 0:
+        hourly_from = max(start, retention_cutoff(SEARCH_HOURLY_RETENTION_DAYS))
+
+    h = SearchStatsHourly
+    hourly = select(
+        h.hour.label("hour"), h.lang.label("lang"), h.query_norm.label("query_norm"),
+        h.chosen_route.label("chosen_route"), h.zero_result.label("zero_result"), h.cnt.label("cnt"),
+    ).where(h.hour >= hourly_from, h.hour < until)
+    if lang:
+        hourly = hourly.where(h.lang == lang)
+    if start >= hourly_from:
+        return hourly.subquery("stats_activity")
+
+    d = SearchEventDaily
+    daily = select(
+        func.datetime(d.day), d.lang, d.query_norm, d.chosen_route, literal(None), d.cnt,
+    ).where(d.day >= start.date(), d.day < min(hourly_from, until).date())
+    if lang:
+        daily = daily.where(d.lang == lang)
+    return union_all(hourly, daily).subquery("stats_activity")
+
+
+async def top_queries(
+    db: AsyncSession, since: datetime, until: datetime, lang: str | None, limit: int,
+    zero_only: bool = False,
+) -> list[tuple[str, int]]:
+    a = stats_activity(since, until, lang)
+    cnt = func.sum(a.c.cnt).label("cnt")
+    q = (
+        select(a.c.query_norm, cnt)
+        .where(a.c.query_norm != "")
+        .group_by(a.c.query_norm)
+        .order_by(cnt.desc(), a.c.query_norm)
+        .limit(limit)
+    )
+    if zero_only:
+        q = q.where(a.c.zero_result == True)  # noqa: E712
+    return [(r[0], int(r[1])) for r in (await db.execute(q)).all()]
+
+
+async def route_clicks(
+    db: AsyncSession, since: datetime, until: datetime, lang: str | None
+) -> tuple[int, list[tuple[str, int]]]:
+    """(всего поисков, [(route, выборов)])."""
+    a = stats_activity(since, until, lang)
+    total = await db.scalar(select(func.coalesce(func.sum(a.c.cnt), 0)))
+    cnt = func.sum(a.c.cnt).label("cnt")
+    rows = await db.execute(
+        select(a.c.chosen_route, cnt)
+        .where(a.c.chosen_route != "")
+        .group_by(a.c.chosen_route)
+        .order_by(cnt.desc())
+    )
+    return int(total or 0), [(r[0], int(r[1])) for r in rows.all()]
+
+
+async def volume(
+    db: AsyncSession, since: datetime, until: datetime, lang: str | None, bucket: str
+) -> list[tuple[str, str, int]]:
+    """[(bucket, lang, cnt)], bucket = 'YYYY-MM-DD HH:00' (hour) или 'YYYY-MM-DD' (day)."""
+    fmt = "%Y-%m-%d %H:00" if bucket == "hour" else "%Y-%m-%d"
+    a = stats_activity(since, until, lang)
+    b = func.strftime(fmt, a.c.hour).label("bucket")
+    rows = await db.execute(
+        select(b, a.c.lang, func.sum(a.c.cnt))
+        .group_by(b, a.c.lang)
+        .order_by(b, a.c.lang)
+    )
+    return [(r[0], r[1], int(r[2])) for r in rows.all()]
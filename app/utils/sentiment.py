@@ -1,5 +1,153 @@
+"""
+Тональность отзыва: оценка (звёзды) + текст.
+
+Текст оценивается словарём основ ua/ru без внешних моделей: токены
+сворачиваются как в FTS (ё->е, й->и, ...), полярность токена — по самой
+длинной основе-префиксу (так "неприємно" попадает в негативную основу,
+а не в "приємн"). Основы, которые совпадают с началом посторонних слов
+("добр" — "добратися", "дорог" — "дорога", "класс" — учебный класс),
+заданы формами: запись с "$" на конце — только слово целиком.
+Учитываются отрицания ("не", "нет", "без" ... — на два следующих слова),
+усилители ("дуже", "очень" ...) и противопоставление ("але", "но" ...:
+сказанное после весит больше). Словарь компилируется
+один раз при импорте, полярность токенов кэшируется — пачка текстов
+оценивается без повторной работы над частыми словами.
+"""
 from __future__ import annotations
 
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable
+
+from app.utils.fts import fold
+
+POSITIVE = [
+    # ua
+    "добре$", "добра$", "добрі$", "добрий", "добрим", "чудов", "прекрасн", "відмінн",
+    "класн", "крут", "супер", "рекоменд",
+    "дякую", "дякуємо", "вдячн", "задоволен", "професійн", "професіонал", "приємн",
+    "комфорт", "затишн", "найкращ", "любл", "допомог", "полегш", "розслаб", "уважн",
+    "турбот", "ідеальн", "неймовірн", "гарн", "чудес", "подобає", "сподобал",
+    # ru
+    "хорош", "отличн", "замечательн", "великолеп", "спасибо", "благодар", "доволен",
+    "довольн", "профессионал", "уютн", "лучш", "помог", "облегч", "расслаб",
+    "внимательн", "заботл", "идеальн", "невероятн", "классн", "нравит", "понравил",
+    "добрый", "добрая", "доброе$", "добрые",
+]
+
+NEGATIVE = [
+    # ua
+    "поган", "жахлив", "жах", "розчаров", "незадоволен", "груб", "брудн",
+    "дорого$", "дорогі$", "дорогий", "дорогим", "дорожч", "дорогуват",
+    "запізн", "скарг", "неприємн", "гірш", "обман", "нахаб", "нудн", "проблем",
+    "відстій", "шкодую", "марно", "неуважн", "байдуж", "неякісн",
+    # ru
+    "плох", "ужасн", "кошмар", "разочаров", "недоволен", "недовольн", "грязн",
+    "опозд", "жалоб", "хуже", "худш", "хамств", "хамил", "отврат", "зря",
+    "сожалею", "невнимательн", "равнодуш", "некачествен", "дорогие", "дорогое$",
+    "дороже$", "дороговат", "задорого",
+]
+
+NEGATORS = {"не", "ні", "нет", "ни", "без", "ніколи", "никогда", "немає", "нема"}
+INTENSIFIERS = {"дуже", "очень", "надзвичайно", "чрезвычайно", "вельми", "максимально", "абсолютно", "настільки", "настолько"}
+CONTRAST = {"але", "проте", "однак", "зате", "но", "однако", "хотя", "хоча"}
+
+NEGATION_SCOPE = 2
+NEGATION_FACTOR = -0.8
+INTENSIFIER_FACTOR = 1.5
+AFTER_CONTRAST_FACTOR = 1.5
+
+# доля текста в итоге растёт с числом найденных слов, но не выше TEXT_WEIGHT_MAX
+TEXT_WEIGHT_PER_HIT = 0.25
+TEXT_WEIGHT_MAX = 0.6
+# текст с перевесом жалоб не ниже этого — negative при любой оценке (5★ с жалобами)
+TEXT_NEGATIVE_OVERRIDE = 0.4
+LABEL_THRESHOLD = 0.25
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class _Lexicon:
+    def __init__(self, positive: list[str], negative: list[str]):
+        self.stems: dict[str, float] = {}
+        self.words: dict[str, float] = {}
+        for entries, p in ((positive, 1.0), (negative, -1.0)):
+            for entry in entries:
+                if entry.endswith("$"):
+                    self.words[fold(entry[:-1])] = p
+                else:
+                    self.stems[fold(entry)] = p
+        self.min_len = min(map(len, self.stems))
+        self.max_len = max(map(len, self.stems))
+
+    def polarity(self, token: str) -> float:
+        p = self.words.get(token)
+        if p is not None:
+            return p
+        for k in range(min(len(token), self.max_len), self.min_len - 1, -1):
+            p = self.stems.get(token[:k])
+            if p is not None:
+                return p
+        return 0.0
+
+
+_LEXICON = _Lexicon(POSITIVE, NEGATIVE)
+_NEGATORS = {fold(w) for w in NEGATORS}
+_INTENSIFIERS = {fold(w) for w in INTENSIFIERS}
+_CONTRAST = {fold(w) for w in CONTRAST}
+
+
+@lru_cache(maxsize=65536)
+def _token_polarity(token: str) -> float:
+    return _LEXICON.polarity(token)
+
+
+@dataclass(frozen=True)
+class TextScore:
+    score: float  # -1..1
+    hits: int  # сколько оценочных слов нашлось
+
+
+def score_text(text: str) -> TextScore:
+    total = weight = 0.0
+    hits = 0
+    negate_left = 0
+    boost = 1.0
+    clause = 1.0
+    for tok in _TOKEN_RE.findall(fold((text or "").lower())):
+        if tok in _NEGATORS:
+            negate_left = NEGATION_SCOPE
+            continue
+        if tok in _INTENSIFIERS:
+            boost = INTENSIFIER_FACTOR
+            continue
+        if tok in _CONTRAST:
+            clause = AFTER_CONTRAST_FACTOR
+            negate_left = 0
+            continue
+
+        p = _token_polarity(tok)
+        if p:
+            w = boost * clause
+            if negate_left:
+                p *= NEGATION_FACTOR
+            total += p * w
+            weight += w
+            hits += 1
+        boost = 1.0
+        if negate_left:
+            negate_left -= 1
+
+    if not hits:
+        return TextScore(0.0, 0)
+    return TextScore(max(-1.0, min(1.0, total / weight)), hits)
+
+
+def score_texts(texts: Iterable[str]) -> list[TextScore]:
+    return [score_text(t) for t in texts]
+
+
 def sentiment_from_rating(rating: int) -> str:
     try:
         r = int(rating)
@@ -8,4 +156,36 @@ def sentiment_from_rating(rating: int) -> str:
 
     if r >= 4: return "positive"
     if r == 3: return "neutral"
-    return "negative"
\ No newline at end of file
+    return "negative"
+
+
+def combine(rating: int, ts: TextScore) -> str:
+    """
+    Оценка + текст -> positive | neutral | negative. Без оценочных слов — как по оценке.
+    Явно негативный текст (в т.ч. "не рекомендую") перекрывает оценку: звёзды часто
+    ставят по привычке, а жалоба в тексте — то, ради чего нужен sentiment.
+    """
+    if not ts.hits:
+        return sentiment_from_rating(rating)
+    if ts.score <= -TEXT_NEGATIVE_OVERRIDE:
+        return "negative"
+    try:
+        r = (int(rating) - 3) / 2
+    except Exception:
+        r = 0.0
+    w = min(TEXT_WEIGHT_MAX, ts.hits * TEXT_WEIGHT_PER_HIT)
+    s = (1 - w) * r + w * ts.score
+    if s >= LABEL_THRESHOLD:
+        return "positive"
+    if s <= -LABEL_THRESHOLD:
+        return "negative"
+    return "neutral"
+
+
+def sentiment_for(text: str, rating: int) -> str:
+    return combine(rating, score_text(text))
+
+
+def sentiment_batch(items: Iterable[tuple[str, int]]) -> list[str]:
+    """[(text, rating)] -> [sentiment]."""
+    return [combine(rating, score_text(text)) for text, rating in items]
@@ -0,0 +1,94 @@
+"""
+Пересчёт sentiment у существующих отзывов по тексту (app.utils.sentiment).
+
+Идём по reviews кусками по id (SENTIMENT_RESCORE_CHUNK строк): короткое
+чтение, оценка пачки в памяти, UPDATE только изменившихся строк по PK и
+commit — write-lock держится миллисекунды, между кусками пауза, так что
+запись отзывов с сайта не ждёт. review_stats догоняется триггерами.
+
+По умолчанию трогаем только строки, чей sentiment пустой или совпадает с
+выведенным из оценки (так его ставил старый код) — ручную разметку админа,
+отличную от оценки, не переписываем. --all пересчитывает всё.
+
+Запуск: python -m app.utils.sentiment_backfill [--all] [--chunk N]
+или в процессе при старте (SENTIMENT_RESCORE_ON_START=1).
+"""
+from dotenv import load_dotenv
+load_dotenv()
+
+import argparse
+import asyncio
+import logging
+import os
+from typing import Callable
+
+from sqlalchemy import select, update
+
+from app.database import AsyncSessionLocal
+from app.models import Review
+from app.utils.sentiment import sentiment_batch, sentiment_from_rating
+
+log = logging.getLogger(__name__)
+
+SENTIMENT_RESCORE_CHUNK = int(os.getenv("SENTIMENT_RESCORE_CHUNK", "500"))
+SENTIMENT_RESCORE_ON_START = os.getenv("SENTIMENT_RESCORE_ON_START", "0") == "1"
+SENTIMENT_RESCORE_PAUSE_MS = 50
+
+
+async def rescore_reviews(
+    chunk: int = SENTIMENT_RESCORE_CHUNK,
+    rescore_all: bool = False,
+    pause_ms: int = SENTIMENT_RESCORE_PAUSE_MS,
+) -> dict:
+    last_id = 0
+    scanned = changed = 0
+    while True:
+        async with AsyncSessionLocal() as db:
+            rows = (
+                await db.execute(
+                    select(Review.id, Review.text, Review.rating, Review.sentiment)
+                    .where(Review.id > last_id)
+                    .order_by(Review.id)
+                    .limit(chunk)
+                )
+            ).all()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            scanned += len(rows)
+
+            if not rescore_all:
+                rows = [r for r in rows if r[3] is None or r[3] == sentiment_from_rating(r[2])]
+            labels = sentiment_batch((r[1], r[2]) for r in rows)
+            updates = [{"id": r[0], "sentiment": s} for r, s in zip(rows, labels) if s != r[3]]
+            if updates:
+                await db.execute(update(Review), updates)
+                await db.commit()
+                changed += len(updates)
+
+        await asyncio.sleep(pause_ms / 1000)
+    return {"scanned": scanned, "changed": changed}
+
+
+async def rescore_on_start(on_change: Callable[[], None] | None = None) -> None:
+    """Фоновая задача lifespan: один проход; on_change — сбросить HTTP-валидаторы ленты."""
+    try:
+        result = await rescore_reviews()
+    except Exception:
+        log.exception("sentiment rescore failed")
+        return
+    log.info("sentiment rescore: %s", result)
+    if result["changed"] and on_change is not None:
+        on_change()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Re-score review sentiment from text")
+    parser.add_argument("--all", action="store_true", help="also overwrite labels that differ from the rating")
+    parser.add_argument("--chunk", type=int, default=SENTIMENT_RESCORE_CHUNK)
+    args = parser.parse_args()
+    print(asyncio.run(rescore_reviews(args.chunk, rescore_all=args.all)))
+
+
+if __name__ == "__main__":
+    main()
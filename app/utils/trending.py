@@ -0,0 +1,257 @@
+"""
+Trending-запросы без GROUP BY по search_events на каждый /suggest.
+
+Окно то же, что у прежнего запроса: created_at >= now - TRENDING_DAYS, скользящее.
+В памяти по языку — почасовые корзины (hour -> Counter query_norm) за окно и
+готовый top-K. Часы, целиком лежащие в окне, считаются корзинами; в крайнем
+часе, через который проходит граница окна, события выбывают по одному: его
+сырые события (created_at, lang, query_norm) заранее подгружаются из
+search_events, и каждое, ставшее старше границы, вычитается из корзины.
+Подгружается крайний час и следующий за ним — при старте и фоновой задачей
+раз в TRENDING_EDGE_REFRESH_SEC (0 — только при старте).
+
+Корзины при старте собираются из search_stats_hourly (пишется той же
+транзакцией, что и search_events), дальше растут из search_log_writer.
+Сырые события хранятся SEARCH_EVENTS_RETENTION_DAYS дней — это должно быть
+больше TRENDING_DAYS.
+"""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import logging
+import os
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Callable, Iterable
+
+from sqlalchemy import func, select
+
+from app.database import AsyncSessionLocal
+from app.models.models import SearchEvent, SearchStatsHourly
+from app.utils.search_stats import hour_of
+
+log = logging.getLogger(__name__)
+
+TRENDING_DAYS = int(os.getenv("TRENDING_DAYS", "7"))
+TRENDING_TOP = 8
+TRENDING_EDGE_REFRESH_SEC = int(os.getenv("TRENDING_EDGE_REFRESH_SEC", "60"))
+
+HOUR = timedelta(hours=1)
+
+EdgeEvent = tuple[datetime, str, str]  # (created_at, lang, query_norm)
+
+
+def _rank(q: str, cnt: int) -> tuple[int, str]:
+    return (-cnt, q)
+
+
+class _LangWindow:
+    def __init__(self, top_k: int):
+        self.top_k = top_k
+        self.buckets: dict[datetime, Counter] = {}
+        self.total: Counter = Counter()
+        self.top: list[tuple[str, int]] = []
+
+    def add(self, hour: datetime, q: str, n: int) -> bool:
+        self.buckets.setdefault(hour, Counter())[q] += n
+        self.total[q] += n
+        return self._bump(q, self.total[q])
+
+    def _bump(self, q: str, cnt: int) -> bool:
+        """True, если top изменился."""
+        # при добавлении счётчики только растут, поэтому хватает O(K)
+        top = self.top
+        for i, (tq, _) in enumerate(top):
+            if tq == q:
+                top[i] = (q, cnt)
+                top.sort(key=lambda x: _rank(*x))
+                return True
+        if len(top) < self.top_k:
+            top.append((q, cnt))
+        elif _rank(q, cnt) < _rank(*top[-1]):
+            top[-1] = (q, cnt)
+        else:
+            return False
+        top.sort(key=lambda x: _rank(*x))
+        return True
+
+    def rebuild(self) -> None:
+        self.top = heapq.nsmallest(self.top_k, self.total.items(), key=lambda x: _rank(*x))
+
+    def expire(self, first_hour: datetime) -> bool:
+        old = [h for h in self.buckets if h < first_hour]
+        if not old:
+            return False
+        for h in old:
+            self.total.subtract(self.buckets.pop(h))
+        self.total = Counter({q: c for q, c in self.total.items() if c > 0})
+        self.rebuild()
+        return True
+
+    def trim(self, hour: datetime, q: str) -> bool:
+        """Одно событие крайнего часа вышло из окна. True, если q был в top (нужен rebuild)."""
+        bucket = self.buckets.get(hour)
+        if not bucket or bucket[q] <= 0:
+            return False
+        bucket[q] -= 1
+        self.total[q] -= 1
+        if not bucket[q]:
+            del bucket[q]
+        if not self.total[q]:
+            del self.total[q]
+        return any(tq == q for tq, _ in self.top)
+
+
+class TrendingCounters:
+    def __init__(
+        self,
+        days: int = TRENDING_DAYS,
+        top_k: int = TRENDING_TOP,
+        clock: Callable[[], datetime] = datetime.utcnow,
+    ):
+        self.window = timedelta(days=days)
+        self.top_k = top_k
+        self.clock = clock
+        self._langs: dict[str, _LangWindow] = {}
+        self._first_hour: datetime | None = None
+        # сырые события крайних часов (по возрастанию created_at) и сколько из них уже вычтено
+        self._edge: dict[datetime, list[EdgeEvent]] = {}
+        self._edge_pos: dict[datetime, int] = {}
+        # растёт при любом изменении top (для ETag пустого /suggest)
+        self._version = 0
+
+    def since(self) -> datetime:
+        return self.clock() - self.window
+
+    def edge_hours(self) -> tuple[datetime, datetime]:
+        first = hour_of(self.since())
+        return first, first + HOUR
+
+    def langs(self) -> list[str]:
+        return list(self._langs)
+
+    def has_edge(self, hour: datetime) -> bool:
+        return hour in self._edge
+
+    def set_edge(self, hour: datetime, events: list[EdgeEvent]) -> None:
+        if hour not in self._edge:
+            self._edge[hour] = sorted(events)
+            self._edge_pos[hour] = 0
+
+    def _window(self, lang: str) -> _LangWindow:
+        w = self._langs.get(lang)
+        if w is None:
+            w = self._langs[lang] = _LangWindow(self.top_k)
+        return w
+
+    def _roll(self) -> datetime:
+        since = self.since()
+        first = hour_of(since)
+        if first != self._first_hour:
+            for w in self._langs.values():
+                if w.expire(first):
+                    self._version += 1
+            for h in [h for h in self._edge if h < first]:
+                del self._edge[h], self._edge_pos[h]
+            self._first_hour = first
+
+        events = self._edge.get(first)
+        if events:
+            i = self._edge_pos[first]
+            dirty: set[str] = set()
+            while i < len(events) and events[i][0] < since:
+                _, lang, q = events[i]
+                w = self._langs.get(lang)
+                if w is not None and w.trim(first, q):
+                    dirty.add(lang)
+                i += 1
+            self._edge_pos[first] = i
+            for lang in dirty:
+                self._langs[lang].rebuild()
+            if dirty:
+                self._version += 1
+        return first
+
+    def reset(self, rows: Iterable[tuple[datetime, str, str, int]]) -> None:
+        """Корзины заново: (hour, lang, query_norm, cnt). Подгруженные крайние часы сбрасываются."""
+        self._langs = {}
+        self._edge = {}
+        self._edge_pos = {}
+        self._first_hour = None
+        self._version += 1
+        first = self._roll()
+        for hour, lang, q, cnt in rows:
+            if q and hour >= first:
+                self._window(lang).add(hour, q, cnt)
+
+    def add(self, lang: str, q_norm: str, hour: datetime, n: int = 1) -> None:
+        if not q_norm or hour < self._roll():
+            return
+        if self._window(lang).add(hour, q_norm, n):
+            self._version += 1
+
+    @property
+    def version(self) -> int:
+        self._roll()
+        return self._version
+
+    def top(self, lang: str) -> list[tuple[str, int]]:
+        self._roll()
+        w = self._langs.get(lang)
+        return w.top if w else []
+
+
+trending = TrendingCounters()
+
+
+async def load_trending_edge() -> None:
+    """Подгрузить сырые события крайнего часа окна и следующего за ним (если ещё нет)."""
+    langs = trending.langs()
+    async with AsyncSessionLocal() as db:
+        for hour in trending.edge_hours():
+            if trending.has_edge(hour):
+                continue
+            events: list[EdgeEvent] = []
+            # по языку — range scan по ix_search_events_lang_created_query
+            for lang in langs:
+                rows = await db.execute(
+                    select(SearchEvent.created_at, SearchEvent.lang, SearchEvent.query_norm)
+                    .where(
+                        SearchEvent.lang == lang,
+                        SearchEvent.created_at >= hour,
+                        SearchEvent.created_at < hour + HOUR,
+                        SearchEvent.query_norm != "",
+                    )
+                    .order_by(SearchEvent.created_at)
+                )
+                events.extend(rows.all())
+            trending.set_edge(hour, events)
+
+
+async def load_trending() -> None:
+    """Старт: корзины окна из search_stats_hourly, затем крайние часы из search_events."""
+    first, _ = trending.edge_hours()
+    async with AsyncSessionLocal() as db:
+        rows = await db.execute(
+            select(
+                SearchStatsHourly.hour,
+                SearchStatsHourly.lang,
+                SearchStatsHourly.query_norm,
+                func.sum(SearchStatsHourly.cnt),
+            )
+            .where(SearchStatsHourly.hour >= first, SearchStatsHourly.query_norm != "")
+            .group_by(SearchStatsHourly.hour, SearchStatsHourly.lang, SearchStatsHourly.query_norm)
+        )
+        trending.reset(rows.all())
+    await load_trending_edge()
+
+
+async def trending_edge_refresher() -> None:
+    """Фоновая задача lifespan: крайний час подгружается до того, как граница окна в него войдёт."""
+    while True:
+        await asyncio.sleep(TRENDING_EDGE_REFRESH_SEC)
+        try:
+            await load_trending_edge()
+        except Exception:
+            log.exception("trending edge load failed")
@@ -0,0 +1,43 @@
+"""
+Запись одной строки одним оператором: INSERT/UPDATE ... RETURNING (SQLite >= 3.35).
+
+Вместо add + commit + refresh (второй SELECT после commit) и get + setattr +
+commit (SELECT перед UPDATE) — один оператор, который сразу возвращает строку
+со всеми значениями по умолчанию со стороны БД (id, created_at, ...). Пока
+держится write-lock, выполняется ровно один оператор (плюс триггеры).
+
+Обе функции работают в транзакции вызывающего, commit — на нём.
+"""
+from __future__ import annotations
+
+import re
+from typing import Any
+
+from sqlalchemy import insert, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# "UNIQUE constraint failed: users.email" (несколько колонок — через запятую)
+_UNIQUE_RE = re.compile(r"UNIQUE constraint failed: ([\w.]+)")
+
+_ORM_OPTS = {"synchronize_session": False, "populate_existing": True}
+
+
+async def insert_returning(db: AsyncSession, model: Any, values: dict[str, Any]) -> Any:
+    return await db.scalar(insert(model).values(**values).returning(model), execution_options=_ORM_OPTS)
+
+
+async def update_returning(db: AsyncSession, model: Any, row_id: int, values: dict[str, Any]) -> Any | None:
+    """Обновлённая строка или None, если такой нет. Пустой patch — просто чтение."""
+    if not values:
+        return await db.get(model, row_id)
+    return await db.scalar(
+        update(model).where(model.id == row_id).values(**values).returning(model),
+        execution_options=_ORM_OPTS,
+    )
+
+
+def unique_violation(e: IntegrityError) -> str | None:
+    """Имя колонки, на которой сработал UNIQUE ("email"), иначе None."""
+    m = _UNIQUE_RE.search(str(e.orig))
+    return m.group(1).rsplit(".", 1)[-1] if m else None
@@ -0,0 +1,31 @@
+"""
+Общая подготовка бенчмарков: временная SQLite-база и тихий SQLAlchemy.
+
+Конфигурация app.* читается из окружения при импорте, поэтому этот модуль
+импортируется первым: `import _setup` в начале скрипта из bench/.
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+TMP = tempfile.mkdtemp(prefix="lebedi-bench-")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{TMP}/bench.db")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "0")
+os.environ.setdefault("OUTBOX_WORKER", "0")
+os.environ.setdefault("GOOGLE_JWKS_URL", "http://127.0.0.1:9/certs")
+
+
+def quiet_engine():
+    from app.database import engine
+
+    engine.echo = False
+    return engine
+
+
+def percentile(samples: list[float], p: float) -> float:
+    s = sorted(samples)
+    return s[min(len(s) - 1, int(len(s) * p / 100))]
@@ -0,0 +1,82 @@
+"""
+Сериализация ответа (user-012): response_model FastAPI против json_response.
+
+old — как было: model_validate по строке, затем serialize_response по
+      response_model маршрута и JSONResponse (json.dumps);
+new — app.utils.fast_json.json_response: одна валидация TypeAdapter и
+      dump_json в байты в pydantic-core.
+Строки — ORM-объекты Review в памяти (БД не участвует), маршрут — GET /api/reviews/.
+
+    python bench/fast_json.py [--rows 100 1000] [--total 40000]
+"""
+import _setup  # noqa: F401
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute, serialize_response
+
+from app.main import app
+from app.models import Review
+from app.schemas.reviews import ReviewOut
+from app.utils.fast_json import json_response
+
+
+def rows(n: int) -> list[Review]:
+    return [
+        Review(
+            id=i, author_name=f"Автор {i}", text="Дуже гарний масаж, рекомендую всім друзям " * 3,
+            rating=5, sentiment="positive", status="published", is_featured=i % 7 == 0,
+            created_at=datetime(2026, 1, 1, 12, 0, i % 60),
+        )
+        for i in range(n)
+    ]
+
+
+def feed_route() -> APIRoute:
+    return next(
+        r for r in app.routes
+        if isinstance(r, APIRoute) and r.path == "/api/reviews/" and "GET" in r.methods
+    )
+
+
+async def old(route: APIRoute, rs: list[Review]) -> bytes:
+    content = [ReviewOut.model_validate(x) for x in rs]
+    data = await serialize_response(field=route.response_field, response_content=content)
+    return JSONResponse(data).body
+
+
+def new(rs: list[Review]) -> bytes:
+    return json_response(rs, list[ReviewOut]).body
+
+
+async def per_row_us(fn, rs: list[Review], reps: int) -> float:
+    t = time.perf_counter()
+    for _ in range(reps):
+        r = fn(rs)
+        if asyncio.iscoroutine(r):
+            await r
+    return (time.perf_counter() - t) / reps / len(rs) * 1e6
+
+
+async def main(sizes: list[int], total: int) -> None:
+    route = feed_route()
+    for n in sizes:
+        rs = rows(n)
+        assert json.loads(await old(route, rs)) == json.loads(new(rs)), "outputs differ"
+        reps = max(1, total // n)
+        t_old = await per_row_us(lambda x: old(route, x), rs, reps)
+        t_new = await per_row_us(new, rs, reps)
+        print(f"{n:5d} rows: old {t_old:6.2f} us/row  new {t_new:6.2f} us/row  x{t_old / t_new:.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--total", type=int, default=40000, help="rows serialized per size")
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.total))
@@ -0,0 +1,72 @@
+"""
+Опечатки в /suggest на большом словаре (user-005): задержка и доля найденных.
+
+Корпус — случайные кириллические слова (--terms, по умолчанию 20k), по два
+на название услуги; запросы — слова корпуса с одной заменой буквы.
+Меряется NGramIndex.lookup отдельно и весь SuggestIndex.search.
+
+    python bench/fuzzy.py [--terms 20000] [--queries 2000] [--seed 1]
+"""
+import _setup  # noqa: F401
+
+import argparse
+import random
+import time
+from types import SimpleNamespace
+
+from app.utils.search_index import SuggestIndex
+
+ALPHABET = "абвгдеєжзиіїйклмнопрстуфхцчшщьюя"
+
+
+def corpus(n: int, rnd: random.Random) -> list[str]:
+    words: set[str] = set()
+    while len(words) < n:
+        words.add("".join(rnd.choices(ALPHABET, k=rnd.randint(4, 11))))
+    return sorted(words)
+
+
+def services(words: list[str]) -> list[SimpleNamespace]:
+    return [
+        SimpleNamespace(id=i, type="massage", title=" ".join(words[i:i + 2]), description=None)
+        for i in range(0, len(words), 2)
+    ]
+
+
+def typo(word: str, rnd: random.Random) -> str:
+    i = rnd.randrange(len(word))
+    return word[:i] + rnd.choice(ALPHABET) + word[i + 1:]
+
+
+def timed(fn, queries: list[str]) -> tuple[float, float]:
+    lat = []
+    for q in queries:
+        t = time.perf_counter()
+        fn(q)
+        lat.append((time.perf_counter() - t) * 1000)
+    return _setup.percentile(lat, 50), _setup.percentile(lat, 99)
+
+
+def main(terms: int, queries: int, seed: int) -> None:
+    rnd = random.Random(seed)
+    words = corpus(terms, rnd)
+
+    t = time.perf_counter()
+    index = SuggestIndex.build([], services(words))
+    print(f"build: {(time.perf_counter() - t) * 1000:.0f} ms, {len(index._fuzzy)} fuzzy terms")
+
+    qs = [typo(rnd.choice(words), rnd) for _ in range(queries)]
+    for name, fn in [("ngram lookup", index._fuzzy.lookup), ("index.search", index.search)]:
+        p50, p99 = timed(fn, qs)
+        print(f"{name:13s} p50 {p50:.2f} ms  p99 {p99:.2f} ms")
+    found = sum(1 for q in qs if index._fuzzy.lookup(q))
+    print(f"typos resolved: {found / len(qs):.1%} of {len(qs)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--terms", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    main(args.terms, args.queries, args.seed)
@@ -0,0 +1,88 @@
+"""
+Задержка посторонних запросов во время шквала логинов (user-021).
+
+Зонд — GET /api/reviews/ каждые 5 мс; шквал — --storm потоков, которые
+в цикле шлют POST /api/auth/login (argon2 verify на каждый). Печатаются
+p50/p99 зонда в покое и во время шквала, а также коды ответов логина.
+
+--inline воспроизводит поведение до user-021: argon2 считается прямо в
+event loop (password_hasher подменяется синхронным вызовом).
+
+    python bench/login_storm.py [--storm 8] [--probes 200] [--inline]
+"""
+import _setup  # noqa: F401
+
+import argparse
+import threading
+import time
+from collections import Counter
+
+from fastapi.testclient import TestClient
+
+LOGIN = {"login": "storm@example.com", "password": "secret123"}
+
+
+def run_inline(hasher) -> None:
+    async def _run(fn, *args):
+        return fn(*args)
+
+    hasher._run = _run
+
+
+def probe(c: TestClient, n: int) -> list[float]:
+    lat = []
+    for _ in range(n):
+        t = time.perf_counter()
+        c.get("/api/reviews/")
+        lat.append((time.perf_counter() - t) * 1000)
+        time.sleep(0.005)
+    return lat
+
+
+def fmt(lat: list[float]) -> str:
+    return f"p50 {_setup.percentile(lat, 50):7.1f} ms  p99 {_setup.percentile(lat, 99):7.1f} ms"
+
+
+def main(storm: int, probes: int, inline: bool) -> None:
+    from app.auth.security import password_hasher
+    from app.main import app
+
+    _setup.quiet_engine()
+    if inline:
+        run_inline(password_hasher)
+
+    with TestClient(app) as c:
+        c.post("/api/auth/register", json={"email": LOGIN["login"], "password": LOGIN["password"]})
+        c.get("/api/reviews/")
+        idle = probe(c, probes)
+
+        stop = threading.Event()
+        codes: Counter = Counter()
+
+        def login_loop():
+            while not stop.is_set():
+                codes[c.post("/api/auth/login", json=LOGIN).status_code] += 1
+
+        threads = [threading.Thread(target=login_loop) for _ in range(storm)]
+        for t in threads:
+            t.start()
+        time.sleep(0.5)
+        busy = probe(c, probes)
+        stop.set()
+        for t in threads:
+            t.join()
+
+    mode = "inline argon2 (before)" if inline else "thread pool (after)"
+    print(f"{mode}, {storm} login threads")
+    print(f"  idle   GET /api/reviews/: {fmt(idle)}")
+    print(f"  storm  GET /api/reviews/: {fmt(busy)}")
+    print(f"  login responses: {dict(codes)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--storm", type=int, default=8)
+    parser.add_argument("--probes", type=int, default=200)
+    parser.add_argument("--inline", action="store_true", help="hash on the event loop, as before user-021")
+    args = parser.parse_args()
+    main(args.storm, args.probes, args.inline)
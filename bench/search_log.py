@@ -0,0 +1,65 @@
+"""
+POST /api/search/log: событий в секунду до и после буферизованной записи (user-003).
+
+before — как было: на каждое событие своя сессия, INSERT, commit и refresh;
+after  — SearchLogWriter: очередь и пачки executemany в одной транзакции
+         (вместе с апсертом stats и счётчиками trending, как в приложении).
+
+    python bench/search_log.py [--events 2000] [--batch 500]
+"""
+import _setup  # noqa: F401  (первым: окружение для app.*)
+
+import argparse
+import asyncio
+import time
+from datetime import datetime
+
+from app.database import AsyncSessionLocal, Base
+from app.models.models import SearchEvent
+from app.utils.search_log_writer import SearchLogWriter
+
+
+def event(i: int) -> dict:
+    q = f"масаж {i % 50}"
+    return {
+        "query": q, "query_norm": q, "lang": "ua", "session_id": None,
+        "chosen_route": None, "chosen_item_id": None, "created_at": datetime.utcnow(),
+    }
+
+
+async def per_request(n: int) -> float:
+    t = time.perf_counter()
+    for i in range(n):
+        async with AsyncSessionLocal() as db:
+            e = SearchEvent(**event(i))
+            db.add(e)
+            await db.commit()
+            await db.refresh(e)
+    return n / (time.perf_counter() - t)
+
+
+async def batched(n: int, batch: int) -> float:
+    w = SearchLogWriter(batch_size=batch)
+    w.start()
+    t = time.perf_counter()
+    for i in range(n):
+        await w.submit(event(i))
+    await w.stop()  # дожидается записи всего, что в очереди
+    return n / (time.perf_counter() - t)
+
+
+async def main(events: int, batch: int) -> None:
+    engine = _setup.quiet_engine()
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    print(f"before (commit+refresh per event): {await per_request(events):8.0f} events/s  ({events} events)")
+    print(f"after  (SearchLogWriter, batch {batch}): {await batched(events * 5, batch):8.0f} events/s  ({events * 5} events)")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--batch", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(args.events, args.batch))
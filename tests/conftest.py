@@ -0,0 +1,44 @@
+"""
+Общая обвязка тестов: своя SQLite-база во временной папке и приложение
+без фоновых задач. Конфигурация модулей app.* читается из окружения при
+импорте, поэтому переменные выставляются здесь, до первого импорта app.
+"""
+import os
+import tempfile
+
+_TMP = tempfile.mkdtemp(prefix="lebedi-tests-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_TMP}/app.db"
+os.environ.setdefault("ADMIN_TOKEN", "test-admin")
+os.environ.setdefault("ADMIN_BOOTSTRAP_SECRET", "test-secret")
+os.environ["RATE_LIMIT_ENABLED"] = "0"
+os.environ["OUTBOX_WORKER"] = "0"
+os.environ["REVOCATION_SYNC_SEC"] = "0"
+os.environ["SUGGEST_INDEX_REFRESH_SEC"] = "0"
+os.environ["CLICK_RANK_REFRESH_MIN"] = "0"
+os.environ["SEARCH_MAINTENANCE_INTERVAL_MIN"] = "0"
+os.environ["TRENDING_EDGE_REFRESH_SEC"] = "0"
+# до Google тесты не ходят: ключи — у заглушки из tests/stand_ins.py
+os.environ["GOOGLE_JWKS_URL"] = "http://127.0.0.1:9/certs"
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+def client():
+    from app.database import engine
+    from app.main import app
+
+    engine.echo = False
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture
+def admin():
+    return {"x-admin-token": os.environ["ADMIN_TOKEN"]}
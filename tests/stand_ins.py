@@ -0,0 +1,119 @@
+"""
+Локальные заглушки внешних HTTP-сервисов для тестов (поток с ThreadingHTTPServer на 127.0.0.1).
+
+WebhookStandIn — приёмник уведомлений outbox (webhook / Viber-подобный API);
+JwksStandIn    — JWKS Google: свой RSA-ключ, выпуск подписанных ID-токенов.
+"""
+from __future__ import annotations
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt
+
+
+class _StandIn:
+    def __init__(self):
+        self.requests: list[tuple[str, str, bytes]] = []
+        owner = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _reply(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                owner.requests.append((self.command, self.path, body))
+                status, headers, payload = owner.respond(self.command, self.path, body)
+                self.send_response(status)
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST = _reply
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def respond(self, method: str, path: str, body: bytes) -> tuple[int, dict, bytes]:
+        raise NotImplementedError
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class WebhookStandIn(_StandIn):
+    """Отвечает self.status (200 -> {"status": 0}, как Viber)."""
+
+    def __init__(self):
+        super().__init__()
+        self.status = 200
+
+    @property
+    def url(self) -> str:
+        return self.base_url + "/hook"
+
+    def respond(self, method, path, body):
+        return self.status, {}, b'{"status": 0}'
+
+
+def _rsa_pem() -> str:
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    return key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+
+
+class JwksStandIn(_StandIn):
+    """JWKS с одним ключом kid; token() выпускает ID-токен как у Google."""
+
+    ISSUER = "https://accounts.google.com"
+
+    def __init__(self, kid: str = "stand-in", max_age: int = 3600):
+        super().__init__()
+        self.kid = kid
+        self.max_age = max_age
+        self.pem = _rsa_pem()
+        public = jwk.construct(self.pem, "RS256").public_key().to_dict()
+        public.update(kid=kid, use="sig", alg="RS256")
+        self._body = json.dumps({"keys": [public]}).encode()
+
+    @property
+    def url(self) -> str:
+        return self.base_url + "/certs"
+
+    @property
+    def fetches(self) -> int:
+        return sum(1 for method, path, _ in self.requests if path == "/certs")
+
+    def respond(self, method, path, body):
+        return 200, {"Cache-Control": f"public, max-age={self.max_age}"}, self._body
+
+    def token(self, aud: str, email: str = "user@example.com", kid: str | None = None,
+              pem: str | None = None, **claims) -> str:
+        now = int(time.time())
+        payload = {"iss": self.ISSUER, "aud": aud, "sub": "g-" + email, "email": email,
+                   "email_verified": True, "iat": now, "exp": now + 3600, **claims}
+        return jwt.encode(payload, pem or self.pem, algorithm="RS256", headers={"kid": kid or self.kid})
+
+    @staticmethod
+    def other_key() -> str:
+        return _rsa_pem()
@@ -0,0 +1,85 @@
+import pytest
+
+MESSAGE = {"name": "Іван", "phone": "+380000000000", "message": "Хочу записатись", "preferred_contact": "phone"}
+REVIEW = {"author_name": "Олена", "text": "Дуже сподобалось, рекомендую", "rating": 5}
+
+
+def new_messages(client, n):
+    return [client.post("/api/contact/send", json=MESSAGE).json()["id"] for _ in range(n)]
+
+
+def test_ids_report_updated_unchanged_and_not_found(client, admin):
+    a, b = new_messages(client, 2)
+    client.patch(f"/api/contact/{b}", json={"status": "closed"})
+    missing = 999_999
+
+    r = client.post("/api/contact/bulk", json={"ids": [missing, b, a], "set": {"status": "closed"}}, headers=admin)
+    assert r.status_code == 200
+    assert r.json() == {
+        "updated": 1,
+        "results": [
+            {"id": a, "outcome": "updated"},
+            {"id": b, "outcome": "unchanged"},
+            {"id": missing, "outcome": "not_found"},
+        ],
+    }
+    assert client.get(f"/api/contact/{a}").json()["status"] == "closed"
+
+    # повтор — ничего не переписывается
+    r = client.post("/api/contact/bulk", json={"ids": [a, b], "set": {"status": "closed"}}, headers=admin)
+    assert r.json()["updated"] == 0
+    assert {x["outcome"] for x in r.json()["results"]} == {"unchanged"}
+
+
+def test_filter_updates_only_matching_rows(client, admin):
+    a, b, c = new_messages(client, 3)
+    client.post("/api/contact/bulk", json={"ids": [a, b], "set": {"status": "spam"}}, headers=admin)
+    client.patch(f"/api/contact/{b}", json={"is_read": True})
+
+    r = client.post(
+        "/api/contact/bulk",
+        json={"filter": {"status": "spam", "is_read": False}, "set": {"is_read": True}},
+        headers=admin,
+    )
+    assert r.status_code == 200
+    ids = {x["id"] for x in r.json()["results"]}
+    assert a in ids and b not in ids and c not in ids
+    assert {x["outcome"] for x in r.json()["results"]} == {"updated"}
+    assert r.json()["updated"] == len(ids)
+    assert client.get(f"/api/contact/{c}").json()["is_read"] is False
+
+
+def test_review_bulk_filter_and_ids(client, admin):
+    rid = client.post("/api/reviews/", json=REVIEW).json()["id"]
+    r = client.post("/api/reviews/bulk", json={"ids": [rid], "set": {"status": "hidden", "is_featured": True}}, headers=admin)
+    assert r.json() == {"updated": 1, "results": [{"id": rid, "outcome": "updated"}]}
+    r = client.post(
+        "/api/reviews/bulk", json={"filter": {"status": "hidden"}, "set": {"status": "pending"}}, headers=admin
+    )
+    assert rid in {x["id"] for x in r.json()["results"]}
+    assert client.get(f"/api/reviews/{rid}").json()["status"] == "pending"
+
+
+TARGETS = [("/api/contact/bulk", {"is_read": True}), ("/api/reviews/bulk", {"is_featured": True})]
+
+
+@pytest.mark.parametrize("path, changes", TARGETS)
+@pytest.mark.parametrize(
+    "make_body",
+    [
+        lambda ch: {"ids": [1], "filter": {"status": None, **{k: False for k in ch}}, "set": ch},  # ids и filter вместе
+        lambda ch: {"set": ch},  # ни того, ни другого
+        lambda ch: {"filter": {}, "set": ch},  # пустой filter — не «все строки»
+        lambda ch: {"ids": [1], "set": {}},
+        lambda ch: {"ids": [1], "set": {k: None for k in ch}},
+        lambda ch: {"ids": [], "set": ch},
+    ],
+    ids=["ids_and_filter", "neither", "empty_filter", "empty_set", "null_set", "empty_ids"],
+)
+def test_invalid_requests_are_422(client, admin, path, changes, make_body):
+    assert client.post(path, json=make_body(changes), headers=admin).status_code == 422
+
+
+@pytest.mark.parametrize("path, changes", TARGETS)
+def test_bulk_requires_admin(client, path, changes):
+    assert client.post(path, json={"ids": [1], "set": changes}).status_code == 401
@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import delete, func, insert, select
+
+from app.database import AsyncSessionLocal
+from app.models.models import SearchEvent, SearchEventDaily
+from app.utils.click_rank import click_rank, item_key, refresh_click_rank
+from app.utils.search_maintenance import (
+    SEARCH_EVENTS_RETENTION_DAYS, check_retention, compact_search_events, search_activity,
+)
+
+
+def test_item_choices_survive_compaction(client):
+    old = datetime.utcnow() - timedelta(days=SEARCH_EVENTS_RETENTION_DAYS + 10)
+    rows = [
+        {"query": "масаж", "query_norm": "масаж", "lang": "ua", "session_id": None,
+         "chosen_route": "/services/massage", "chosen_item_id": 42, "created_at": old}
+        for _ in range(3)
+    ]
+
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(SearchEvent))
+            await db.execute(delete(SearchEventDaily))
+            await db.execute(insert(SearchEvent), rows)
+            await db.commit()
+        compacted = await compact_search_events()
+        async with AsyncSessionLocal() as db:
+            left = await db.scalar(select(func.count(SearchEvent.id)))
+            await refresh_click_rank()
+            await db.execute(delete(SearchEventDaily))
+            await db.commit()
+        return compacted, left
+
+    compacted, left = client.portal.call(scenario)
+    assert (compacted, left) == (3, 0)
+
+    shares = click_rank.lookup("масаж")
+    assert shares[item_key(42)] == 1.0
+    assert shares["/services/massage"] == 1.0
+
+
+def test_search_activity_cuts_both_sides_at_midnight(client):
+    since = datetime.utcnow().replace(hour=15, minute=0, second=0, microsecond=0) - timedelta(days=3)
+    raw = [
+        {"query": "сауна", "query_norm": "сауна", "lang": "ua", "session_id": None, "created_at": at}
+        for at in (since.replace(hour=9), since.replace(hour=20), since - timedelta(days=1))
+    ]
+    daily = [
+        {"day": d, "lang": "ua", "query_norm": "сауна", "chosen_route": "", "chosen_item_id": 0, "cnt": 10}
+        for d in (since.date(), since.date() - timedelta(days=1))
+    ]
+
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(SearchEvent))
+            await db.execute(delete(SearchEventDaily))
+            await db.execute(insert(SearchEvent), raw)
+            await db.execute(insert(SearchEventDaily), daily)
+            await db.commit()
+            sa = search_activity(since)
+            total = await db.scalar(select(func.sum(sa.c.cnt)).where(sa.c.query_norm == "сауна"))
+            await db.execute(delete(SearchEvent))
+            await db.execute(delete(SearchEventDaily))
+            await db.commit()
+        return total
+
+    # день since целиком: оба сырых события (и 09:00 до since) + дневная строка; день раньше — нет
+    assert client.portal.call(scenario) == 12
+
+
+@pytest.mark.parametrize("events, hourly", [(30, 400), (30, 30), (30, 0)])
+def test_retention_check_accepts(events, hourly):
+    check_retention(events, hourly)
+
+
+def test_retention_check_rejects_gap():
+    with pytest.raises(ValueError, match="neither"):
+        check_retention(30, 7)
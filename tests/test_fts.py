@@ -0,0 +1,72 @@
+import pytest
+from sqlalchemy import text
+
+from app.database import engine
+
+
+def execute(client, sql, **params):
+    async def run():
+        async with engine.begin() as conn:
+            result = await conn.execute(text(sql), params)
+            return result.all() if result.returns_rows else None
+
+    return client.portal.call(run)
+
+
+def fts_rowids(client, fts, word):
+    return {r[0] for r in execute(client, f"SELECT rowid FROM {fts} WHERE {fts} MATCH :m", m=f'"{word}"*')}
+
+
+def hits(client, q, kind):
+    r = client.get("/api/search/query", params={"q": q})
+    assert r.status_code == 200
+    return {h["id"] for h in r.json()[kind]}
+
+
+def test_services_index_follows_insert_update_delete(client, admin):
+    sid = client.post(
+        "/api/services/", json={"type": "massage", "title": "Масаж зефірокіт", "description": "Глибокий"}, headers=admin
+    ).json()["id"]
+    assert sid in hits(client, "зефірокіт", "services")
+
+    client.patch(f"/api/services/{sid}", json={"title": "Масаж квазарник"}, headers=admin)
+    assert sid not in hits(client, "зефірокіт", "services")
+    assert sid in hits(client, "квазарник", "services")
+    assert fts_rowids(client, "service_items_fts", "зефірокіт") == set()
+
+    client.patch(f"/api/services/{sid}", json={"description": "Тепле каміння ґрафітнік"}, headers=admin)
+    assert sid in hits(client, "графітнік", "services")  # свёртка ґ->г и в запросе, и в индексе
+
+    execute(client, "DELETE FROM service_items WHERE id = :id", id=sid)
+    assert sid not in fts_rowids(client, "service_items_fts", "квазарник")
+    assert sid not in hits(client, "квазарник", "services")
+
+
+def test_reviews_index_follows_insert_update_delete(client, admin):
+    review = {"author_name": "Йосип", "text": "Після сеансу лесокрут зник", "rating": 5, "status": "published"}
+    rid = client.post("/api/reviews/full", json=review, headers=admin).json()["id"]
+    assert rid in hits(client, "лесокрут", "reviews")
+    assert rid in hits(client, "иосип", "reviews")  # й->и
+
+    execute(client, "UPDATE reviews SET text = 'Після сеансу морозяник зник' WHERE id = :id", id=rid)
+    assert rid not in hits(client, "лесокрут", "reviews")
+    assert rid in hits(client, "морозяник", "reviews")
+
+    # status вне FTS: индекс тот же, фильтр — в JOIN
+    client.patch(f"/api/reviews/{rid}", json={"status": "hidden"}, headers=admin)
+    assert rid not in hits(client, "морозяник", "reviews")
+    assert rid in fts_rowids(client, "reviews_fts", "морозяник")
+
+    assert client.delete(f"/api/reviews/{rid}", headers=admin).status_code == 200
+    assert fts_rowids(client, "reviews_fts", "морозяник") == set()
+
+
+@pytest.mark.parametrize(
+    "q",
+    ['"', '""', "'", "*", "масаж*", "^масаж", "масаж AND", "OR", "NOT масаж", "NEAR(масаж", "(((", ")",
+     "title:масаж", "масаж - спина", "a+b", "{масаж}", "масаж\"спина", ":", "…", "   "],
+)
+def test_fts_syntax_characters_do_not_raise(client, q):
+    r = client.get("/api/search/query", params={"q": q})
+    assert r.status_code == 200
+    assert set(r.json()) >= {"services", "reviews"}
@@ -0,0 +1,91 @@
+import time
+
+import pytest
+
+from app.auth import google_jwks as gj
+from app.auth.google_jwks import GoogleJwks, GoogleTokenError
+
+from tests.stand_ins import JwksStandIn
+
+AUD = "test-client.apps.googleusercontent.com"
+
+
+@pytest.fixture(scope="module")
+def stand_in():
+    with JwksStandIn() as s:
+        yield s
+
+
+@pytest.fixture
+def jwks(stand_in):
+    return GoogleJwks(stand_in.url)
+
+
+def tamper(token: str) -> str:
+    head, payload, sig = token.split(".")
+    return ".".join([head, payload, ("A" if sig[0] != "A" else "B") + sig[1:]])
+
+
+@pytest.mark.anyio
+async def test_valid_token_passes_with_one_fetch(jwks, stand_in):
+    for _ in range(20):
+        claims = await jwks.verify(stand_in.token(AUD, email="a@example.com"), AUD)
+    assert claims["email"] == "a@example.com"
+    assert claims["aud"] == AUD
+    assert jwks.fetches == 1
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("case", ["tampered", "wrong_aud", "wrong_iss", "expired", "foreign_key"])
+async def test_bad_token_is_rejected(jwks, stand_in, case):
+    token = {
+        "tampered": lambda: tamper(stand_in.token(AUD)),
+        "wrong_aud": lambda: stand_in.token("someone-else"),
+        "wrong_iss": lambda: stand_in.token(AUD, iss="https://evil.example.com"),
+        "expired": lambda: stand_in.token(AUD, exp=int(time.time()) - 60),
+        # правильный kid, но подпись чужим ключом
+        "foreign_key": lambda: stand_in.token(AUD, pem=stand_in.other_key()),
+    }[case]()
+    with pytest.raises(GoogleTokenError):
+        await jwks.verify(token, AUD)
+
+
+@pytest.mark.anyio
+async def test_unknown_kid_is_rejected_and_refresh_is_rate_limited(jwks, stand_in):
+    await jwks.verify(stand_in.token(AUD), AUD)
+    assert jwks.fetches == 1
+    unknown = stand_in.token(AUD, kid="rotated", pem=stand_in.other_key())
+
+    # ключи только что загружены — внеочередного запроса нет
+    for _ in range(5):
+        with pytest.raises(GoogleTokenError, match="unknown signing key"):
+            await jwks.verify(unknown, AUD)
+    assert jwks.fetches == 1
+
+    # прошло больше GOOGLE_JWKS_MIN_REFRESH_SEC — одно обновление на всю серию
+    jwks._fetched_at -= gj.GOOGLE_JWKS_MIN_REFRESH_SEC + 1
+    for _ in range(5):
+        with pytest.raises(GoogleTokenError, match="unknown signing key"):
+            await jwks.verify(unknown, AUD)
+    assert jwks.fetches == 2
+
+
+@pytest.mark.anyio
+async def test_keys_cached_for_max_age(jwks, stand_in):
+    await jwks.verify(stand_in.token(AUD), AUD)
+    assert jwks.expires_at - time.monotonic() == pytest.approx(stand_in.max_age, abs=5)
+
+
+def test_google_verify_endpoint(client, stand_in, monkeypatch):
+    from app.routers import auth
+
+    monkeypatch.setattr(auth, "google_jwks", GoogleJwks(stand_in.url))
+    monkeypatch.setattr(auth, "GOOGLE_CLIENT_ID", AUD)
+
+    r = client.post("/api/auth/google/verify", json={"credential": stand_in.token(AUD, email="g@example.com")})
+    assert r.status_code == 200
+    me = client.get("/api/auth/me", headers={"Authorization": f"Bearer {r.json()['access_token']}"})
+    assert me.json()["email"] == "g@example.com"
+
+    r = client.post("/api/auth/google/verify", json={"credential": tamper(stand_in.token(AUD))})
+    assert r.status_code == 401
@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import delete, select, update
+
+from app.database import AsyncSessionLocal
+from app.models import OutboxEvent
+from app.utils import outbox
+from app.utils.outbox import OutboxWorker
+
+from tests.stand_ins import WebhookStandIn
+
+MESSAGE = {"name": "Іван", "phone": "+380000000000", "message": "Передзвоніть", "preferred_contact": "phone"}
+
+
+@pytest.fixture
+def webhook(client, monkeypatch):
+    async def clear():
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(OutboxEvent))
+            await db.commit()
+
+    client.portal.call(clear)
+    with WebhookStandIn() as stand_in:
+        monkeypatch.setattr(outbox, "NOTIFY_WEBHOOK_URL", stand_in.url)
+        yield stand_in
+
+
+def rows(client) -> list[OutboxEvent]:
+    async def load():
+        async with AsyncSessionLocal() as db:
+            return (await db.scalars(select(OutboxEvent).order_by(OutboxEvent.id))).all()
+
+    return client.portal.call(load)
+
+
+def test_failed_delivery_is_retried_with_backoff(client, webhook):
+    worker = OutboxWorker()
+    client.post("/api/contact/send", json=MESSAGE).raise_for_status()
+
+    # строка триггера раскладывается на строку канала webhook
+    assert client.portal.call(worker.run_once) == 1
+    fanout, hook = rows(client)
+    assert (fanout.channel, fanout.status) == ("fanout", "sent")
+    assert (hook.channel, hook.status, hook.attempts) == ("webhook", "pending", 0)
+
+    webhook.status = 503
+    before = datetime.utcnow()
+    assert client.portal.call(worker.run_once) == 1
+    hook = rows(client)[1]
+    assert (hook.status, hook.attempts, hook.last_error) == ("pending", 1, "HTTP 503")
+    # первая пауза — OUTBOX_BACKOFF_BASE_SEC ±20% jitter
+    delay = (hook.next_attempt_at - before).total_seconds()
+    assert 0.8 * outbox.OUTBOX_BACKOFF_BASE_SEC - 1 <= delay <= 1.2 * outbox.OUTBOX_BACKOFF_BASE_SEC + 1
+    assert worker.stats()["retried"] == 1
+
+    # до срока повтора строка не забирается
+    assert client.portal.call(worker.run_once) == 0
+    assert len(webhook.requests) == 1
+
+    async def make_due():
+        async with AsyncSessionLocal() as db:
+            await db.execute(update(OutboxEvent).values(next_attempt_at=datetime.utcnow() - timedelta(seconds=1)))
+            await db.commit()
+
+    client.portal.call(make_due)
+    webhook.status = 200
+    assert client.portal.call(worker.run_once) == 1
+    hook = rows(client)[1]
+    assert (hook.status, hook.attempts, hook.last_error) == ("sent", 2, None)
+    assert hook.sent_at is not None
+    assert len(webhook.requests) == 2
+
+
+def test_client_error_fails_without_retry(client, webhook):
+    worker = OutboxWorker()
+    client.post("/api/contact/send", json=MESSAGE).raise_for_status()
+    client.portal.call(worker.run_once)
+
+    webhook.status = 400
+    client.portal.call(worker.run_once)
+    hook = rows(client)[1]
+    assert (hook.status, hook.attempts) == ("failed", 1)
+    assert hook.last_error.startswith("HTTP 400")
@@ -0,0 +1,84 @@
+import base64
+import json
+
+import pytest
+
+from app.utils.pagination import encode_cursor
+
+REVIEW = {"author_name": "Олена", "text": "Чудовий масаж", "rating": 5, "status": "hidden"}
+SAME_TS = "2100-01-01T10:00:00"
+
+
+def walk(client, url, limit, on_page=None):
+    ids, cursor = [], None
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        page = client.get(url, params=params).json()
+        ids += [x["id"] for x in page["items"]]
+        if on_page is not None:
+            on_page(len(ids))
+        if not page["has_more"]:
+            return ids
+        cursor = page["next_cursor"]
+
+
+def test_equal_created_at_pages_without_gaps_or_duplicates(client, admin):
+    ours = [
+        client.post("/api/reviews/full", json={**REVIEW, "created_at": SAME_TS}, headers=admin).json()["id"]
+        for _ in range(7)
+    ]
+    ids = walk(client, "/api/reviews/all", limit=3)
+    assert len(ids) == len(set(ids))
+    # одинаковый created_at — порядок по id, страницы режутся посреди группы
+    assert ids[:7] == sorted(ours, reverse=True)
+
+
+def test_inserts_between_pages_do_not_shift_the_walk(client, admin):
+    ours = [
+        client.post("/api/reviews/full", json={**REVIEW, "created_at": "2100-02-01T10:00:00"}, headers=admin).json()["id"]
+        for _ in range(4)
+    ]
+    inserted = []
+
+    def insert_after_first_page(seen):
+        if seen == 2:
+            inserted.append(client.post(
+                "/api/reviews/full", json={**REVIEW, "created_at": "2100-02-01T10:00:00"}, headers=admin
+            ).json()["id"])
+
+    ids = walk(client, "/api/reviews/all", limit=2, on_page=insert_after_first_page)
+    assert len(ids) == len(set(ids))
+    assert set(ours) <= set(ids)
+    assert inserted[0] not in ids  # новее курсора — в уже пройденной части
+
+
+def test_users_single_key_pages(client):
+    ids = walk(client, "/api/auth/users", limit=2)
+    assert ids == sorted(set(ids), reverse=True)
+
+
+def b64(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "!!!",
+        "a",
+        b64(b"not json"),
+        b64(b"\xff\xfe"),
+        b64(json.dumps({"created_at": 1}).encode()),
+        encode_cursor([1]),  # не то число ключей
+        encode_cursor(["2026-01-01", 5, 6]),
+        encode_cursor([True, 1]),
+        encode_cursor([1.5, 1]),
+        encode_cursor([[1], 1]),
+        encode_cursor([None, 1]),
+    ],
+)
+@pytest.mark.parametrize("url", ["/api/reviews/all", "/api/contact/all"])
+def test_malformed_cursor_is_400(client, url, cursor):
+    r = client.get(url, params={"cursor": cursor})
+    assert r.status_code == 400
+    assert r.json()["detail"] == "Invalid cursor"
@@ -0,0 +1,96 @@
+import asyncio
+import threading
+import uuid
+
+import pytest
+from passlib.context import CryptContext
+from sqlalchemy import select
+
+from app.auth.security import PasswordHasher, PasswordHasherBusy, password_hasher
+from app.database import AsyncSessionLocal
+from app.models.user import User
+from app.routers import auth as auth_router
+
+
+def argon2(rounds: int) -> CryptContext:
+    # дешёвые параметры: тестам важна только смена rounds
+    return CryptContext(
+        schemes=["argon2"], deprecated="auto",
+        argon2__rounds=rounds, argon2__memory_cost=1024, argon2__parallelism=1,
+    )
+
+
+class GatedContext:
+    """hash ждёт release — задачи висят в пуле, пока тест не отпустит."""
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def hash(self, p: str) -> str:
+        self.release.wait(5)
+        return f"h:{p}"
+
+
+@pytest.mark.anyio
+async def test_queue_limit_rejects_without_waiting():
+    ctx = GatedContext()
+    hasher = PasswordHasher(workers=1, queue_max=2, context=ctx)
+    # одна задача считается, вторая ждёт потока — очередь полна
+    running = [asyncio.create_task(hasher.hash(p)) for p in ("a", "b")]
+    await asyncio.sleep(0)
+    assert hasher.pending == 2
+
+    with pytest.raises(PasswordHasherBusy):
+        await hasher.hash("c")
+    assert hasher.rejected == 1
+
+    ctx.release.set()
+    assert await asyncio.gather(*running) == ["h:a", "h:b"]
+    assert hasher.pending == 0
+    assert await hasher.hash("d") == "h:d"
+
+
+@pytest.mark.anyio
+async def test_verify_and_update_rehashes_on_param_change():
+    old_hash = await PasswordHasher(context=argon2(1)).hash("secret1")
+    hasher = PasswordHasher(context=argon2(2))
+
+    ok, new_hash = await hasher.verify_and_update("secret1", old_hash)
+    assert ok and new_hash and "t=2" in new_hash
+    assert await hasher.verify_and_update("secret1", new_hash) == (True, None)
+    assert await hasher.verify_and_update("wrong", old_hash) == (False, None)
+
+
+def stored_hash(client, email: str) -> str:
+    async def get():
+        async with AsyncSessionLocal() as db:
+            return await db.scalar(select(User.password_hash).where(User.email == email))
+
+    return client.portal.call(get)
+
+
+def test_login_rehashes_with_new_params(client, monkeypatch):
+    email = f"{uuid.uuid4().hex[:10]}@example.com"
+    monkeypatch.setattr(password_hasher, "context", argon2(1))
+    assert client.post("/api/auth/register", json={"email": email, "password": "secret1"}).status_code == 200
+    assert "t=1" in stored_hash(client, email)
+
+    monkeypatch.setattr(password_hasher, "context", argon2(2))
+    assert client.post("/api/auth/login", json={"login": email, "password": "secret1"}).status_code == 200
+    rehashed = stored_hash(client, email)
+    assert "t=2" in rehashed
+
+    assert client.post("/api/auth/login", json={"login": email, "password": "secret1"}).status_code == 200
+    assert stored_hash(client, email) == rehashed
+
+
+def test_busy_hasher_is_503(client, monkeypatch):
+    class Busy:
+        async def hash(self, p):
+            raise PasswordHasherBusy()
+
+    monkeypatch.setattr(auth_router, "password_hasher", Busy())
+    body = {"email": f"{uuid.uuid4().hex[:10]}@example.com", "password": "secret1"}
+    r = client.post("/api/auth/register", json=body)
+    assert r.status_code == 503
+    assert r.headers["retry-after"] == "1"
@@ -0,0 +1,81 @@
+import dataclasses
+import uuid
+
+import pytest
+from sqlalchemy import update
+
+from app.auth import principal_cache as pc
+from app.auth.principal_cache import Principal, PrincipalCache, invalidate_user, principal_cache
+from app.database import AsyncSessionLocal
+from app.models.user import User
+
+
+def login(client) -> tuple[int, dict]:
+    body = {"email": f"{uuid.uuid4().hex[:10]}@example.com", "password": "secret1"}
+    tokens = client.post("/api/auth/register", json=body).json()
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    return client.get("/api/auth/me", headers=headers).json()["id"], headers
+
+
+def set_role(client, user_id: int, role: str) -> None:
+    async def run():
+        async with AsyncSessionLocal() as db:
+            await db.execute(update(User).where(User.id == user_id).values(role=role))
+            await db.commit()
+
+    client.portal.call(run)
+
+
+def test_second_request_is_served_from_cache(client):
+    _, headers = login(client)
+    hits = principal_cache.principals.hits
+    assert client.get("/api/auth/me", headers=headers).status_code == 200
+    assert principal_cache.principals.hits == hits + 1
+
+
+def test_role_change_is_visible_after_invalidate(client):
+    user_id, headers = login(client)
+    set_role(client, user_id, "admin")
+    # без инвалидации — снимок из кэша (до TTL)
+    assert client.get("/api/auth/me", headers=headers).json()["role"] == "user"
+    invalidate_user(user_id)
+    assert client.get("/api/auth/me", headers=headers).json()["role"] == "admin"
+
+
+@pytest.mark.parametrize("path", ["/api/admin/users/{id}", "/api/auth/users/{id}"])
+def test_deleted_user_is_rejected_on_next_request(client, admin, path):
+    user_id, headers = login(client)
+    assert client.delete(path.format(id=user_id), headers=admin).status_code == 200
+    r = client.get("/api/auth/me", headers=headers)
+    assert r.status_code == 401 and r.json()["detail"] == "User not found"
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(pc.time, "time", lambda: now[0])
+    cache = PrincipalCache(ttl_sec=60)
+    p = Principal(id=1, email="a@example.com", phone=None, role="user")
+
+    cache.put_principal(p, cache.principals.generation)
+    cache.put_token("tok", 1, "jti", exp=now[0] + 3600)
+    now[0] += 59
+    assert cache.principal(1) == p
+    now[0] += 2
+    assert cache.principal(1) is None
+    assert cache.token_claims("tok") == (1, "jti")  # claims живут до exp токена
+    now[0] += 3600
+    assert cache.token_claims("tok") is None
+
+
+def test_invalidation_during_db_read_is_not_overwritten():
+    cache = PrincipalCache(ttl_sec=60)
+    generation = cache.principals.generation  # get_current_user: до чтения из БД
+    cache.invalidate_user(1)  # роль поменяли, пока шло чтение
+    cache.put_principal(Principal(id=1, email=None, phone=None, role="user"), generation)
+    assert cache.principal(1) is None
+
+
+def test_principal_is_a_frozen_snapshot():
+    p = Principal(id=1, email=None, phone="+380", role="user")
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        p.role = "admin"
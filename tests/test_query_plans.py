@@ -0,0 +1,126 @@
+"""
+Планы горячих запросов (EXPLAIN QUERY PLAN) на свежей базе после alembic upgrade head.
+
+Каждая форма запроса строится теми же конструкциями, что и в роутерах;
+регрессией считается полный проход таблицы (SCAN <table> без индекса)
+и, для запросов с ORDER BY ... LIMIT, сортировка во временном B-дереве.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import Select, create_engine, func, select
+
+from app.models import ContactMessage, Review, SearchEvent, User
+from app.utils.pagination import PAGE_DEFAULT, keyset_select
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+@dataclass(frozen=True)
+class Shape:
+    name: str
+    stmt: Select
+    ordered: bool = True
+
+
+SINCE = datetime(2026, 1, 1)
+AFTER_DT = ["2026-01-01 00:00:00.000000", 100]
+
+HOT_SHAPES = [
+    Shape(
+        "reviews.list_published",
+        select(Review)
+        .where(Review.status == "published")
+        .order_by(Review.is_featured.desc(), Review.created_at.desc())
+        .limit(6),
+    ),
+    Shape(
+        "reviews.all_page",
+        keyset_select(select(Review), [Review.created_at, Review.id], AFTER_DT, PAGE_DEFAULT),
+    ),
+    Shape(
+        "contact.all_page_status_unread",
+        keyset_select(
+            select(ContactMessage).where(
+                ContactMessage.status == "new", ContactMessage.is_read == False  # noqa: E712
+            ),
+            [ContactMessage.created_at, ContactMessage.id], AFTER_DT, PAGE_DEFAULT,
+        ),
+    ),
+    Shape(
+        "contact.all_page",
+        keyset_select(select(ContactMessage), [ContactMessage.created_at, ContactMessage.id], None, PAGE_DEFAULT),
+    ),
+    Shape(
+        "users.page",
+        keyset_select(select(User), [User.id], [100], PAGE_DEFAULT),
+    ),
+    Shape(
+        "search_events.lang_window",
+        select(SearchEvent.query_norm, func.count())
+        .where(SearchEvent.lang == "ua", SearchEvent.created_at >= SINCE - timedelta(days=7))
+        .group_by(SearchEvent.query_norm),
+        ordered=False,
+    ),
+    Shape(
+        "search_events.trending_edge_hour",
+        select(SearchEvent.created_at, SearchEvent.lang, SearchEvent.query_norm)
+        .where(
+            SearchEvent.lang == "ua",
+            SearchEvent.created_at >= SINCE,
+            SearchEvent.created_at < SINCE + timedelta(hours=1),
+            SearchEvent.query_norm != "",
+        )
+        .order_by(SearchEvent.created_at),
+    ),
+    Shape(
+        "search_events.session_recent",
+        select(SearchEvent.query, SearchEvent.query_norm)
+        .where(SearchEvent.session_id == "s")
+        .order_by(SearchEvent.id.desc())
+        .limit(32),
+    ),
+]
+
+
+def plan_problems(details: list[str], ordered: bool) -> list[str]:
+    out = []
+    for d in details:
+        if d.startswith("SCAN ") and " USING " not in d:
+            out.append(f"full scan: {d}")
+        if ordered and "TEMP B-TREE FOR ORDER BY" in d:
+            out.append(f"sort: {d}")
+    return out
+
+
+@pytest.fixture(scope="module")
+def migrated(tmp_path_factory):
+    url = f"sqlite:///{tmp_path_factory.mktemp('plans') / 'migrated.db'}"
+    cfg = Config(str(ROOT / "alembic.ini"))
+    cfg.set_main_option("script_location", str(ROOT / "alembic"))
+    cfg.set_main_option("sqlalchemy.url", url)
+    command.upgrade(cfg, "head")
+
+    engine = create_engine(url)
+    with engine.connect() as conn:
+        yield conn
+    engine.dispose()
+
+
+@pytest.mark.parametrize("shape", HOT_SHAPES, ids=lambda s: s.name)
+def test_hot_query_uses_index(migrated, shape):
+    sql = str(shape.stmt.compile(dialect=migrated.dialect, compile_kwargs={"literal_binds": True}))
+    details = [r[3] for r in migrated.exec_driver_sql("EXPLAIN QUERY PLAN " + sql).all()]
+    assert plan_problems(details, shape.ordered) == [], "\n".join(details)
+
+
+def test_plan_checker_flags_scan_and_sort():
+    assert plan_problems(["SCAN reviews", "USE TEMP B-TREE FOR ORDER BY"], ordered=True) == [
+        "full scan: SCAN reviews",
+        "sort: USE TEMP B-TREE FOR ORDER BY",
+    ]
+    assert plan_problems(["SCAN reviews USING INDEX ix_reviews_created_at"], ordered=True) == []
@@ -0,0 +1,64 @@
+import asyncio
+import sqlite3
+import time
+
+import pytest
+
+from app.utils.rate_limit import Policy, RateLimiter, SqliteBackend
+
+POLICY = Policy.parse("t", "2/60")
+
+
+@pytest.fixture
+def backend(tmp_path):
+    return SqliteBackend(str(tmp_path / "rl.db"))
+
+
+@pytest.mark.anyio
+async def test_sqlite_backend_limits(backend):
+    limiter = RateLimiter(backend, {"t": POLICY})
+    assert [await limiter.check("t", "1.2.3.4") for _ in range(2)] == [0.0, 0.0]
+    assert await limiter.check("t", "1.2.3.4") > 0
+    assert await limiter.check("t", "5.6.7.8") == 0.0
+
+
+@pytest.mark.anyio
+async def test_locked_file_fails_open_quickly(backend):
+    limiter = RateLimiter(backend, {"t": POLICY})
+    await limiter.check("t", "1.2.3.4")  # файл и таблица созданы
+
+    other = sqlite3.connect(backend.path, isolation_level=None)
+    other.execute("BEGIN EXCLUSIVE")
+    try:
+        t0 = time.perf_counter()
+        assert await limiter.check("t", "1.2.3.4") == 0.0
+        assert time.perf_counter() - t0 < 0.5
+    finally:
+        other.execute("ROLLBACK")
+        other.close()
+
+
+@pytest.mark.anyio
+async def test_blocking_backend_does_not_stall_event_loop():
+    class SlowBackend:
+        blocking = True
+
+        def take(self, policy, ip):
+            time.sleep(0.3)
+            return 0.0
+
+    limiter = RateLimiter(SlowBackend(), {"t": POLICY})
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    try:
+        await limiter.check("t", "1.2.3.4")
+    finally:
+        task.cancel()
+    assert ticks >= 10
@@ -0,0 +1,66 @@
+import uuid
+
+from app.auth.security import create_refresh_token
+
+
+def register(client) -> dict:
+    body = {"email": f"{uuid.uuid4().hex[:10]}@example.com", "password": "secret1"}
+    r = client.post("/api/auth/register", json=body)
+    assert r.status_code == 200
+    return r.json()
+
+
+def refresh(client, token: str):
+    return client.post("/api/auth/refresh", json={"refresh_token": token})
+
+
+def bearer(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_rotation_issues_new_pair_and_old_token_is_single_use(client):
+    first = register(client)
+    r = refresh(client, first["refresh_token"])
+    assert r.status_code == 200
+    second = r.json()
+    assert second["refresh_token"] != first["refresh_token"]
+    assert client.get("/api/auth/me", headers=bearer(second["access_token"])).status_code == 200
+
+    r = refresh(client, first["refresh_token"])
+    assert r.status_code == 401
+    assert r.json()["detail"] == "Refresh token revoked"
+
+
+def test_reuse_revokes_whole_family(client):
+    first = register(client)
+    second = refresh(client, first["refresh_token"]).json()
+
+    # утёкший first предъявлен повторно — отзывается и second, выданный «настоящему» клиенту
+    assert refresh(client, first["refresh_token"]).status_code == 401
+    assert refresh(client, second["refresh_token"]).status_code == 401
+
+    # другие входы того же пользователя (другие семейства) не задеты
+    sub = client.get("/api/auth/me", headers=bearer(first["access_token"])).json()["id"]
+    other = create_refresh_token(str(sub))
+    assert refresh(client, other).status_code == 200
+
+
+def test_logout_revokes_access_token_and_family(client):
+    tokens = register(client)
+    headers = bearer(tokens["access_token"])
+    assert client.get("/api/auth/me", headers=headers).status_code == 200
+
+    r = client.post("/api/auth/logout", json={"refresh_token": tokens["refresh_token"]}, headers=headers)
+    assert r.status_code == 200
+    r = client.get("/api/auth/me", headers=headers)
+    assert r.status_code == 401 and r.json()["detail"] == "Token revoked"
+    assert refresh(client, tokens["refresh_token"]).status_code == 401
+
+
+def test_token_types_are_not_interchangeable(client):
+    tokens = register(client)
+    r = refresh(client, tokens["access_token"])
+    assert r.status_code == 401 and r.json()["detail"] == "Invalid refresh token"
+    assert client.get("/api/auth/me", headers=bearer(tokens["refresh_token"])).status_code == 401
+    # access-токен, отвергнутый /refresh, ничего не отозвал
+    assert client.get("/api/auth/me", headers=bearer(tokens["access_token"])).status_code == 200
@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.utils import response_cache
+from app.utils.response_cache import ResponseCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Управляемое время для Last-Modified (с точностью до секунды оно иначе совпадает)."""
+    now = [datetime(2026, 1, 1, tzinfo=timezone.utc)]
+    monkeypatch.setattr(response_cache, "_now", lambda: now[0])
+
+    def tick():
+        now[0] += timedelta(seconds=10)
+        return now[0]
+
+    return tick
+
+
+@pytest.mark.anyio
+async def test_stale_entry_keeps_its_own_validators(clock):
+    cache = ResponseCache("test-stale", serve_stale=True)
+    bodies = iter([b"old", b"new"])
+
+    async def build():
+        return next(bodies)
+
+    old = await cache.get_or_build(build)
+    clock()
+    cache.invalidate()
+
+    stale = await cache.get_or_build(build)
+    assert stale.body == b"old"
+    assert (stale.etag, stale.last_modified) == (old.etag, old.last_modified)
+    assert stale.last_modified < cache.last_modified
+
+    for t in list(cache._tasks):
+        await t
+    fresh = await cache.get_or_build(build)
+    assert fresh.body == b"new"
+    assert fresh.last_modified == cache.last_modified
+
+
+def test_feed_stale_body_is_not_revalidated_by_if_modified_since(client, admin, clock, monkeypatch):
+    from app.routers.reviews import reviews_feed
+
+    monkeypatch.setattr(reviews_feed, "serve_stale", True)
+    review = {"author_name": "Олена", "text": "Чудовий відпочинок", "rating": 5, "status": "published"}
+
+    client.post("/api/reviews/full", json=review, headers=admin)
+    first = client.get("/api/reviews/?limit=7")
+    clock()
+    client.post("/api/reviews/full", json=review, headers=admin)  # invalidate: ленту отдаём устаревшей
+
+    stale = client.get("/api/reviews/?limit=7")
+    assert stale.content == first.content
+    assert stale.headers["last-modified"] == first.headers["last-modified"]
+    assert stale.headers["etag"] == first.headers["etag"]
+
+    # клиент со старой копией не должен получить 304 — лента с тех пор поменялась
+    r = client.get("/api/reviews/?limit=7", headers={"If-Modified-Since": stale.headers["last-modified"]})
+    assert r.status_code == 200
+
+    async def rebuilt():
+        for t in list(reviews_feed._tasks):
+            await t
+
+    client.portal.call(rebuilt)
+    fresh = client.get("/api/reviews/?limit=7")
+    assert len(fresh.json()) == len(first.json()) + 1
+    assert fresh.headers["last-modified"] != first.headers["last-modified"]
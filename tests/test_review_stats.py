@@ -0,0 +1,78 @@
+from sqlalchemy import text
+
+from app.database import engine
+
+REVIEW = {"author_name": "Олена", "text": "Чудовий масаж, рекомендую", "rating": 5}
+
+GROUP_BY = (
+    "SELECT status, coalesce(sentiment, ''), count(*), sum(rating) FROM reviews "
+    "GROUP BY status, coalesce(sentiment, '')"
+)
+
+
+def tables(client):
+    async def run():
+        async with engine.connect() as conn:
+            stats = (await conn.execute(
+                text("SELECT status, sentiment, cnt, rating_sum FROM review_stats WHERE cnt != 0")
+            )).all()
+            fresh = (await conn.execute(text(GROUP_BY))).all()
+        return {tuple(r[:2]): tuple(r[2:]) for r in stats}, {tuple(r[:2]): tuple(r[2:]) for r in fresh}
+
+    return client.portal.call(run)
+
+
+def execute(client, sql, **params):
+    async def run():
+        async with engine.begin() as conn:
+            await conn.execute(text(sql), params)
+
+    client.portal.call(run)
+
+
+def assert_in_sync(client):
+    stats, fresh = tables(client)
+    assert stats == fresh
+
+
+def test_triggers_follow_every_write(client, admin):
+    a = client.post("/api/reviews/", json=REVIEW).json()["id"]
+    b = client.post("/api/reviews/full", json={**REVIEW, "rating": 2, "sentiment": "negative"}, headers=admin).json()["id"]
+    assert_in_sync(client)
+
+    for patch in ({"status": "published"}, {"sentiment": "neutral"}, {"rating": 3}, {"status": "hidden", "rating": 1}):
+        assert client.patch(f"/api/reviews/{a}", json=patch, headers=admin).status_code == 200
+        assert_in_sync(client)
+
+    r = client.post("/api/reviews/bulk", json={"ids": [a, b], "set": {"status": "published"}}, headers=admin)
+    assert r.status_code == 200
+    assert_in_sync(client)
+
+    # мимо роутера — триггеры всё равно ведут сводку
+    execute(client, "UPDATE reviews SET rating = 4, sentiment = NULL WHERE id = :id", id=b)
+    assert_in_sync(client)
+
+    assert client.delete(f"/api/reviews/{b}", headers=admin).status_code == 200
+    assert_in_sync(client)
+
+
+def test_recompute_dry_run_reports_drift_without_fixing(client, admin):
+    client.post("/api/reviews/full", json=REVIEW, headers=admin)
+    assert_in_sync(client)
+    execute(client, "UPDATE review_stats SET cnt = cnt + 3 WHERE status = 'published'")
+    drifted, fresh = tables(client)
+    assert drifted != fresh
+
+    r = client.post("/api/reviews/stats/recompute?dry_run=1", headers=admin).json()
+    assert r["fixed"] is False
+    assert any(k.startswith("published/") for k in r["drift"])
+    assert tables(client)[0] == drifted
+
+    r = client.post("/api/reviews/stats/recompute", headers=admin).json()
+    assert r["fixed"] is True and r["drift"]
+    assert_in_sync(client)
+    assert client.post("/api/reviews/stats/recompute?dry_run=1", headers=admin).json() == {"drift": {}, "fixed": False}
+
+
+def test_recompute_requires_admin(client):
+    assert client.post("/api/reviews/stats/recompute").status_code in (401, 403)
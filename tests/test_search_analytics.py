@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, insert
+
+from app.database import AsyncSessionLocal
+from app.models.models import SearchEventDaily, SearchStatsHourly
+from app.utils.search_maintenance import SEARCH_HOURLY_RETENTION_DAYS, retention_cutoff
+
+
+def seed(client, hourly, daily):
+    async def run():
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(SearchStatsHourly))
+            await db.execute(delete(SearchEventDaily))
+            if hourly:
+                await db.execute(insert(SearchStatsHourly), hourly)
+            if daily:
+                await db.execute(insert(SearchEventDaily), daily)
+            await db.commit()
+
+    client.portal.call(run)
+
+
+def test_old_ranges_read_daily_rollup_without_double_counting(client, admin):
+    cutoff = retention_cutoff(SEARCH_HOURLY_RETENTION_DAYS)
+    recent = cutoff + timedelta(days=3, hours=5)
+    old_day = (cutoff - timedelta(days=10)).date()
+    row = {"lang": "ua", "query_norm": "масаж", "chosen_route": "/massage"}
+    seed(
+        client,
+        hourly=[
+            {**row, "hour": recent, "zero_result": False, "cnt": 4},
+            # день уже есть и в дневном роллапе: ещё не вычищенный почасовой хвост не считается
+            {**row, "hour": datetime.combine(old_day, datetime.min.time()), "zero_result": False, "cnt": 100},
+        ],
+        daily=[
+            {**row, "day": old_day, "chosen_item_id": 0, "cnt": 5},
+            {**row, "day": old_day, "chosen_item_id": 7, "cnt": 1},
+            {**row, "day": recent.date(), "chosen_item_id": 0, "cnt": 100},
+        ],
+    )
+    rng = {"since": (cutoff - timedelta(days=30)).isoformat(), "until": datetime.utcnow().isoformat()}
+
+    top = client.get("/api/admin/search/top", params=rng, headers=admin).json()
+    assert top["items"] == [{"query_norm": "масаж", "cnt": 10}]
+
+    ctr = client.get("/api/admin/search/ctr", params=rng, headers=admin).json()
+    assert ctr["searches"] == 10 and ctr["routes"][0]["clicks"] == 10
+
+    vol = client.get("/api/admin/search/volume", params={**rng, "bucket": "day"}, headers=admin).json()
+    assert [(p["bucket"], p["cnt"]) for p in vol["points"]] == [
+        (old_day.isoformat(), 6), (recent.date().isoformat(), 4),
+    ]
+
+    # только почасовой диапазон — дневной роллап не читается
+    recent_only = {"since": cutoff.isoformat(), "until": rng["until"]}
+    top = client.get("/api/admin/search/top", params=recent_only, headers=admin).json()
+    assert top["items"] == [{"query_norm": "масаж", "cnt": 4}]
+
+    seed(client, [], [])
@@ -0,0 +1,45 @@
+import asyncio
+
+from sqlalchemy import delete
+
+from app.database import AsyncSessionLocal
+from app.models.models import SearchEvent
+from app.routers import search as search_router
+from app.utils.recent_cache import recent_queries
+from app.utils.search_log_writer import SearchLogWriter
+
+
+def test_log_response_has_no_id(client):
+    r = client.post("/api/search/log", json={"query": "кедрова бочка", "session_id": "log-ok"})
+    assert r.status_code == 200
+    assert set(r.json()) == {"ok", "created_at"}
+    assert r.json()["ok"] is True
+
+    async def cleanup():
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(SearchEvent).where(SearchEvent.session_id == "log-ok"))
+            await db.commit()
+
+    client.portal.call(cleanup)
+
+
+def test_full_queue_is_503(client, monkeypatch):
+    # фоновая задача «зависла»: очередь на одно место уже занята, put ждёт 10 мс
+    async def stuck_writer():
+        w = SearchLogWriter(queue_max=1, put_timeout_ms=10)
+        w._queue = asyncio.Queue(maxsize=1)
+        w._queue.put_nowait({})
+        w._task = asyncio.get_running_loop().create_future()
+        return w
+
+    writer = client.portal.call(stuck_writer)
+    monkeypatch.setattr(search_router, "search_log_writer", writer)
+
+    r = client.post("/api/search/log", json={"query": "гірська сауна", "session_id": "log-busy"})
+    assert r.status_code == 503
+    assert r.headers["retry-after"] == "1"
+    # отказ — событие никуда не попало, и в недавние сессии тоже
+    assert writer._queue.qsize() == 1
+    assert recent_queries.get("log-busy") is None
+
+    client.portal.call(writer._task.cancel)
@@ -0,0 +1,60 @@
+import pytest
+
+from app.utils.sentiment import score_text, sentiment_for
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "Дорога до салону зайняла годину",
+        "По дороге заехала в аптеку",
+        "Легко добратися від метро",
+        "Добрались быстро",
+        "Записала дочку после уроков, она в пятом классе",
+    ],
+)
+def test_unrelated_words_are_neutral(text):
+    assert score_text(text).hits == 0
+
+
+@pytest.mark.parametrize(
+    "text, sign",
+    [
+        ("Дуже добра майстриня", 1),
+        ("Добрий і уважний персонал", 1),
+        ("Все классно", 1),
+        ("Занадто дорого", -1),
+        ("Цены дороговаты", -1),
+        ("Стало дорожче, ніж було", -1),
+        ("Не дорого", 1),
+    ],
+)
+def test_full_forms_keep_polarity(text, sign):
+    ts = score_text(text)
+    assert ts.hits and ts.score * sign > 0
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "ужасно",
+        "Не рекомендую",
+        "Жахливо, більше не прийду",
+        "Масаж хороший, но мастер опоздал и был груб",
+    ],
+)
+def test_five_star_complaint_is_negative(text):
+    assert sentiment_for(text, 5) == "negative"
+
+
+@pytest.mark.parametrize(
+    "text, rating, sentiment",
+    [
+        ("Все супер, рекомендую", 5, "positive"),
+        ("Трохи дорого, але майстер чудовий", 5, "positive"),
+        ("Записалась на вівторок", 5, "positive"),
+        ("Записалась на вівторок", 1, "negative"),
+    ],
+)
+def test_rating_still_decides_without_clear_complaint(text, rating, sentiment):
+    assert sentiment_for(text, rating) == sentiment
@@ -0,0 +1,23 @@
+import pytest
+
+
+@pytest.fixture
+def service(client, admin):
+    r = client.post("/api/services/", json={"type": "massage", "title": "Класичний масаж"}, headers=admin)
+    assert r.status_code == 200
+    return r.json()
+
+
+@pytest.mark.parametrize("field", ["type", "title", "is_active", "sort_order"])
+def test_patch_null_for_not_null_column_is_422(client, admin, service, field):
+    r = client.patch(f"/api/services/{service['id']}", json={field: None}, headers=admin)
+    assert r.status_code == 422
+    assert client.patch(f"/api/services/{service['id']}", json={}, headers=admin).json() == service
+
+
+def test_patch_null_for_nullable_column_clears_it(client, admin, service):
+    r = client.patch(f"/api/services/{service['id']}", json={"price_uah": 900}, headers=admin)
+    assert r.json()["price_uah"] == 900
+    r = client.patch(f"/api/services/{service['id']}", json={"price_uah": None}, headers=admin)
+    assert r.status_code == 200
+    assert r.json()["price_uah"] is None
@@ -0,0 +1,118 @@
+"""
+Trending совпадает с прежним запросом created_at >= now - TRENDING_DAYS
+в любой момент, а не только на границе часа или дня.
+"""
+import random
+from collections import Counter
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import delete, desc, func, insert, select
+
+from app.database import AsyncSessionLocal
+from app.models.models import SearchEvent, SearchStatsHourly
+from app.utils import trending as trending_mod
+from app.utils.search_stats import hour_of, record_stats, stats_counts
+from app.utils.trending import TrendingCounters
+
+QUERIES = [f"q{i}" for i in range(12)]
+
+
+def brute_top(events, since, lang, k=8):
+    """Прежний запрос: WHERE created_at >= since GROUP BY query_norm ORDER BY cnt DESC LIMIT k."""
+    cnt = Counter(q for ts, lg, q in events if lg == lang and ts >= since)
+    return sorted(cnt.items(), key=lambda x: (-x[1], x[0]))[:k]
+
+
+def make_events(now, n=3000, seed=7):
+    rnd = random.Random(seed)
+    events = []
+    for _ in range(n):
+        ts = now - timedelta(seconds=rnd.randrange(8 * 86400))
+        # частоты неравные, чтобы top зависел от выбывающих событий
+        q = QUERIES[min(int(rnd.expovariate(0.4)), len(QUERIES) - 1)]
+        events.append((ts, rnd.choice(["ua", "ru"]), q))
+    return sorted(events)
+
+
+def test_sliding_window_matches_old_query():
+    clock = [datetime(2026, 10, 18, 12, 30, 17)]
+    c = TrendingCounters(days=7, clock=lambda: clock[0])
+    events = make_events(clock[0])
+
+    hourly = Counter((hour_of(ts), lg, q) for ts, lg, q in events)
+    c.reset([(h, lg, q, n) for (h, lg, q), n in hourly.items()])
+
+    def load_edge():
+        for h in c.edge_hours():
+            c.set_edge(h, [e for e in events if h <= e[0] < h + timedelta(hours=1)])
+
+    # двигаем часы через две границы часа, подгружая крайние часы, как фоновая задача
+    for step in range(0, 150 * 60, 97):
+        clock[0] = datetime(2026, 10, 18, 12, 30, 17) + timedelta(seconds=step)
+        if step % (20 * 60) < 97:
+            load_edge()
+        since = clock[0] - timedelta(days=7)
+        for lang in ("ua", "ru"):
+            assert c.top(lang) == brute_top(events, since, lang), (step, lang)
+
+
+def test_edge_event_expires_and_bumps_version():
+    now = datetime(2026, 10, 18, 12, 30)
+    clock = [now]
+    c = TrendingCounters(days=7, top_k=2, clock=lambda: clock[0])
+    edge = now.replace(minute=0) - timedelta(days=7)
+    c.reset([(edge, "ua", "old", 2), (edge + timedelta(hours=1), "ua", "new", 1)])
+    c.set_edge(edge, [(edge + timedelta(minutes=10), "ua", "old"), (edge + timedelta(minutes=40), "ua", "old")])
+
+    assert c.top("ua") == [("new", 1), ("old", 1)]
+    v = c.version
+    clock[0] = now + timedelta(minutes=15)
+    assert c.top("ua") == [("new", 1)]
+    assert c.version > v
+
+
+@pytest.mark.parametrize("lang", ["ua", "ru"])
+def test_load_trending_matches_old_query(client, monkeypatch, lang):
+    now = datetime.utcnow().replace(microsecond=0)
+    events = make_events(now, n=600, seed=11)
+    rows = [
+        {"query": q, "query_norm": q, "lang": lg, "session_id": None,
+         "chosen_route": None, "chosen_item_id": None, "created_at": ts}
+        for ts, lg, q in events
+    ]
+
+    async def seed():
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(SearchEvent))
+            await db.execute(delete(SearchStatsHourly))
+            await db.execute(insert(SearchEvent), rows)
+            await record_stats(db, stats_counts(rows))
+            await db.commit()
+
+    async def old_query():
+        async with AsyncSessionLocal() as db:
+            res = await db.execute(
+                select(SearchEvent.query_norm, func.count(SearchEvent.id).label("cnt"))
+                .where(SearchEvent.created_at >= now - timedelta(days=7))
+                .where(SearchEvent.lang == lang)
+                .group_by(SearchEvent.query_norm)
+                .order_by(desc("cnt"), SearchEvent.query_norm)
+                .limit(8)
+            )
+            return [tuple(r) for r in res.all()]
+
+    counters = TrendingCounters(days=7, clock=lambda: now)
+    monkeypatch.setattr(trending_mod, "trending", counters)
+    client.portal.call(seed)
+    client.portal.call(trending_mod.load_trending)
+
+    assert counters.top(lang) == client.portal.call(old_query)
+
+    async def cleanup():
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(SearchEvent))
+            await db.execute(delete(SearchStatsHourly))
+            await db.commit()
+
+    client.portal.call(cleanup)
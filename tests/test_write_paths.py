@@ -0,0 +1,67 @@
+import pytest
+
+REVIEW = {"author_name": "Олена", "text": "Дуже сподобалось, рекомендую", "rating": 5}
+MESSAGE = {"name": "Іван", "phone": "+380000000000", "message": "Хочу записатись", "preferred_contact": "phone"}
+
+
+def test_create_returns_server_defaults(client):
+    r = client.post("/api/contact/send", json=MESSAGE)
+    assert r.status_code == 200
+    msg = client.get(f"/api/contact/{r.json()['id']}").json()
+    assert msg["status"] == "new" and msg["is_read"] is False
+
+    r = client.post("/api/reviews/", json=REVIEW).json()
+    assert r["id"] and r["status"] == "pending" and r["created_at"]
+
+
+def test_duplicate_email_is_409_without_preselect(client):
+    body = {"email": "dup@example.com", "password": "secret1"}
+    assert client.post("/api/auth/register", json=body).status_code == 200
+    r = client.post("/api/auth/register", json=body)
+    assert r.status_code == 409
+    assert r.json()["detail"] == "Email already used"
+
+
+def test_patch_missing_row_is_404(client, admin):
+    assert client.patch("/api/contact/999999", json={"is_read": True}).status_code == 404
+    assert client.patch("/api/reviews/999999", json={"status": "hidden"}, headers=admin).status_code == 404
+
+
+@pytest.mark.parametrize("field", ["is_read", "status"])
+def test_contact_patch_null_is_422(client, field):
+    mid = client.post("/api/contact/send", json=MESSAGE).json()["id"]
+    assert client.patch(f"/api/contact/{mid}", json={field: None}).status_code == 422
+
+
+@pytest.mark.parametrize("field", ["status", "is_featured"])
+def test_review_patch_null_is_422(client, admin, field):
+    rid = client.post("/api/reviews/", json=REVIEW).json()["id"]
+    assert client.patch(f"/api/reviews/{rid}", json={field: None}, headers=admin).status_code == 422
+
+
+@pytest.mark.parametrize(
+    "patch, sentiment",
+    [
+        # оценка упала, но текст хвалебный: sentiment_for(текущий текст, 2), а не negative по одной оценке
+        ({"rating": 2}, "positive"),
+        ({"rating": 1, "sentiment": "positive"}, "positive"),
+        ({"is_featured": True}, "positive"),
+    ],
+)
+def test_review_patch_rescores_sentiment_on_rating(client, admin, patch, sentiment):
+    rid = client.post("/api/reviews/", json=REVIEW).json()["id"]
+    r = client.patch(f"/api/reviews/{rid}", json=patch, headers=admin)
+    assert r.status_code == 200
+    assert r.json()["sentiment"] == sentiment
+    assert r.json()["text"] == REVIEW["text"]
+
+
+def test_review_patch_does_not_edit_text(client, admin):
+    rid = client.post("/api/reviews/", json=REVIEW).json()["id"]
+    r = client.patch(f"/api/reviews/{rid}", json={"text": "Жахливо, брудно і грубо"}, headers=admin)
+    assert r.status_code == 200
+    assert r.json()["text"] == REVIEW["text"]
+
+
+def test_review_patch_rating_on_missing_row_is_404(client, admin):
+    assert client.patch("/api/reviews/999999", json={"rating": 2}, headers=admin).status_code == 404